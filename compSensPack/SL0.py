@@ -1,6 +1,145 @@
+import time
+
 import numpy as np
 
-def SL0(y, A, sigma_min, sigma_decrease_factor=0.5, mu_0=2, L=3, A_pinv=None, showProgress=False):
+from .instrumentation import phase  # Importing from instrumentation.py
+
+
+class FactorizedPinv:
+    """
+    Applies the Moore-Penrose pseudoinverse of a wide, full-row-rank matrix `A` (MxN, M < N) through a 
+    cached factorization of `A @ A.T`, without storing the NxM pseudoinverse.
+
+    For such a matrix `pinv(A) = A.T @ inv(A @ A.T)`, so `pinv(A) @ r` only needs two MxM triangular 
+    solves and one product with `A.T`. The upper-triangular factor `R` (with `R.T @ R = A @ A.T`) is 
+    computed once, either with a Cholesky factorization of `A @ A.T` or, more robustly, from a QR 
+    factorization of `A.T`.
+
+    Instances support the `@` operator, so they can be passed to `SL0` as `A_pinv`.
+
+    Parameters
+    ----------
+    A : numpy.ndarray
+        The wide matrix (MxN) to pseudo-invert.
+
+    method : str, optional (default='cholesky')
+        'cholesky' or 'qr'.
+
+    rcond : float, optional (default=1e-10)
+        `A` is considered rank-deficient when the smallest diagonal entry of `R` is below `rcond` times 
+        the largest one. Forming `A @ A.T` squares the conditioning, so with 'cholesky' the test is done 
+        on the squared ratio, against `rcond` (or `M` times the machine epsilon of the dtype, if larger): 
+        a rank-deficient `A` only gives diagonal ratios down to about the square root of the epsilon. In 
+        that case (or if the Cholesky factorization fails) the object falls back to a full 
+        `np.linalg.pinv(A)` and `method` is set to 'pinv'.
+
+    factor : numpy.ndarray, optional
+        A factor previously computed with the same `A` and `method` (e.g. loaded from disk), the 
+        factorization is skipped.
+
+    Attributes
+    ----------
+    method : str
+        The method actually in use: 'cholesky', 'qr' or 'pinv' after a fallback.
+
+    factor : numpy.ndarray
+        The MxM factor `R`, or the NxM pseudoinverse if `method` is 'pinv'.
+    """
+
+    def __init__(self, A, method='cholesky', rcond=1e-10, factor=None):
+        if method not in ('cholesky', 'qr', 'pinv'):
+            raise ValueError("Unsupported method. Choose either 'cholesky', 'qr' or 'pinv'.")
+
+        self.A = A
+        self.method = method
+        self.shape = (A.shape[1], A.shape[0])
+
+        if factor is not None:
+            self.factor = factor
+            return
+
+        import scipy.linalg  # imported on first use, it is only needed by the factorized methods
+
+        R = None
+        if method == 'cholesky':
+            try:
+                R = scipy.linalg.cholesky(A @ A.T, lower=False)
+            except np.linalg.LinAlgError:
+                R = None
+        elif method == 'qr':
+            R = scipy.linalg.qr(A.T, mode='r')[0][:A.shape[0]]
+
+        deficient = R is None or R.shape[0] != A.shape[0]
+        if not deficient:
+            diag = np.abs(np.diagonal(R))
+            ratio = np.min(diag) / np.max(diag) if np.max(diag) > 0 else 0.0
+            if method == 'cholesky':
+                # the factor of A @ A.T only resolves ratios down to ~sqrt(eps), compare the squared ratio
+                deficient = ratio ** 2 <= max(rcond, A.shape[0] * np.finfo(R.dtype).eps)
+            else:
+                deficient = ratio <= rcond
+        if deficient:
+            # rank-deficient (or tall) matrix: fall back to the SVD-based pseudoinverse
+            self.method = 'pinv'
+            self.factor = np.linalg.pinv(A)
+        else:
+            self.factor = R
+
+    def __matmul__(self, r):
+        if self.method == 'pinv':
+            return self.factor @ r
+        import scipy.linalg
+        return self.A.T @ scipy.linalg.cho_solve((self.factor, False), r)
+
+
+class SL0Workspace:
+    """
+    Preallocated buffers for the SL0 iterations, reusable across calls.
+
+    With a workspace, every update of the SL0 inner loop is done in place (ufuncs with `out=` and 
+    `np.matmul(..., out=)`), so the steady-state hot loop does no heap allocation when `A` and `A_pinv` 
+    are dense arrays. A workspace built for `B` columns serves any batch of at most `B` columns.
+
+    Parameters
+    ----------
+    N : int
+        Number of columns of `A` (length of `s`).
+
+    M : int
+        Number of rows of `A` (length of `y`).
+
+    B : int, optional (default=1)
+        Maximum number of columns solved together.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of the iterations.
+    """
+
+    def __init__(self, N, M, B=1, dtype=np.float64):
+        self.N, self.M, self.B = N, M, B
+        self.dtype = np.dtype(dtype)
+
+        # column-major, so that the first n columns of every buffer are contiguous
+        self.s = np.empty((N, B), dtype=self.dtype, order='F')
+        self.s_prev = np.empty((N, B), dtype=self.dtype, order='F')
+        self.t = np.empty((N, B), dtype=self.dtype, order='F')
+        self.y = np.empty((M, B), dtype=self.dtype, order='F')
+        self.r = np.empty((M, B), dtype=self.dtype, order='F')
+
+        self.sigma = np.empty(B, dtype=self.dtype)
+        self.sigma2 = np.empty(B, dtype=self.dtype)
+        self.change = np.empty(B, dtype=self.dtype)
+        self.reference = np.empty(B, dtype=self.dtype)
+        self.idx = np.empty(B, dtype=np.intp)
+
+    def fits(self, N, M, B, dtype):
+        """Returns True if the workspace can be used for a batch of `B` columns of the given shape and type."""
+        return self.N == N and self.M == M and B <= self.B and self.dtype == np.dtype(dtype)
+
+
+def SL0(y, A, sigma_min, sigma_decrease_factor=0.5, mu_0=2, L=3, A_pinv=None, showProgress=False,
+        pinv_method='pinv', tol=None, residual_tol=None, return_iterations=False, s_init=None, workspace=None,
+        metrics=None):
     """
     Returns the sparsest vector `s` that satisfies the underdetermined system of 
     linear equations `A @ s = y`, using the Smoothed L0 (SL0) algorithm.
@@ -13,12 +152,16 @@ def SL0(y, A, sigma_min, sigma_decrease_factor=0.5, mu_0=2, L=3, A_pinv=None, sh
     Parameters:
     ----------
     y : numpy array
-        The observed vector (Mx1), where M is the number of rows in `A`.
+        The observed vector (Mx1), where M is the number of rows in `A`. A 2-D array 
+        of shape (M, B) is also accepted: each column is treated as an independent 
+        measurement vector and all `B` problems are solved together in one batched 
+        run of the sigma schedule.
     
     A : numpy array
         The measurement matrix (MxN), which should be 'wide', meaning it has more 
         columns than rows (N > M). The number of rows in `A` must match the length 
-        of `y`.
+        of `y`. Matrix-free operators that support `@` (e.g. `KroneckerDCTOperator`) 
+        are also accepted.
     
     sigma_min : float
         The minimum value of `sigma`, which determines the stopping criterion for 
@@ -41,17 +184,61 @@ def SL0(y, A, sigma_min, sigma_decrease_factor=0.5, mu_0=2, L=3, A_pinv=None, sh
     
     A_pinv : numpy array, optional
         The precomputed pseudoinverse of the matrix `A`. If not provided, it will be 
-        calculated within the function as `np.linalg.pinv(A)`. Providing this value 
-        is beneficial if the function is called repeatedly with the same `A`.
+        calculated within the function as `np.linalg.pinv(A)`, or with `A.pinv()` if 
+        `A` is a matrix-free operator. Providing this value is beneficial if the 
+        function is called repeatedly with the same `A`.
+        A `FactorizedPinv` object can be passed instead of the dense pseudoinverse.
     
     showProgress : bool, optional (default=False)
         If `True`, the function prints the current value of `sigma` during each 
-        iteration, which helps monitor the convergence process.
+        iteration, which helps monitor the convergence process. Use `metrics` for 
+        structured measurements instead of prints.
+
+    pinv_method : str, optional (default='pinv')
+        How the projection operator is built when `A_pinv` is not provided: 'pinv' 
+        computes `np.linalg.pinv(A)` (full SVD), 'cholesky' and 'qr' build a 
+        `FactorizedPinv` of `A`, which is cheaper for wide full-row-rank matrices and 
+        falls back to 'pinv' for rank-deficient ones. Ignored for matrix-free `A`.
+
+    tol : float, optional
+        If provided, enables early termination: after each sigma step a column stops 
+        iterating when the relative change of `s`, `norm(s_new - s_old) / norm(s_old)`, 
+        is below `tol` and its relative residual `norm(A @ s - y) / norm(y)` is below 
+        `residual_tol`. If None (default), the full sigma schedule is always run.
+
+    residual_tol : float, optional
+        The relative residual threshold used with `tol`. Defaults to `tol`.
+
+    return_iterations : bool, optional (default=False)
+        If `True`, the number of sigma steps run for each column is returned as well.
+
+    s_init : numpy array, optional
+        A warm-start estimate of `s` (Nx1, or NxB in batched mode), e.g. the solution of 
+        the previous, strongly correlated block. `s` starts from its projection onto 
+        `A @ s = y` instead of the minimum-norm solution `A_pinv @ y`, and `sigma` 
+        starts from twice the largest correction made by that projection (never more 
+        than the cold start `2 * max(abs(s))`). If None (default), SL0 starts cold.
+
+    workspace : SL0Workspace, optional
+        Preallocated buffers reused by the iterations, for a batch of at least as many 
+        columns as `y`. If None (default), a workspace is allocated for this call.
+
+    metrics : RecoveryMetrics, optional
+        Receives the time spent computing `A_pinv` ('pinv') and iterating ('solve'), 
+        the sigma and residual norms of the active columns after every sigma step, 
+        and the final iteration counts (see `RecoveryMetrics`). If None (default), 
+        nothing is measured.
 
     Returns:
     -------
     s : numpy array
         The estimated sparse signal (Nx1) that best satisfies the equation `A @ s = y`.
+        If `y` is 2-D with shape (M, B), `s` has shape (N, B) and column `j` is the 
+        solution for `y[:, j]`.
+
+    iterations : int or numpy array
+        Only if `return_iterations` is `True`: the number of sigma steps (each made of 
+        `L` inner iterations) run for `y`, or for each column of `y` in batched mode.
 
     Notes:
     -----
@@ -68,6 +255,27 @@ def SL0(y, A, sigma_min, sigma_decrease_factor=0.5, mu_0=2, L=3, A_pinv=None, sh
       more efficient, especially in scenarios where it is called repeatedly with the 
       same `A`.
 
+    - The iterations run in the floating point type of `y`, `A` and `A_pinv` (e.g. 
+      all `np.float32` for the single precision mode), no conversion is made here.
+
+    - In batched mode every column keeps its own `sigma`, starting at 
+      `2 * max(abs(s[:, j]))`, so each column follows exactly the schedule it would 
+      follow if solved alone. Columns whose `sigma` has reached `sigma_min` are 
+      frozen while the remaining ones keep iterating, and the updates are done as 
+      matrix-matrix products over all active columns at once.
+
+    - The inner loop works in place on the buffers of an `SL0Workspace`, so with a 
+      reused workspace and dense `A` and `A_pinv` it performs no heap allocation. 
+      Matrix-free operators and `FactorizedPinv` still allocate their own results.
+
+    - `metrics` costs one extra product with `A` per sigma step when enabled, and 
+      nothing when it is None.
+
+    - With `tol`, columns that have converged (e.g. flat ECG segments) are removed 
+      from the active-column mask as well, so later sigma steps only cost as much as 
+      the columns that still need them. Checking convergence costs one extra product 
+      with `A` per sigma step.
+
       
       References:
       ----------
@@ -79,25 +287,141 @@ def SL0(y, A, sigma_min, sigma_decrease_factor=0.5, mu_0=2, L=3, A_pinv=None, sh
    """
 
     if A_pinv is None:
-        A_pinv = np.linalg.pinv(A)
+        with phase(metrics, 'pinv'):
+            if hasattr(A, 'pinv'):
+                A_pinv = A.pinv()
+            elif pinv_method == 'pinv':
+                A_pinv = np.linalg.pinv(A)
+            else:
+                A_pinv = FactorizedPinv(A, pinv_method)
+
+    if metrics is not None:
+        start = time.perf_counter()
 
-    # Initialize the variables
-    s = A_pinv @ y
-    sigma = 2 * max(np.abs(s))
+    # Work on 2-D arrays internally, a single vector is a batch of one column
+    y = np.asarray(y)
+    single = y.ndim == 1
+    Y = y[:, np.newaxis] if single else y
+
+    # Initialize the variables (one sigma per column)
+    S = A_pinv @ Y
+    sigma = 2 * np.max(np.abs(S), axis=0)
+
+    if s_init is not None:
+        # warm start: project the seed onto A @ s = y, a seed that already (almost) explains y only needs
+        # a sigma as large as the correction made by the projection
+        S_init = np.asarray(s_init, dtype=S.dtype).reshape(S.shape)
+        correction = A_pinv @ (A @ S_init - Y)
+        S = S_init - correction
+        sigma = np.minimum(2 * np.max(np.abs(correction), axis=0), sigma)
+
+    if residual_tol is None:
+        residual_tol = tol
+
+    N, BATCH = S.shape
+    if workspace is None:
+        workspace = SL0Workspace(N, Y.shape[0], BATCH, S.dtype)
+    elif not workspace.fits(N, Y.shape[0], BATCH, S.dtype):
+        raise ValueError(f"The workspace does not fit a batch of {BATCH} columns of shape {(Y.shape[0], N)} "
+                         f"and type {S.dtype}.")
+    ws = workspace
+
+    iterations = np.zeros(BATCH, dtype=int)  # sigma steps run by each column
+
+    # The active columns are kept packed at the front of the workspace buffers: idx maps them back to the
+    # columns of S, and they are compacted only when some of them finish
+    n = BATCH
+    s, y_act, sigma_act, idx = ws.s[:, :n], ws.y[:, :n], ws.sigma[:n], ws.idx[:n]
+    s[...] = S
+    y_act[...] = Y
+    sigma_act[...] = sigma
+    idx[...] = np.arange(BATCH)
 
-    # Define lambda function for delta
-    OurDelta = lambda s, sigma: s * np.exp(-s**2 / sigma**2)
- 
     # Main loop
-    while sigma > sigma_min:
+    active = sigma_act > sigma_min
+    while True:
+        if not active.all():
+            # write back the columns that are done and pack the remaining ones
+            S[:, idx[~active]] = s[:, ~active]
+            keep = np.flatnonzero(active)
+            n = keep.size
+            s, y_act, sigma_act, idx = ws.s[:, :n], ws.y[:, :n], ws.sigma[:n], ws.idx[:n]
+            s[...] = ws.s[:, keep]
+            y_act[...] = ws.y[:, keep]
+            sigma_act[...] = ws.sigma[keep]
+            idx[...] = ws.idx[keep]
+        if n == 0:
+            break
+
+        t, r, sigma2 = ws.t[:, :n], ws.r[:, :n], ws.sigma2[:n]
+        np.square(sigma_act, out=sigma2)
+        if tol is not None:
+            s_prev = ws.s_prev[:, :n]
+            np.copyto(s_prev, s)
+
+        # In-place version of:
+        #     delta = s * np.exp(-s**2 / sigma**2)
+        #     s = s - mu_0 * delta
+        #     s = s - A_pinv @ (A @ s - y)
         for i in range(L):
-            delta = OurDelta(s, sigma)
-            s = s - mu_0 * delta
-            s = s - A_pinv @ (A @ s - y)
-        
+            np.square(s, out=t)
+            np.negative(t, out=t)
+            np.divide(t, sigma2, out=t)
+            np.exp(t, out=t)
+            np.multiply(s, t, out=t)  # delta
+            np.multiply(t, mu_0, out=t)
+            np.subtract(s, t, out=s)
+            _matmul_into(A, s, r)
+            np.subtract(r, y_act, out=r)
+            _matmul_into(A_pinv, r, t)
+            np.subtract(s, t, out=s)
+
+        iterations[idx] += 1
+
         if showProgress:
-            print(f'sigma: {sigma}')
+            print(f'sigma: {np.max(sigma_act)}')
+
+        if metrics is not None:
+            _matmul_into(A, s, r)
+            np.subtract(r, y_act, out=r)
+            metrics.on_sigma_step(idx, sigma_act, np.linalg.norm(r, axis=0))
+
+        np.multiply(sigma_act, sigma_decrease_factor, out=sigma_act)
+        active = sigma_act > sigma_min
+
+        if tol is not None:
+            # drop the columns that stopped changing and satisfy the measurements (squared norms)
+            change, reference = ws.change[:n], ws.reference[:n]
+            np.subtract(s, s_prev, out=t)
+            np.square(t, out=t)
+            np.sum(t, axis=0, out=change)
+            np.square(s_prev, out=t)
+            np.sum(t, axis=0, out=reference)
+            converged = change <= tol**2 * reference
+
+            _matmul_into(A, s, r)
+            np.subtract(r, y_act, out=r)
+            np.square(r, out=r)
+            np.sum(r, axis=0, out=change)
+            np.square(y_act, out=r)
+            np.sum(r, axis=0, out=reference)
+            converged &= change <= residual_tol**2 * reference
+
+            active &= ~converged
+
+    if metrics is not None:
+        metrics.on_phase('solve', time.perf_counter() - start)
+        metrics.on_iterations(iterations)
+
+    S = S[:, 0] if single else S
+    if return_iterations:
+        return S, (iterations[0] if single else iterations)
+    return S
 
-        sigma = sigma * sigma_decrease_factor
 
-    return s
+def _matmul_into(A, x, out):
+    """Writes `A @ x` into `out`, without temporaries when `A` is a dense array."""
+    if isinstance(A, np.ndarray):
+        np.matmul(A, x, out=out)
+    else:
+        out[...] = A @ x
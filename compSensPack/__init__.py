@@ -1,34 +1,97 @@
 # compSensPack/__init__.py
 
-# Import all the functions from the package
-from .utils import printFormatted
-from .sparseSignalGenerator import sparseSignal
-from .samplingPhase import compressSignal
-from .sparseDictionaries import generate_DCT_dictionary, generate_DWT_basis
-from .sparseDictionaries import  compute_independent_columns, check_normalization, compute_coherence
-from .SL0 import SL0
-from .measurementMatrix import generate_DBDD_matrix, generate_random_matrix
-from .recoveryPhase import non_kron_recovery, kron_recovery
-from .evaluation import calculate_snr, plot_signals
+import importlib
+
+# The functions of the package, by submodule. Submodules are imported lazily, the first time one of their names is
+# accessed (`compSensPack.SL0`, `from compSensPack import SL0`, ...), so that a process using only e.g. `SL0` or
+# `compressSignal` does not import matplotlib, PyWavelets or scipy.fft (import times are tracked by `scripts/benchmark.py`)
+_SUBMODULE_NAMES = {
+    'utils': ['printFormatted'],
+    'sparseSignalGenerator': ['sparseSignal', 'sparse_signal_batch', 'sparse_signal_stream'],
+    'samplingPhase': ['compressSignal'],
+    'sparseDictionaries': ['generate_DCT_dictionary', 'generate_DWT_basis', 'generate_DWT_dictionary',
+                           'WaveletDictionary', 'compute_independent_columns', 'check_normalization',
+                           'compute_coherence', 'compute_rank'],
+    'measurementMatrix': ['generate_DBDD_matrix', 'generate_random_matrix', 'DBDDOperator', 'MatrixSpec',
+                          'PackedBinaryMatrix'],
+    'recoveryPhase': ['non_kron_recovery', 'kron_recovery', 'non_kron_recovery_stream', 'kron_recovery_stream'],
+    'kroneckerOperator': ['KroneckerDCTOperator'],
+    'parallelRecovery': ['parallel_recovery'],
+    'recoveryPlan': ['RecoveryPlan', 'get_recovery_plan', 'clear_plan_cache'],
+    'instrumentation': ['RecoveryMetrics'],
+    'evaluation': ['calculate_snr', 'plot_signals', 'plot_batch', 'min_max_envelope'],
+    'qualityMetrics': ['block_metrics', 'block_energies', 'metrics_from_energies', 'QualityAccumulator'],
+    'records': ['Record', 'load_record'],
+    'parameterSweep': ['parameter_sweep'],
+    'phaseTransition': ['phase_transition'],
+}
+_LAZY_IMPORTS = {name: module for module, names in _SUBMODULE_NAMES.items() for name in names}
+
+# Imported eagerly (it only needs numpy): importing the submodule `SL0` from anywhere sets the package attribute
+# `SL0`, which must stay the function
+from .SL0 import SL0, FactorizedPinv, SL0Workspace
 
 # Define __all__ for wildcard imports
 __all__ = [
     'printFormatted',
     'sparseSignal',
+    'sparse_signal_batch',
+    'sparse_signal_stream',
     'compressSignal',
     'generate_DCT_dictionary',
     'generate_DWT_basis',
+    'generate_DWT_dictionary',
+    'WaveletDictionary',
     'non_kron_recovery',
+    'FactorizedPinv',
+    'SL0Workspace',
     'kron_recovery',
+    'non_kron_recovery_stream',
+    'kron_recovery_stream',
+    'parallel_recovery',
+    'KroneckerDCTOperator',
+    'RecoveryPlan',
+    'get_recovery_plan',
+    'clear_plan_cache',
+    'RecoveryMetrics',
     'generate_DBDD_matrix',
     'generate_random_matrix',
+    'DBDDOperator',
+    'MatrixSpec',
+    'PackedBinaryMatrix',
     'compute_independent_columns',
     'check_normalization',
     'compute_coherence',
+    'compute_rank',
     'calculate_snr',
-    'plot_signals'
+    'plot_signals',
+    'plot_batch',
+    'min_max_envelope',
+    'block_metrics',
+    'block_energies',
+    'metrics_from_energies',
+    'QualityAccumulator',
+    'Record',
+    'load_record',
+    'parameter_sweep',
+    'phase_transition'
 ]
 
 # Optional metadata for the package
 __version__ = '1.0.0'
 __author__ = 'RosNaviGator'
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        if name in _SUBMODULE_NAMES:
+            return importlib.import_module(f'.{name}', __name__)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value  # later accesses do not go through __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,6 +1,10 @@
-import matplotlib.pyplot as plt
-import numpy as np
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# matplotlib is imported by the plotting functions, so that `calculate_snr` does not need it
 
 def calculate_snr(signal, recovered_signal):
     """
@@ -28,12 +32,66 @@ def calculate_snr(signal, recovered_signal):
     
     return snr
 
+# size of the comparison plots, in inches and dots per inch
+FIGSIZE = (10, 6)
+DPI = 100
+
+
+def min_max_envelope(signal, width):
+    """
+    Downsamples a signal for plotting by keeping the minimum and the maximum of each of `width` buckets of
+    consecutive samples.
+
+    Drawn as a line, the 2 * `width` points cover exactly the same pixels as the full signal on a plot `width`
+    pixels wide (peaks are never lost, unlike plain decimation), at a rendering cost independent of the length.
+
+    Parameters
+    ----------
+    signal : numpy.ndarray
+        The 1-D signal (e.g. a memory-mapped lead of a `Record`).
+
+    width : int
+        Number of buckets, normally the width of the plot in pixels.
+
+    Returns
+    -------
+    indices : numpy.ndarray
+        Sample indices of the kept points, increasing (the minimum and the maximum of each bucket in their order).
+
+    values : numpy.ndarray
+        The samples at `indices`. If the signal has at most 2 * `width` samples, all of them are returned.
+    """
+    signal = np.asarray(signal)
+    n = signal.shape[0]
+    if n <= 2 * width:
+        return np.arange(n), signal
+
+    bucket = -(-n // width)  # ceil
+    buckets = -(-n // bucket)
+    padded = np.empty(buckets * bucket, dtype=signal.dtype)
+    padded[:n] = signal
+    padded[n:] = signal[-1]  # the padding repeats the last sample, so it never changes a minimum or maximum
+    padded = padded.reshape(buckets, bucket)
+
+    arg_min = padded.argmin(axis=1)
+    arg_max = padded.argmax(axis=1)
+    starts = np.arange(buckets) * bucket
+    indices = np.empty((buckets, 2), dtype=np.intp)
+    indices[:, 0] = starts + np.minimum(arg_min, arg_max)
+    indices[:, 1] = starts + np.maximum(arg_min, arg_max)
+    indices = np.minimum(indices.ravel(), n - 1)
+    return indices, signal[indices]
+
+
 def plot_signals(original_signal, reconstructed_signal, original_name="Original Signal", 
-                 reconstructed_name="Reconstructed Signal", save_path=None, filename=None):
+                 reconstructed_name="Reconstructed Signal", save_path=None, filename=None, show=None, snr=None):
     """
     Plots the original signal and the reconstructed signal on the same plot with the given names,
     displays the Signal-to-Noise Ratio (SNR) in a text box, and saves the plot to a specified directory.
 
+    Both signals are reduced to their min/max envelope at the width of the plot in pixels (see
+    `min_max_envelope`), so plotting costs the same for a short segment and for a whole record.
+
     Parameters
     ----------
     original_signal : numpy.ndarray
@@ -53,6 +111,19 @@ def plot_signals(original_signal, reconstructed_signal, original_name="Original
     
     filename : str, optional
         The name of the file to save the plot as. If None and save_path is provided, a default name will be generated.
+
+    show : bool, optional
+        If True, the plot is displayed with `plt.show()` (blocking, with an interactive backend). If None (default),
+        it is displayed only when it is not saved: saved plots are rendered off-screen by the Agg backend,
+        without opening windows or touching the pyplot state, so scripts and batch jobs never wait on them.
+
+    snr : float, optional
+        The SNR to display, if already known. If None (default), it is computed with `calculate_snr`.
+
+    Returns
+    -------
+    file_path : str or None
+        The path of the saved plot, None if it was not saved.
     """
     
     # Ensure the signals have the same length
@@ -60,29 +131,15 @@ def plot_signals(original_signal, reconstructed_signal, original_name="Original
         raise ValueError("The original signal and the reconstructed signal must have the same length.")
     
     # Calculate SNR
-    snr = calculate_snr(original_signal, reconstructed_signal)
-    
-    # Create the plot
-    plt.figure(figsize=(10, 6))
-    plt.plot(original_signal, label=original_name, color='blue', linewidth=1.5)
-    plt.plot(reconstructed_signal, label=reconstructed_name, color='red', linestyle='--', linewidth=1.5)
-    
-    # Title and labels
-    plt.title(f"{original_name} vs {reconstructed_name}")
-    plt.xlabel('Sample Index')
-    plt.ylabel('Amplitude')
-    
-    # Add a legend
-    plt.legend()
-    
-    # Display SNR in a text box
-    plt.text(0.05, 0.95, f'SNR: {snr:.2f} dB', transform=plt.gca().transAxes,
-             fontsize=12, verticalalignment='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-    
-    # Grid and show plot
-    plt.grid(True)
-    
+    if snr is None:
+        snr = calculate_snr(original_signal, reconstructed_signal)
+
+    width = int(FIGSIZE[0] * DPI)
+    curves = (min_max_envelope(original_signal, width), min_max_envelope(reconstructed_signal, width))
+    labels = (original_name, reconstructed_name, snr)
+
     # Save the plot if a save path is provided
+    file_path = None
     if save_path is not None:
         # Ensure the save directory exists
         os.makedirs(save_path, exist_ok=True)
@@ -93,8 +150,109 @@ def plot_signals(original_signal, reconstructed_signal, original_name="Original
         
         # Define the file path to save the plot
         file_path = os.path.join(save_path, filename)
-        plt.savefig(file_path)
+        _save_comparison(file_path, curves, labels)
         print(f"Plot saved to {file_path}")
-    
+
     # Display the plot
-    plt.show() 
+    if show or (show is None and save_path is None):
+        import matplotlib.pyplot as plt
+
+        plt.figure(figsize=FIGSIZE, dpi=DPI)
+        _draw_comparison(plt.gca(), curves, labels)
+        plt.show()
+
+    return file_path
+
+
+def plot_batch(comparisons, save_path, workers=None):
+    """
+    Saves many comparison plots (see `plot_signals`) without displaying them.
+
+    The SNR and the min/max envelopes are computed here, then only the few thousand points of each plot are
+    rendered off-screen by the Agg backend, in this process or, with `workers`, in parallel worker processes.
+
+    Parameters
+    ----------
+    comparisons : iterable of dict
+        Keyword arguments of `plot_signals` for each plot: 'original_signal', 'reconstructed_signal' and
+        optionally 'original_name', 'reconstructed_name', 'filename' and 'snr'.
+
+    save_path : str
+        The directory where the plots are saved.
+
+    workers : int, optional
+        If greater than 1, the plots are rendered by that many worker processes (started with 'spawn', so the
+        calling script must guard its entry point with `if __name__ == "__main__":`).
+
+    Returns
+    -------
+    file_paths : list of str
+        The paths of the saved plots, in the order of `comparisons`.
+    """
+    os.makedirs(save_path, exist_ok=True)
+    width = int(FIGSIZE[0] * DPI)
+
+    jobs = []
+    for comparison in comparisons:
+        comparison = dict(comparison)
+        original_signal = comparison.pop('original_signal')
+        reconstructed_signal = comparison.pop('reconstructed_signal')
+        if len(original_signal) != len(reconstructed_signal):
+            raise ValueError("The original signal and the reconstructed signal must have the same length.")
+        original_name = comparison.pop('original_name', "Original Signal")
+        reconstructed_name = comparison.pop('reconstructed_name', "Reconstructed Signal")
+        filename = comparison.pop('filename', None) or f"{original_name}_vs_{reconstructed_name}.png"
+        snr = comparison.pop('snr', None)
+        if comparison:
+            raise ValueError(f"Unknown plot arguments: {sorted(comparison)}")
+        if snr is None:
+            snr = calculate_snr(original_signal, reconstructed_signal)
+
+        curves = (min_max_envelope(original_signal, width), min_max_envelope(reconstructed_signal, width))
+        jobs.append((os.path.join(save_path, filename), curves, (original_name, reconstructed_name, snr)))
+
+    if workers is not None and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            list(executor.map(_save_comparison, *zip(*jobs)))
+    else:
+        for job in jobs:
+            _save_comparison(*job)
+
+    file_paths = [file_path for file_path, _, _ in jobs]
+    for file_path in file_paths:
+        print(f"Plot saved to {file_path}")
+    return file_paths
+
+
+def _draw_comparison(ax, curves, labels):
+    """Draws the two (indices, values) curves, their names and the SNR on `ax`."""
+    (original_x, original_y), (reconstructed_x, reconstructed_y) = curves
+    original_name, reconstructed_name, snr = labels
+
+    ax.plot(original_x, original_y, label=original_name, color='blue', linewidth=1.5)
+    ax.plot(reconstructed_x, reconstructed_y, label=reconstructed_name, color='red', linestyle='--', linewidth=1.5)
+    
+    # Title and labels
+    ax.set_title(f"{original_name} vs {reconstructed_name}")
+    ax.set_xlabel('Sample Index')
+    ax.set_ylabel('Amplitude')
+    
+    # Add a legend
+    ax.legend()
+    
+    # Display SNR in a text box
+    ax.text(0.05, 0.95, f'SNR: {snr:.2f} dB', transform=ax.transAxes,
+            fontsize=12, verticalalignment='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+    
+    # Grid
+    ax.grid(True)
+
+
+def _save_comparison(file_path, curves, labels):
+    """Renders a comparison plot with the Agg backend (no window, no pyplot state) and saves it to `file_path`."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=FIGSIZE, dpi=DPI)
+    _draw_comparison(fig.add_subplot(), curves, labels)
+    fig.savefig(file_path)
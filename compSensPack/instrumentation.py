@@ -0,0 +1,156 @@
+import threading
+import time
+
+import numpy as np
+
+
+class RecoveryMetrics:
+    """
+    Collects structured measurements from the recovery phase and summarizes where the time goes.
+
+    An instance is passed as the `metrics` argument of `SL0`, `RecoveryPlan`, `get_recovery_plan` and the
+    recovery functions, which report to it through the hook methods below. Any object with the same methods can
+    be used instead (e.g. a subclass forwarding the measurements to a logging or monitoring system). When
+    `metrics` is None nothing is measured: the hooks are the only instrumentation and they are never called.
+
+    Hooks
+    -----
+    on_phase(name, seconds)
+        Wall time of one phase: 'plan' (dictionary and Theta), 'pinv' (projection operator), 'solve' (SL0
+        iterations, including the initial projection) or 'synthesis' (blocks rebuilt from the coefficients).
+
+    on_sigma_step(columns, sigma, residual)
+        Called by `SL0` after every sigma step with the indices (in the batch passed to `SL0`) of the columns
+        that ran it, their `sigma` and the norms of their residuals `A @ s - y`. The arrays are only valid
+        during the call.
+
+    on_iterations(iterations)
+        Called at the end of every `SL0` call with the number of sigma steps run by each column.
+
+    on_event(name)
+        Counts discrete events, e.g. 'plan_cache_hit' and 'plan_cache_miss'.
+
+    Attributes
+    ----------
+    phase_times : dict
+        Total wall time in seconds of each phase.
+
+    phase_calls : dict
+        Number of measurements of each phase.
+
+    events : dict
+        Number of occurrences of each event.
+
+    Notes
+    -----
+    The hooks are thread-safe, so one instance can be shared by concurrent recoveries. Worker processes of
+    `parallel_recovery` do not report to it: in that mode only the plan build and the total 'solve' time are
+    collected.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Discards every measurement."""
+        with self._lock:
+            self.phase_times = {}
+            self.phase_calls = {}
+            self.events = {}
+            self._solves = 0
+            self._trace = []  # (solve, max sigma, max residual, active columns) of every sigma step
+            self._iterations = []
+
+    def on_phase(self, name, seconds):
+        with self._lock:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + seconds
+            self.phase_calls[name] = self.phase_calls.get(name, 0) + 1
+
+    def on_sigma_step(self, columns, sigma, residual):
+        with self._lock:
+            self._trace.append((self._solves, float(np.max(sigma)), float(np.max(residual)), len(columns)))
+
+    def on_iterations(self, iterations):
+        with self._lock:
+            self._iterations.append(np.atleast_1d(np.array(iterations)))
+            self._solves += 1
+
+    def on_event(self, name):
+        with self._lock:
+            self.events[name] = self.events.get(name, 0) + 1
+
+    @property
+    def iterations(self):
+        """Number of sigma steps run by every column solved so far, in order of solution."""
+        with self._lock:
+            if not self._iterations:
+                return np.zeros(0, dtype=int)
+            return np.concatenate(self._iterations)
+
+    @property
+    def trace(self):
+        """
+        The sigma steps recorded so far as a dict of arrays: 'solve' (index of the `SL0` call), 'sigma' (largest
+        sigma), 'residual' (largest residual norm) and 'active' (number of columns that ran the step).
+        """
+        with self._lock:
+            trace = np.array(self._trace, dtype=float).reshape(-1, 4)
+        return {'solve': trace[:, 0].astype(int), 'sigma': trace[:, 1], 'residual': trace[:, 2],
+                'active': trace[:, 3].astype(int)}
+
+    def summary(self):
+        """Returns a human-readable report of the phases, slowest first, and of the SL0 iterations."""
+        total = sum(self.phase_times.values())
+        lines = [f"{'phase':12s} {'time (s)':>10s} {'share':>7s} {'calls':>7s}"]
+        for name, seconds in sorted(self.phase_times.items(), key=lambda item: -item[1]):
+            share = seconds / total if total > 0 else 0.0
+            lines.append(f"{name:12s} {seconds:10.4f} {share:7.1%} {self.phase_calls[name]:7d}")
+
+        iterations = self.iterations
+        if iterations.size:
+            trace = self.trace
+            lines.append(f"SL0 calls: {len(self._iterations)}, columns: {iterations.size}, "
+                         f"sigma steps: {trace['sigma'].size}, column-steps: {int(iterations.sum())}")
+            lines.append(f"sigma steps per column: mean {iterations.mean():.2f}, min {iterations.min()}, "
+                         f"max {iterations.max()}")
+            if trace['residual'].size:
+                lines.append(f"largest residual norm after the last sigma step: {trace['residual'][-1]:.3e}")
+
+        for name, count in sorted(self.events.items()):
+            lines.append(f"{name}: {count}")
+        return "\n".join(lines)
+
+
+class _Phase:
+    """Context manager reporting the wall time of its block to `metrics.on_phase`."""
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.on_phase(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoPhase:
+    """Context manager doing nothing, used when instrumentation is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(metrics, name):
+    """Returns a context manager timing its block as phase `name` of `metrics`, or doing nothing if it is None."""
+    return _NO_PHASE if metrics is None else _Phase(metrics, name)
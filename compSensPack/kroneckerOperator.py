@@ -0,0 +1,127 @@
+import numpy as np
+
+
+class KroneckerDCTOperator:
+    """
+    Matrix-free representation of the Kronecker sensing matrix `Theta_kron = np.kron(np.eye(kron_factor), Phi) @ Dict_kron`,
+    where `Dict_kron = generate_DCT_dictionary(n_block * kron_factor)`.
+
+    `np.kron(np.eye(kron_factor), Phi)` is block-diagonal and the DCT dictionary is orthonormal, so the whole
+    operator can be applied through the small `Phi` factor and a fast inverse DCT. The transpose and the
+    Moore-Penrose pseudoinverse share the same structure:
+
+    - `Theta_kron @ s       = (I ⊗ Phi) @ idct(s)`
+    - `Theta_kron.T @ y     = dct((I ⊗ Phi.T) @ y)`
+    - `pinv(Theta_kron) @ y = dct((I ⊗ pinv(Phi)) @ y)`
+
+    The last identity holds because `pinv(P @ D) = D.T @ pinv(P)` for orthonormal `D` and
+    `pinv(I ⊗ Phi) = I ⊗ pinv(Phi)`. No matrix of size `n_block * kron_factor` is ever built.
+
+    Instances support the `@` operator on 1-D vectors (length N) and 2-D arrays (N x B, one problem per column),
+    so they can be passed to `SL0` in place of the dense `Theta_kron`.
+
+    Any other orthonormal dictionary with fast transforms can replace the DCT (e.g. a `WaveletDictionary` of
+    size `n_block * kron_factor`), the identities above only need `Dict_kron` to be orthonormal.
+
+    Parameters
+    ----------
+    Phi : numpy.ndarray or DBDDOperator
+        The measurement matrix of shape (M, N) used to compress each block of the original signal. An implicit
+        `DBDDOperator` is kept as such, and its closed-form pseudoinverse is used by `pinv`.
+
+    kron_factor : int
+        The number of consecutive blocks that are joined into one Kronecker block.
+
+    dictionary : WaveletDictionary, optional
+        An orthonormal dictionary of size `n_block * kron_factor` with `synthesize` and `analyze` methods used
+        as `Dict_kron`. If None (default), `Dict_kron` is the DCT dictionary, applied with fast DCT/IDCT calls.
+
+    Attributes
+    ----------
+    shape : tuple
+        The shape of the equivalent dense matrix, `(M * kron_factor, N * kron_factor)`.
+    """
+
+    def __init__(self, Phi, kron_factor, dictionary=None):
+        self.Phi = Phi if hasattr(Phi, 'pinv') else np.asarray(Phi)
+        self.kron_factor = int(kron_factor)
+        self.dictionary = dictionary
+        m_block, n_block = self.Phi.shape
+        self.shape = (m_block * self.kron_factor, n_block * self.kron_factor)
+        if dictionary is not None and dictionary.shape != (self.shape[1], self.shape[1]):
+            raise ValueError(f"The dictionary must have shape {(self.shape[1], self.shape[1])}, "
+                             f"got {dictionary.shape}.")
+
+    def __matmul__(self, s):
+        # synthesis with the orthonormal DCT dictionary, then block-wise sampling with Phi
+        return _apply_block_diagonal(self.Phi, self.kron_factor, self.synthesize(s))
+
+    @property
+    def T(self):
+        """Transpose of `Theta_kron`, as a matrix-free operator."""
+        return _KroneckerDCTAnalysisOperator(self.Phi.T, self.kron_factor, self)
+
+    def pinv(self, Phi_pinv=None):
+        """
+        Returns the Moore-Penrose pseudoinverse of `Theta_kron` as a matrix-free operator.
+
+        Only the small `np.linalg.pinv(Phi)` is computed, and not even that if `Phi_pinv` is provided
+        (e.g. loaded from disk) or if `Phi` is an implicit operator with its own `pinv` (e.g. `DBDDOperator`).
+        The returned operator exposes it as its `F` attribute.
+        """
+        if Phi_pinv is None:
+            Phi_pinv = self.Phi.pinv() if hasattr(self.Phi, 'pinv') else np.linalg.pinv(self.Phi)
+        return _KroneckerDCTAnalysisOperator(Phi_pinv, self.kron_factor, self)
+
+    def synthesize(self, s):
+        """Returns `Dict_kron @ s`: a fast orthonormal inverse DCT (or dictionary synthesis) along the first axis."""
+        if self.dictionary is None:
+            import scipy.fft  # imported on first use, like the other heavy dependencies of the package
+            return scipy.fft.idct(s, axis=0, norm='ortho')
+        return self.dictionary.synthesize(s)
+
+    def analyze(self, x):
+        """Returns `Dict_kron.T @ x`: a fast orthonormal DCT (or the dictionary analysis) along the first axis."""
+        if self.dictionary is None:
+            import scipy.fft
+            return scipy.fft.dct(x, axis=0, norm='ortho')
+        return self.dictionary.analyze(x)
+
+
+class _KroneckerDCTAnalysisOperator:
+    """
+    Applies `Dict_kron.T @ np.kron(np.eye(kron_factor), F)` matrix-free, with `F` of shape (N, M).
+
+    Used for both the transpose (`F = Phi.T`) and the pseudoinverse (`F = pinv(Phi)`) of `KroneckerDCTOperator`,
+    whose `analyze` applies `Dict_kron.T`.
+    """
+
+    def __init__(self, F, kron_factor, operator):
+        self.F = F
+        self.kron_factor = kron_factor
+        self.operator = operator
+        self.shape = (F.shape[0] * kron_factor, F.shape[1] * kron_factor)
+
+    def __matmul__(self, y):
+        return self.operator.analyze(_apply_block_diagonal(self.F, self.kron_factor, y))
+
+
+def _apply_block_diagonal(F, kron_factor, x):
+    """
+    Returns `np.kron(np.eye(kron_factor), F) @ x` without building the Kronecker product.
+
+    `x` is either a vector of length `kron_factor * F.shape[1]` or a 2-D array with that many rows. `F` is a
+    dense array or an implicit operator supporting batched `@` (e.g. `DBDDOperator`).
+    """
+    x = np.asarray(x)
+    rows, cols = F.shape
+
+    # split every column in kron_factor consecutive pieces and apply F to each of them at once
+    x_blocks = x.reshape((kron_factor, cols) + x.shape[1:])  # (kron_factor, cols[, B])
+    if x.ndim == 1:
+        # (kron_factor, rows)
+        y_blocks = x_blocks @ F.T if isinstance(F, np.ndarray) else (F @ x_blocks.T).T
+    else:
+        y_blocks = F @ x_blocks  # (kron_factor, rows, B)
+
+    return y_blocks.reshape((kron_factor * rows,) + x.shape[1:])
@@ -1,6 +1,13 @@
+from collections import namedtuple
+
 import numpy as np
 
-def generate_DBDD_matrix(M, N):
+
+# entries of the binary matrices are (bit + BINARY_OFFSET) * scale, with scale 2 ('unscaled_binary', ±1) or
+# 1/sqrt(M) ('scaled_binary', ±0.5/sqrt(M))
+BINARY_OFFSET = -0.5
+
+def generate_DBDD_matrix(M, N, dtype=np.float64, implicit=False):
     """
     Generates a deterministic Diagonally Blocked Block Diagonal (DBBD) matrix.
 
@@ -12,10 +19,14 @@ def generate_DBDD_matrix(M, N):
         Number of rows in the matrix.
     N : int
         Number of columns in the matrix. Should be a multiple of M.
+    dtype : data-type, optional (default=np.float64)
+        The data type of the matrix, e.g. `np.float32` for the single precision mode.
+    implicit : bool, optional (default=False)
+        If True, a `DBDDOperator` is returned instead of the dense matrix.
 
     Returns
     -------
-    A : numpy.ndarray
+    A : numpy.ndarray or DBDDOperator
         The generated DBBD matrix of shape (M, N).
 
     Raises
@@ -34,8 +45,11 @@ def generate_DBDD_matrix(M, N):
 
     if N % M != 0:
         raise ValueError("N should be a multiple of M.")
+
+    if implicit:
+        return DBDDOperator(M, N, dtype)
     
-    Phi = np.zeros((M, N))
+    Phi = np.zeros((M, N), dtype=dtype)
     m = N // M
     
     for i in range(M):
@@ -44,7 +58,107 @@ def generate_DBDD_matrix(M, N):
     return Phi
 
 
-def generate_random_matrix(M, N, matrix_type='gaussian'):
+
+class DBDDOperator:
+    """
+    Implicit DBDD measurement matrix: row `i` sums the `N // M` consecutive samples `i*m` to `(i+1)*m - 1`.
+
+    The matrix is never stored. Applying it is a reshape followed by a sum over runs of `m = N // M` samples
+    (O(N) additions, no multiplications) and its transpose repeats every entry `m` times. Since the rows are
+    disjoint runs of ones, `Phi @ Phi.T = m * I` and the pseudoinverse has the closed form `Phi.T / m`, which
+    also gives `pinv(Phi @ Dict) = (Phi @ Dict).T / m` for the orthonormal DCT dictionary.
+
+    `compressSignal`, `RecoveryPlan` (and therefore the recovery functions), `KroneckerDCTOperator` and `SL0`
+    recognise it and use these shortcuts. `np.asarray(Phi)` gives the dense matrix of `generate_DBDD_matrix`.
+
+    Parameters
+    ----------
+    M : int
+        Number of rows in the matrix.
+    N : int
+        Number of columns in the matrix. Should be a multiple of M.
+    dtype : data-type, optional (default=np.float64)
+        The data type of the equivalent dense matrix.
+
+    Attributes
+    ----------
+    shape : tuple
+        `(M, N)`.
+    m : int
+        Number of samples summed by each row, `N // M`.
+
+    Raises
+    ------
+    ValueError
+        If `N` is not a multiple of `M`.
+    """
+
+    def __init__(self, M, N, dtype=np.float64):
+        if N % M != 0:
+            raise ValueError("N should be a multiple of M.")
+        self.shape = (int(M), int(N))
+        self.m = int(N) // int(M)
+        self.dtype = np.dtype(dtype)
+
+    def __matmul__(self, x):
+        # x is (N,), or (..., N, B) with the usual matmul broadcasting: sum every run of m rows
+        x = np.asarray(x)
+        M = self.shape[0]
+        if x.ndim == 1:
+            return x.reshape(M, self.m).sum(axis=1)
+        return x.reshape(x.shape[:-2] + (M, self.m, x.shape[-1])).sum(axis=-2)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.toarray().astype(self.dtype if dtype is None else dtype, copy=False)
+
+    def __eq__(self, other):
+        return isinstance(other, DBDDOperator) and self.shape == other.shape and self.dtype == other.dtype
+
+    def __hash__(self):
+        return hash((DBDDOperator, self.shape, self.dtype.str))
+
+    def __repr__(self):
+        return f"DBDDOperator(M={self.shape[0]}, N={self.shape[1]}, dtype={self.dtype.name})"
+
+    def astype(self, dtype):
+        """Returns the same operator with another data type."""
+        return DBDDOperator(*self.shape, dtype)
+
+    def toarray(self):
+        """Returns the dense matrix, as built by `generate_DBDD_matrix`."""
+        return generate_DBDD_matrix(*self.shape, dtype=self.dtype)
+
+    @property
+    def T(self):
+        """Transpose of the matrix, as an implicit operator repeating every entry `m` times."""
+        return _DBDDTransposeOperator(self)
+
+    def pinv(self):
+        """Returns the Moore-Penrose pseudoinverse `Phi.T / m` as an implicit operator, no SVD is computed."""
+        return _DBDDTransposeOperator(self, 1 / self.m)
+
+
+class _DBDDTransposeOperator:
+    """Applies `scale * Phi.T` of a `DBDDOperator` `Phi`: every entry is repeated `m` times."""
+
+    def __init__(self, Phi, scale=1):
+        self.Phi = Phi
+        self.scale = scale
+        self.shape = Phi.shape[::-1]
+
+    def __matmul__(self, y):
+        y = np.asarray(y)
+        x = np.repeat(y, self.Phi.m, axis=0 if y.ndim == 1 else -2)
+        if self.scale != 1:
+            x *= self.scale
+        return x
+
+    def __array__(self, dtype=None, copy=None):
+        dense = self.scale * self.Phi.toarray().T
+        return dense.astype(self.Phi.dtype if dtype is None else dtype, copy=False)
+
+
+def generate_random_matrix(M, N, matrix_type='gaussian', dtype=np.float64, seed=None, packed=False):
     """
     Generates a random matrix based on the specified type.
 
@@ -59,16 +173,30 @@ def generate_random_matrix(M, N, matrix_type='gaussian'):
         - 'gaussian': A matrix with entries drawn from a normal distribution scaled by 1/M.
         - 'scaled_binary': A matrix with binary entries (±0.5), scaled by 1/sqrt(M).
         - 'unscaled_binary': A matrix with binary entries (±1), with no scaling.
+    dtype : data-type, optional (default=np.float64)
+        The data type of the matrix, e.g. `np.float32` for the single precision mode.
+    seed : int or numpy.random.Generator, optional
+        If provided, the entries are drawn from `np.random.default_rng(seed)` instead of the global `np.random`
+        state, so the same `(matrix_type, M, N, seed)` always gives the same matrix (see `MatrixSpec`).
+    packed : bool, optional (default=False)
+        For the binary types only: return a `PackedBinaryMatrix`, storing one bit per entry, instead of the
+        dense matrix. Without `seed` the bits are drawn from a fresh `np.random.default_rng()`.
 
     Returns
     -------
-    A : numpy.ndarray
+    A : numpy.ndarray or PackedBinaryMatrix
         The generated random matrix of shape (M, N).
 
     Raises
     ------
     ValueError
-        If `matrix_type` is not one of the supported types.
+        If `matrix_type` is not one of the supported types, or if `packed` is requested for 'gaussian'.
+
+    Notes
+    -----
+    With `seed` (or `packed`), binary matrices are generated as packed bits, 8 entries per random byte, and
+    unpacked: the dense and packed matrices of the same seed are identical. They differ from the matrices drawn
+    from the global state (`np.random.binomial`), which are kept as they were for reproducibility of older runs.
 
     Example
     -------
@@ -84,6 +212,21 @@ def generate_random_matrix(M, N, matrix_type='gaussian'):
     array([[ 1., -1.,  1.],
            [-1.,  1., -1.]])
     """
+    if seed is not None or packed:
+        if matrix_type not in ('gaussian', 'scaled_binary', 'unscaled_binary'):
+            raise ValueError("Unsupported matrix type. Choose either 'gaussian', 'scaled_binary', or 'unscaled_binary'.")
+        if packed and matrix_type == 'gaussian':
+            raise ValueError("Only 'scaled_binary' and 'unscaled_binary' matrices can be packed.")
+
+        rng = np.random.default_rng(seed)
+        if matrix_type == 'gaussian':
+            return (((1/M)**2) * rng.standard_normal((M, N))).astype(dtype, copy=False)
+
+        bits = rng.integers(0, 256, size=(M, (N + 7) // 8), dtype=np.uint8)
+        scale = 2 if matrix_type == 'unscaled_binary' else 1/np.sqrt(M)
+        A = PackedBinaryMatrix(bits, N, scale, dtype)
+        return A if packed else A.toarray()
+
     if matrix_type == 'gaussian':
         A = ((1/M)**2) * np.random.randn(M, N)
 
@@ -97,4 +240,122 @@ def generate_random_matrix(M, N, matrix_type='gaussian'):
     else:
         raise ValueError("Unsupported matrix type. Choose either 'gaussian', 'scaled_binary', or 'unscaled_binary'.")
 
-    return A
\ No newline at end of file
+    return A.astype(dtype, copy=False)
+
+
+class PackedBinaryMatrix:
+    """
+    Bit-packed binary measurement matrix, one bit per entry instead of 64.
+
+    Entry `(i, j)` is `(bit(i, j) - 0.5) * scale`, i.e. ±1 for `scale=2` ('unscaled_binary') and ±0.5/sqrt(M)
+    for `scale=1/sqrt(M)` ('scaled_binary'). Instances are returned by `generate_random_matrix(..., packed=True)`
+    and `MatrixSpec.packed`.
+
+    `np.asarray(A)` (and therefore `compressSignal` and the recovery functions) gives the dense matrix. `A @ x`
+    is computed without it, unpacking at most `row_chunk` rows at a time, so products with very large (e.g.
+    Kronecker-scale) matrices stay within a bounded amount of memory.
+
+    Parameters
+    ----------
+    bits : numpy.ndarray
+        The packed bits, an array of `np.uint8` of shape (M, ceil(N / 8)), as returned by `np.packbits(axis=1)`.
+    N : int
+        Number of columns of the matrix.
+    scale : float
+        Scale of the entries, see above.
+    dtype : data-type, optional (default=np.float64)
+        The data type of the dense matrix and of the products.
+
+    Attributes
+    ----------
+    shape : tuple
+        `(M, N)`.
+    nbytes : int
+        Memory used by the packed bits.
+    """
+
+    # rows unpacked at once by `@`
+    row_chunk = 1024
+
+    def __init__(self, bits, N, scale, dtype=np.float64):
+        self.bits = np.ascontiguousarray(bits, dtype=np.uint8)
+        self.shape = (self.bits.shape[0], int(N))
+        self.scale = scale
+        self.dtype = np.dtype(dtype)
+        if self.bits.shape[1] != (self.shape[1] + 7) // 8:
+            raise ValueError(f"bits must have {(self.shape[1] + 7) // 8} columns for N={N}, got {self.bits.shape[1]}.")
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def toarray(self, start=0, stop=None):
+        """Returns the dense matrix, or only its rows `start` to `stop` (excluded)."""
+        rows = np.unpackbits(self.bits[start:stop], axis=1, count=self.shape[1]).astype(self.dtype)
+        rows += BINARY_OFFSET
+        rows *= self.scale
+        return rows
+
+    def __array__(self, dtype=None, copy=None):
+        return self.toarray().astype(self.dtype if dtype is None else dtype, copy=False)
+
+    def __matmul__(self, x):
+        x = np.asarray(x)
+        M = self.shape[0]
+        out = np.empty((M,) + x.shape[1:], dtype=np.result_type(self.dtype, x.dtype))
+        for start in range(0, M, self.row_chunk):
+            stop = min(start + self.row_chunk, M)
+            out[start:stop] = self.toarray(start, stop) @ x
+        return out
+
+    def __repr__(self):
+        return f"PackedBinaryMatrix(M={self.shape[0]}, N={self.shape[1]}, scale={self.scale}, dtype={self.dtype.name})"
+
+
+class MatrixSpec(namedtuple('MatrixSpec', ['matrix_type', 'M', 'N', 'seed'])):
+    """
+    Reproducible description `(matrix_type, M, N, seed)` of a measurement matrix.
+
+    The matrix is regenerated bit-exactly from the spec with `np.random.Generator` (see `generate_random_matrix`),
+    so sharing the spec is enough to share the matrix: a decoder only needs the seed. `matrix_type` is one of
+    'gaussian', 'scaled_binary', 'unscaled_binary' or 'DBDD' (deterministic, `seed` is ignored).
+
+    Specs can be passed wherever a measurement matrix `Phi` is expected (`compressSignal`, the recovery
+    functions, `RecoveryPlan`, `get_recovery_plan`). Recovery plans are then cached by the spec itself, without
+    hashing the matrix, and 'DBDD' specs use the implicit `DBDDOperator` (O(N) sampling, closed-form
+    pseudoinverse).
+
+    Example
+    -------
+    >>> spec = MatrixSpec('unscaled_binary', 4, 16, seed=42)
+    >>> Y = compressSignal(signal, spec)
+    >>> x_hat = kron_recovery(Y, sigma_min, spec, kron_factor)  # e.g. on another machine
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, matrix_type, M, N, seed=None):
+        if matrix_type not in ('gaussian', 'scaled_binary', 'unscaled_binary', 'DBDD'):
+            raise ValueError("Unsupported matrix type. Choose either 'gaussian', 'scaled_binary', "
+                             "'unscaled_binary' or 'DBDD'.")
+        if matrix_type != 'DBDD' and not isinstance(seed, (int, np.integer)):
+            raise ValueError("A MatrixSpec of a random matrix needs an integer seed.")
+        seed = None if seed is None or matrix_type == 'DBDD' else int(seed)
+        return super().__new__(cls, matrix_type, int(M), int(N), seed)
+
+    @property
+    def shape(self):
+        return (self.M, self.N)
+
+    def generate(self, dtype=np.float64, implicit=False):
+        """
+        Returns the dense matrix described by the spec. With `implicit`, a 'DBDD' spec gives a `DBDDOperator`
+        instead (the random types are always dense), as used by `compressSignal` and `RecoveryPlan`.
+        """
+        if self.matrix_type == 'DBDD':
+            return generate_DBDD_matrix(self.M, self.N, dtype, implicit=implicit)
+        return generate_random_matrix(self.M, self.N, self.matrix_type, dtype, seed=self.seed)
+
+    def packed(self, dtype=np.float64):
+        """Returns the binary matrix described by the spec as a `PackedBinaryMatrix`."""
+        return generate_random_matrix(self.M, self.N, self.matrix_type, dtype, seed=self.seed, packed=True)
@@ -0,0 +1,216 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .recoveryPlan import RecoveryPlan, get_recovery_plan  # Importing from recoveryPlan.py
+from .instrumentation import phase  # Importing from instrumentation.py
+
+
+# environment variables read by the common BLAS/OpenMP runtimes when they are loaded
+_BLAS_THREAD_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                     'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+# state of a worker process, set once by `_init_worker`
+_worker = {}
+
+
+def parallel_recovery(Y, sigma_min, Phi, kron_factor=None, workers=None, sigma_decrease_factor=0.5, mu_0=2, L=3,
+                      pinv_method='pinv', tasks_per_worker=4, dtype=np.float64, tol=None, warm_start=False,
+                      metrics=None, dictionary='dct'):
+    """
+    Performs the (Kronecker or non-Kronecker) recovery phase on a pool of worker processes.
+
+    The blocks (or Kronecker groups) of `Y` are independent problems, so `Y` is split in contiguous ranges of
+    columns that are recovered by a `ProcessPoolExecutor`. With `warm_start`, the ranges are made of whole
+    warm-start chains of the plan (see `RecoveryPlan.solve`), so every block gets the same seed as in a serial
+    recovery. The measurements `Y`, the recovered signal and the
+    precomputed projection operator of the plan live in `multiprocessing.shared_memory` blocks: they are never
+    pickled, each task only receives the range of groups it has to solve.
+
+    Parameters
+    ----------
+    Y : numpy.ndarray
+        A 2D array of shape (M, BLOCK_NUM), where each column represents a compressed block of the original signal,
+        or a 3D array of shape (leads, M, BLOCK_NUM) holding several leads, recovered together.
+
+    sigma_min : float
+        The minimum value for the smoothing parameter sigma in the SL0 algorithm.
+
+    Phi : numpy.ndarray
+        The measurement matrix of shape (M, N) used for compressing the original signal blocks.
+
+    kron_factor : int, optional
+        The Kronecker factor. If None (default), the non-Kronecker recovery is performed.
+
+    workers : int, optional
+        The number of worker processes. Defaults to `os.cpu_count()`.
+
+    sigma_decrease_factor, mu_0, L, tol, warm_start : optional
+        SL0 parameters, same as in `non_kron_recovery` and `kron_recovery`.
+
+    pinv_method : str, optional (default='pinv')
+        How the projection operator is built, see `RecoveryPlan`.
+
+    dictionary : str, optional (default='dct')
+        The sparsifying dictionary, 'dct' or a wavelet name, see `RecoveryPlan`.
+
+    tasks_per_worker : int, optional (default=4)
+        Number of ranges of groups per worker, a few tasks per worker balance the load between processes.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of the plan, of the shared arrays and of the SL0 iterations.
+
+    metrics : RecoveryMetrics, optional
+        Receives the plan build phases and the wall time of the whole pool as 'solve'. The workers do not report
+        per-block measurements.
+
+    Returns
+    -------
+    x_hat : numpy.ndarray
+        A 1D array containing the recovered signal (2D, of shape (leads, samples), for multi-lead `Y`), identical
+        to the output of `non_kron_recovery` (or `kron_recovery`) on the same inputs.
+
+    Notes
+    -----
+    - The plan is built (or taken from the cache) once in the calling process. Workers rebuild it from `Phi`
+      and the shared projection array, no pseudoinverse or factorization is recomputed.
+    - Each worker is pinned to one BLAS thread, the per-block products are too small to benefit from more and
+      several multi-threaded workers would oversubscribe the cores. Workers are started with the 'spawn'
+      method with the BLAS thread variables set to 1, and `threadpoolctl` is used as well if it is installed.
+    - As with any process pool using 'spawn', the calling script must guard its entry point with
+      `if __name__ == "__main__":`.
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    plan = get_recovery_plan(Phi, kron_factor, pinv_method=pinv_method, dtype=dtype, metrics=metrics,
+                             dictionary=dictionary, sigma_min=sigma_min,
+                             sigma_decrease_factor=sigma_decrease_factor, mu_0=mu_0, L=L,
+                             tol=tol, warm_start=warm_start)
+
+    group = 1 if kron_factor is None else kron_factor  # blocks solved together
+
+    Y = np.asarray(Y)
+    multi_lead = Y.ndim == 3
+    if multi_lead:
+        # the whole (KRONECKER) groups of every lead, one lead after the other
+        LEADS, _, LEAD_BLOCK_NUM = Y.shape
+        used = LEAD_BLOCK_NUM // group * group
+        Y = np.concatenate(list(Y[:, :, :used]), axis=1)
+
+    BLOCK_NUM = Y.shape[1]  # number of blocks
+    GROUP_NUM = BLOCK_NUM // group  # number of (KRONECKER) groups
+    N = plan.n_block * BLOCK_NUM  # length of ORIGINAL signal
+
+    projection, projection_method = plan.projection_state()
+
+    shared = []
+    try:
+        Y_shm, _ = _share(np.ascontiguousarray(Y, dtype=plan.dtype), shared)
+        projection_shm, _ = _share(np.asarray(projection), shared)
+        x_hat_shm, x_hat = _share(np.zeros(N, dtype=plan.dtype), shared)
+
+        # contiguous ranges of groups, a few per worker
+        if warm_start:
+            # whole warm-start chains (the same as a serial recovery), so that no chain is cut between tasks
+            chains = plan.warm_start_chains([GROUP_NUM // LEADS] * LEADS if multi_lead else [GROUP_NUM])
+            task_num = max(min(len(chains) - 1, workers * tasks_per_worker), 1)
+            bounds = chains[np.linspace(0, len(chains) - 1, task_num + 1).astype(int)]
+            tasks = [(int(a), int(b), chains[(chains >= a) & (chains <= b)] - a)
+                     for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        else:
+            task_num = max(min(GROUP_NUM, workers * tasks_per_worker), 1)
+            bounds = np.linspace(0, GROUP_NUM, task_num + 1).astype(int)
+            tasks = [(int(a), int(b), None) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+        init_args = (plan.Phi, kron_factor, plan.pinv_method, plan.dictionary, projection_method, plan.schedule,
+                     Y_shm, projection_shm, x_hat_shm)
+
+        with _single_threaded_blas_env(), phase(metrics, 'solve'):
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=init_args) as executor:
+                for _ in executor.map(_recover_range, tasks):
+                    pass
+
+        if not multi_lead:
+            return x_hat.copy()
+
+        x_hat_leads = np.zeros((LEADS, plan.n_block * LEAD_BLOCK_NUM), dtype=plan.dtype)
+        x_hat_leads[:, :plan.n_block * used] = x_hat.reshape(LEADS, -1)
+        return x_hat_leads
+
+    finally:
+        for shm in shared:
+            shm.close()
+            shm.unlink()
+
+
+def _share(array, shared):
+    """
+    Copies `array` into a new shared memory block, appended to `shared`. Returns the `(name, shape, dtype)`
+    descriptor passed to the workers and the shared array.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared.append(shm)
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return (shm.name, array.shape, array.dtype.str), view
+
+
+def _attach(descriptor):
+    """Attaches to a shared memory block created by `_share` and returns it with its array view."""
+    name, shape, dtype = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+@contextmanager
+def _single_threaded_blas_env():
+    """Sets the BLAS thread variables to 1 in `os.environ`, so that spawned workers inherit them."""
+    saved = {var: os.environ.get(var) for var in _BLAS_THREAD_VARS}
+    os.environ.update({var: '1' for var in _BLAS_THREAD_VARS})
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def _init_worker(Phi, kron_factor, pinv_method, dictionary, projection_method, schedule, Y_shm, projection_shm,
+                 x_hat_shm):
+    """Worker initializer: limits BLAS to one thread, attaches the shared arrays and rebuilds the plan."""
+    try:
+        from threadpoolctl import threadpool_limits
+        _worker['blas_limits'] = threadpool_limits(limits=1)
+    except ImportError:
+        pass
+
+    handles = []
+    for name, descriptor in (('Y', Y_shm), ('projection', projection_shm), ('x_hat', x_hat_shm)):
+        shm, _worker[name] = _attach(descriptor)
+        handles.append(shm)
+    _worker['handles'] = handles  # keep the shared memory blocks open for the lifetime of the worker
+
+    _worker['plan'] = RecoveryPlan.from_projection(Phi, kron_factor, _worker['projection'], projection_method,
+                                                   pinv_method=pinv_method, dictionary=dictionary, **schedule)
+    _worker['group'] = 1 if kron_factor is None else kron_factor
+
+
+def _recover_range(task):
+    """
+    Recovers groups `start` to `stop` (excluded) of `task = (start, stop, chains)` and writes them in the shared
+    output signal, `chains` being the warm-start chains of the range (None without warm start).
+    """
+    start, stop, chains = task
+    plan, group = _worker['plan'], _worker['group']
+
+    Y = _worker['Y'][:, start*group:stop*group]
+    _worker['x_hat'][start*plan.block_size:stop*plan.block_size] = plan.recover(Y, chains=chains)
@@ -0,0 +1,198 @@
+import itertools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .measurementMatrix import MatrixSpec  # Importing from measurementMatrix.py
+from .samplingPhase import compressSignal  # Importing from samplingPhase.py
+from .recoveryPlan import get_recovery_plan  # Importing from recoveryPlan.py
+from .evaluation import calculate_snr  # Importing from evaluation.py
+from .parallelRecovery import _share, _attach, _single_threaded_blas_env  # Importing from parallelRecovery.py
+
+
+# parameters fixing the measurement matrix and the recovery plan (dictionary, Theta and its pseudoinverse)
+PLAN_PARAMETERS = ('matrix_type', 'seed', 'n_block', 'CR', 'kron_factor', 'dictionary')
+
+# parameters of the SL0 sigma schedule, changing them reuses the plan
+SCHEDULE_PARAMETERS = ('sigma_min', 'sigma_decrease_factor', 'mu_0', 'L', 'tol', 'warm_start')
+
+# values of the parameters missing from the grid
+SWEEP_DEFAULTS = {
+    'matrix_type': 'DBDD',
+    'seed': 0,
+    'n_block': 16,
+    'CR': 1/4,
+    'kron_factor': None,
+    'dictionary': 'dct',
+    'sigma_min': 0.004,
+    'sigma_decrease_factor': 0.5,
+    'mu_0': 2,
+    'L': 3,
+    'tol': None,
+    'warm_start': False,
+}
+
+# state of a worker process, set once by `_init_worker`
+_worker = {}
+
+
+def parameter_sweep(signal, grid, workers=None, dtype=np.float64):
+    """
+    Recovers `signal` for every combination of the parameters of `grid` and returns the SNR and timings as a table.
+
+    Configurations sharing the measurement matrix, `kron_factor` and `dictionary` form a group: its matrix is
+    generated, the signal is compressed and the `RecoveryPlan` (dictionary, Theta and pseudoinverse) is built once,
+    then every sigma schedule of the group (`sigma_min`, `sigma_decrease_factor`, `mu_0`, `L`, `tol`, `warm_start`)
+    is run on the same plan through `RecoveryPlan.with_schedule`. Groups are independent and can be run in
+    parallel worker processes.
+
+    Parameters
+    ----------
+    signal : numpy.ndarray
+        The signal to compress and recover, 1-D or (leads, samples) (see `compressSignal`).
+
+    grid : dict
+        Maps parameter names to a list of values (a single value is also accepted). The parameters are
+        'matrix_type' (a `MatrixSpec` type), 'seed' (of the random matrices), 'n_block', 'CR' (the compressed
+        block size is `int(n_block * CR)`), 'kron_factor' (None for non-Kronecker recovery), 'dictionary' and the
+        SL0 parameters 'sigma_min', 'sigma_decrease_factor', 'mu_0', 'L', 'tol' and 'warm_start'. Missing
+        parameters take their value from `SWEEP_DEFAULTS`.
+
+    workers : int, optional
+        If greater than 1, the groups are run by that many worker processes (started with 'spawn', sharing
+        `signal` through shared memory, one BLAS thread each). If None (default), they are run in this process.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of the sampling and of the recovery.
+
+    Returns
+    -------
+    results : pandas.DataFrame
+        One row per configuration, in the order of the grid, with the parameters, the group index, the compressed
+        block size 'M', the number of recovered samples per lead 'samples', 'snr_db' (computed on the recovered
+        samples), and the wall times 'sampling_time_s' and 'plan_time_s' (shared by the configurations of the
+        group) and 'recovery_time_s' (SL0 and synthesis of this configuration).
+
+    Raises
+    ------
+    ValueError
+        If `grid` has an unknown parameter or a configuration has no compressed samples.
+
+    Example
+    -------
+    >>> results = parameter_sweep(signal, {'n_block': [16, 32], 'kron_factor': [None, 8, 32],
+    ...                                    'sigma_min': [0.001, 0.004], 'L': [3, 5]}, workers=4)
+    >>> results.pivot_table(index='kron_factor', columns='L', values='snr_db', dropna=False)
+
+    Notes
+    -----
+    - Like `parallel_recovery`, with `workers` the calling script must guard its entry point with
+      `if __name__ == "__main__":`.
+    - Timings of concurrent groups are measured while the other workers are running, compare them within a sweep.
+    """
+    import pandas as pd  # only needed for the results table
+
+    configs = _expand_grid(grid)
+    groups = {}
+    for index, config in enumerate(configs):
+        spec = MatrixSpec(config['matrix_type'], config['M'], config['n_block'], config['seed'])
+        groups.setdefault((spec, config['kron_factor'], config['dictionary']), []).append(index)
+
+    tasks = [(group_index, key, [(index, _schedule(configs[index])) for index in indices])
+             for group_index, (key, indices) in enumerate(groups.items())]
+
+    rows = [None] * len(configs)
+    if workers is None or workers <= 1 or len(tasks) == 1:
+        for task in tasks:
+            for index, row in _run_group(signal, dtype, *task):
+                rows[index] = row
+    else:
+        shared = []
+        try:
+            signal_shm, _ = _share(np.ascontiguousarray(signal), shared)
+            with _single_threaded_blas_env():
+                with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                         mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_init_worker, initargs=(signal_shm, dtype)) as executor:
+                    futures = [executor.submit(_run_group_worker, *task) for task in tasks]
+                    for future in as_completed(futures):
+                        for index, row in future.result():
+                            rows[index] = row
+        finally:
+            for shm in shared:
+                shm.close()
+                shm.unlink()
+
+    return pd.DataFrame([dict(config, **row) for config, row in zip(configs, rows)])
+
+
+def _expand_grid(grid):
+    """Returns the list of configurations (dicts with every parameter and 'M') of the grid."""
+    unknown = set(grid) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+
+    values = {name: grid.get(name, default) for name, default in SWEEP_DEFAULTS.items()}
+    values = {name: list(value) if isinstance(value, (list, tuple, np.ndarray)) else [value]
+              for name, value in values.items()}
+
+    configs = []
+    for combination in itertools.product(*values.values()):
+        config = dict(zip(values, combination))
+        config['M'] = int(config['n_block'] * config['CR'])
+        if config['M'] < 1:
+            raise ValueError(f"n_block={config['n_block']} and CR={config['CR']} give no compressed samples.")
+        configs.append(config)
+    return configs
+
+
+def _schedule(config):
+    return {name: config[name] for name in SCHEDULE_PARAMETERS}
+
+
+def _run_group(signal, dtype, group_index, key, schedules):
+    """Runs the configurations of one group on a shared sampling and plan, returns `(index, row)` pairs."""
+    spec, kron_factor, dictionary = key
+
+    start = time.perf_counter()
+    Y = compressSignal(signal, spec, dtype=dtype)
+    sampling_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    plan = get_recovery_plan(spec, kron_factor, dtype=dtype, dictionary=dictionary)
+    plan_time = time.perf_counter() - start
+
+    # samples of each lead covered by whole (Kronecker) blocks, the others are not recovered
+    group = 1 if kron_factor is None else kron_factor
+    samples = Y.shape[-1] // group * group * spec.N
+    x = np.asarray(signal)[..., :samples]
+
+    rows = []
+    for index, schedule in schedules:
+        start = time.perf_counter()
+        x_hat = plan.with_schedule(**schedule).recover(Y)
+        recovery_time = time.perf_counter() - start
+
+        snr = calculate_snr(x, x_hat[..., :samples]) if samples > 0 else np.nan
+        rows.append((index, {'group': group_index, 'samples': samples, 'snr_db': float(snr),
+                             'sampling_time_s': sampling_time, 'plan_time_s': plan_time,
+                             'recovery_time_s': recovery_time}))
+    return rows
+
+
+def _init_worker(signal_shm, dtype):
+    """Worker initializer: limits BLAS to one thread and attaches the shared signal."""
+    try:
+        from threadpoolctl import threadpool_limits
+        _worker['blas_limits'] = threadpool_limits(limits=1)
+    except ImportError:
+        pass
+
+    _worker['handle'], _worker['signal'] = _attach(signal_shm)  # keep the shared memory block open
+    _worker['dtype'] = dtype
+
+
+def _run_group_worker(group_index, key, schedules):
+    return _run_group(_worker['signal'], _worker['dtype'], group_index, key, schedules)
@@ -0,0 +1,231 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .measurementMatrix import MatrixSpec  # Importing from measurementMatrix.py
+from .recoveryPlan import get_recovery_plan  # Importing from recoveryPlan.py
+from .sparseSignalGenerator import sparse_signal_batch  # Importing from sparseSignalGenerator.py
+from .qualityMetrics import metrics_from_energies  # Importing from qualityMetrics.py
+from .parallelRecovery import _single_threaded_blas_env  # Importing from parallelRecovery.py
+from .records import _write_atomic  # Importing from records.py
+
+
+def phase_transition(delta, rho, noise=(0.0,), kron_factor=(None,), trials=100, n_block=16, matrix_type='gaussian',
+                     seed=0, sigma_min=0.001, success_snr_db=20.0, batch_size=1024, workers=None, checkpoint=None,
+                     checkpoint_interval=30.0, dtype=np.float64, **schedule):
+    """
+    Monte Carlo phase transition of SL0 recovery, with and without the Kronecker technique: the probability of
+    successful recovery and the mean SNR over a grid of undersampling, sparsity, noise and Kronecker factor.
+
+    This is the Python counterpart of the MATLAB study (`sparseSigGen4plusNoise.m`, `Kronecker_Recovery_CS.m`).
+    For each cell of the grid, `trials` random K-sparse coefficient vectors `s` of length `N = n_block *
+    kron_factor` are drawn (as `sparseSigGen4plusNoise`: unit-variance active components, Gaussian noise of
+    standard deviation `noise` on the inactive ones), measured as `y = Theta @ s` with the `Theta` of the recovery
+    plan (`(I ⊗ Phi) @ Dict_kron` for Kronecker recovery, `Phi @ Dict` otherwise) and recovered by SL0. A trial
+    succeeds if the SNR of the recovered coefficients reaches `success_snr_db`.
+
+    All the trials of the cells sharing `Phi` and `kron_factor` (every `rho` and `noise`) are solved by batched
+    SL0 calls on one cached `RecoveryPlan`, `batch_size` trials of each cell at a time. These batches are the
+    tasks of the engine: they are independent (each one draws from its own seeded Generator, so results do not
+    depend on the order or process they run in), can run in parallel worker processes and are checkpointed.
+
+    Parameters
+    ----------
+    delta : sequence of float
+        Undersampling ratios M/N: `Phi` has `round(delta * n_block)` rows (at least 1).
+
+    rho : sequence of float
+        Sparsity ratios K/M: each signal has `round(rho * M_total)` active components, where `M_total` is the number
+        of measurements of a (Kronecker) block, at least 1 and at most N.
+
+    noise : sequence of float, optional (default=(0.0,))
+        Standard deviations of the noise on the inactive components (`sigma_off` of `sparseSigGen4plusNoise`).
+
+    kron_factor : sequence of int or None, optional (default=(None,))
+        Kronecker factors, None (or 1) for non-Kronecker recovery of single blocks.
+
+    trials : int, optional (default=100)
+        Number of trials of each cell.
+
+    n_block : int, optional (default=16)
+        The block size, i.e. the number of columns of `Phi`.
+
+    matrix_type : str, optional (default='gaussian')
+        The type of `Phi` (see `MatrixSpec`), one matrix per `delta` drawn from `seed`.
+
+    seed : int, optional (default=0)
+        Seed of the measurement matrices and of the signals.
+
+    sigma_min : float, optional (default=0.001)
+        The SL0 `sigma_min`.
+
+    success_snr_db : float, optional (default=20.0)
+        The SNR (in dB) of the recovered coefficients above which a trial is a success.
+
+    batch_size : int, optional (default=1024)
+        Number of trials of each cell drawn and solved per task.
+
+    workers : int, optional
+        If greater than 1, the tasks are run by that many worker processes (started with 'spawn', one BLAS thread
+        each). If None (default), they are run in this process.
+
+    checkpoint : str or os.PathLike, optional
+        Path of a .npz file where the partial results are saved (at most every `checkpoint_interval` seconds and
+        at the end). If it already exists, the tasks it records as done are skipped, so an interrupted run
+        resumes where it stopped.
+
+    checkpoint_interval : float, optional (default=30.0)
+        Minimum number of seconds between two checkpoint saves.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of the plans and of the SL0 iterations.
+
+    **schedule
+        Other SL0 parameters for `RecoveryPlan.with_schedule`: `sigma_decrease_factor`, `mu_0`, `L`, `tol`.
+
+    Returns
+    -------
+    result : dict
+        The grid ('delta', 'rho', 'noise', 'kron_factor', with 0 for non-Kronecker recovery), the sizes 'M'
+        (rows of `Phi` per delta) and 'K' (active components per delta, rho and kron_factor), and the surfaces of
+        shape (len(delta), len(rho), len(noise), len(kron_factor)): 'success' (probability of success), 'snr_db'
+        (mean SNR of the trials) and 'trials' (trials run per cell).
+
+    Raises
+    ------
+    ValueError
+        If `checkpoint` was written for different parameters.
+
+    Example
+    -------
+    >>> result = phase_transition(delta=np.linspace(0.125, 1, 8), rho=np.linspace(0.05, 1, 20),
+    ...                           kron_factor=[None, 8, 32], trials=1000, workers=8, checkpoint='pt.npz')
+    >>> plt.imshow(result['success'][:, :, 0, 2].T, origin='lower')  # success of kron_factor=32
+    """
+    delta = np.atleast_1d(np.asarray(delta, dtype=np.float64))
+    rho = np.atleast_1d(np.asarray(rho, dtype=np.float64))
+    noise = np.atleast_1d(np.asarray(noise, dtype=np.float64))
+    kron_factors = [1 if k is None else int(k) for k in np.atleast_1d(np.asarray(kron_factor, dtype=object))]
+
+    M = np.maximum(np.rint(delta * n_block).astype(int), 1)
+    K = np.clip(np.rint(rho[np.newaxis, :, np.newaxis] * (M[:, np.newaxis, np.newaxis] * kron_factors)),
+                1, n_block * np.array(kron_factors)).astype(int)  # (delta, rho, kron_factor)
+
+    shape = (len(delta), len(rho), len(noise), len(kron_factors))
+    result = {
+        'delta': delta, 'rho': rho, 'noise': noise, 'M': M, 'K': K,
+        'kron_factor': np.array([k if k > 1 else 0 for k in kron_factors]),
+        'successes': np.zeros(shape, dtype=np.int64), 'snr_sum': np.zeros(shape),
+        'trials': np.zeros(shape, dtype=np.int64),
+    }
+
+    # one task per (delta, kron_factor, batch of trials)
+    batches = -(-trials // batch_size)
+    tasks = [(i, j, b, min(batch_size, trials - b * batch_size))
+             for j in range(len(kron_factors)) for i in range(len(delta)) for b in range(batches)]
+    done = np.zeros(len(tasks), dtype=bool)
+
+    config = json.dumps({'delta': delta.tolist(), 'rho': rho.tolist(), 'noise': noise.tolist(),
+                         'kron_factor': kron_factors, 'trials': trials, 'n_block': n_block,
+                         'matrix_type': matrix_type, 'seed': seed, 'sigma_min': sigma_min,
+                         'success_snr_db': success_snr_db, 'batch_size': batch_size,
+                         'dtype': np.dtype(dtype).str, 'schedule': schedule}, sort_keys=True)
+    if checkpoint is not None and os.path.exists(checkpoint):
+        with np.load(checkpoint) as saved:
+            if str(saved['config']) != config:
+                raise ValueError(f"Checkpoint {checkpoint} was written for different parameters.")
+            done = saved['done']
+            for name in ('successes', 'snr_sum', 'trials'):
+                result[name] = saved[name]
+
+    arguments = (n_block, matrix_type, seed, noise, sigma_min, success_snr_db, dtype, schedule)
+
+    def task_arguments(task):
+        i, j, b, count = task
+        return (i, j, b, count, int(M[i]), K[i, :, j], kron_factors[j]) + arguments
+    pending = [(index, task) for index, task in enumerate(tasks) if not done[index]]
+    last_save = time.perf_counter()
+
+    def collect(index, task, successes, snr_sum):
+        nonlocal last_save
+        i, j, _, count = task
+        result['successes'][i, :, :, j] += successes
+        result['snr_sum'][i, :, :, j] += snr_sum
+        result['trials'][i, :, :, j] += count
+        done[index] = True
+        if checkpoint is not None and time.perf_counter() - last_save >= checkpoint_interval:
+            _save_checkpoint(checkpoint, config, done, result)
+            last_save = time.perf_counter()
+
+    if workers is None or workers <= 1 or len(pending) <= 1:
+        for index, task in pending:
+            collect(index, task, *_run_task(*task_arguments(task)))
+    else:
+        with _single_threaded_blas_env():
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker) as executor:
+                futures = {executor.submit(_run_task, *task_arguments(task)): (index, task)
+                           for index, task in pending}
+                for future in as_completed(futures):
+                    collect(*futures[future], *future.result())
+
+    if checkpoint is not None:
+        _save_checkpoint(checkpoint, config, done, result)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'delta': result['delta'], 'rho': result['rho'], 'noise': result['noise'],
+            'kron_factor': result['kron_factor'], 'M': result['M'], 'K': result['K'],
+            'success': result['successes'] / result['trials'],
+            'snr_db': result['snr_sum'] / result['trials'],
+            'trials': result['trials'],
+        }
+
+
+def _run_task(i, j, b, count, M, K, kron_factor, n_block, matrix_type, seed, noise, sigma_min, success_snr_db,
+              dtype, schedule):
+    """
+    Runs batch `b` (`count` trials) of every (rho, noise) cell of delta `i` and kron_factor `j`, with `M` rows of
+    `Phi` and `K[r]` active components for rho `r`. Returns the number of successes and the sum of the SNRs of
+    each cell, arrays of shape (len(rho), len(noise)).
+    """
+    spec = MatrixSpec(matrix_type, M, n_block, seed)
+    plan = get_recovery_plan(spec, None if kron_factor == 1 else kron_factor, dtype=dtype, sigma_min=sigma_min,
+                             **schedule)
+    N = n_block * kron_factor
+
+    # the same batch always draws the same signals, wherever and whenever it runs
+    rng = np.random.default_rng([seed, i, j, b])
+    S = np.empty((len(K), len(noise), count, N), dtype=dtype)
+    for r, k in enumerate(K):
+        for n, sigma_inactive in enumerate(noise):
+            S[r, n] = sparse_signal_batch(count, N, k, sigma_inactive=sigma_inactive, sigma_active=1.0, seed=rng,
+                                          dtype=dtype)[0]
+    S = S.reshape(-1, N).T  # one trial per column
+
+    S_hat = plan.solve(plan.Theta @ S)
+
+    error = S_hat - S
+    snr = metrics_from_energies(np.einsum('ij,ij->j', S, S), np.einsum('ij,ij->j', error, error))['snr_db']
+    snr = snr.reshape(len(K), len(noise), count)
+    return (snr >= success_snr_db).sum(axis=2), snr.sum(axis=2)
+
+
+def _init_worker():
+    """Worker initializer: limits BLAS to one thread."""
+    try:
+        from threadpoolctl import threadpool_limits
+        _init_worker.blas_limits = threadpool_limits(limits=1)
+    except ImportError:
+        pass
+
+
+def _save_checkpoint(path, config, done, result):
+    """Writes the partial results to `path` atomically (unique temporary file, then rename)."""
+    _write_atomic(os.fspath(path), 'wb', lambda f: np.savez(f, config=np.array(config), done=done,
+                                                            successes=result['successes'],
+                                                            snr_sum=result['snr_sum'], trials=result['trials']))
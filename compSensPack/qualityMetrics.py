@@ -0,0 +1,171 @@
+import numpy as np
+
+
+def block_metrics(signal, recovered_signal, n_block, kron_factor=None):
+    """
+    Computes the SNR, PRD and NMSE of every block (or Kronecker group) of a recovered signal in one pass.
+
+    Parameters
+    ----------
+    signal : numpy.ndarray
+        The original signal, 1-D or (leads, samples).
+
+    recovered_signal : numpy.ndarray
+        The recovered signal, same shape as `signal`.
+
+    n_block : int
+        The block size.
+
+    kron_factor : int, optional
+        If provided, the metrics are computed per Kronecker group of `kron_factor` consecutive blocks
+        (`n_block * kron_factor` samples) instead of per block.
+
+    Returns
+    -------
+    metrics : dict
+        'snr_db', 'prd' and 'nmse' arrays of shape (..., BLOCK_NUM), one value per whole block of each lead (the
+        samples of a trailing partial block are ignored), see `metrics_from_energies`.
+
+    Raises
+    ------
+    ValueError
+        If the signals have different shapes.
+
+    Example
+    -------
+    >>> metrics = block_metrics(signal, x_hat, n_block, kron_factor)
+    >>> worst = np.argsort(metrics['snr_db'])[:10]  # the ten worst recovered Kronecker groups
+    """
+    signal_energy, error_energy = block_energies(signal, recovered_signal, n_block * (kron_factor or 1))
+    return metrics_from_energies(signal_energy, error_energy)
+
+
+def block_energies(signal, recovered_signal, block_size):
+    """
+    Returns the energies of the signal and of the recovery error in every whole block of `block_size` samples, as
+    two float64 arrays of shape (..., BLOCK_NUM).
+    """
+    signal = np.asarray(signal)
+    recovered_signal = np.asarray(recovered_signal)
+    if signal.shape != recovered_signal.shape:
+        raise ValueError(f"The original signal {signal.shape} and the recovered signal {recovered_signal.shape} "
+                         "must have the same shape.")
+
+    x = signal.astype(np.float64)
+    return _block_energies(x, recovered_signal - x, block_size)
+
+
+def _block_energies(x, error, block_size):
+    """Sums `x**2` and `error**2` over every whole block of the last axis."""
+    BLOCK_NUM = x.shape[-1] // block_size
+    shape = x.shape[:-1] + (BLOCK_NUM, block_size)
+    x = x[..., :BLOCK_NUM * block_size].reshape(shape)
+    error = error[..., :BLOCK_NUM * block_size].reshape(shape)
+    return np.einsum('...i,...i->...', x, x), np.einsum('...i,...i->...', error, error)
+
+
+def metrics_from_energies(signal_energy, error_energy):
+    """
+    Computes the quality metrics from the energies of the signal `||x||^2` and of the error `||x - x_hat||^2`.
+
+    Returns a dict with:
+    - 'snr_db': `10 * log10(||x||^2 / ||x - x_hat||^2)`, the SNR of `calculate_snr`,
+    - 'prd': the percentage root-mean-square difference `100 * ||x - x_hat|| / ||x||`,
+    - 'nmse': the normalized mean square error `||x - x_hat||^2 / ||x||^2`.
+
+    Blocks without error have an infinite SNR, blocks without signal energy an infinite (or nan) PRD and NMSE.
+    """
+    signal_energy = np.asarray(signal_energy, dtype=np.float64)
+    error_energy = np.asarray(error_energy, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nmse = error_energy / signal_energy
+        snr = -10 * np.log10(nmse)
+    return {'snr_db': snr, 'prd': 100 * np.sqrt(nmse), 'nmse': nmse}
+
+
+class QualityAccumulator:
+    """
+    Streaming version of `calculate_snr` and `block_metrics`: tracks the quality of a recovery chunk by chunk.
+
+    Each call of `update` only adds the signal and error energies of the chunk to running totals (and, if a block
+    size is given, to one pair of totals per block), so long records can be evaluated as the recovered chunks
+    arrive (e.g. from `non_kron_recovery_stream`) without keeping the original and recovered signals in memory.
+
+    Parameters
+    ----------
+    n_block : int, optional
+        If provided, the metrics of every block are tracked as well (see `block_metrics`). Chunks do not need to
+        be aligned to the blocks.
+
+    kron_factor : int, optional
+        With `n_block`, the metrics are tracked per Kronecker group instead of per block.
+
+    Attributes
+    ----------
+    samples : int
+        Number of samples (per lead) accumulated so far.
+
+    signal_energy, error_energy : float or numpy.ndarray
+        Running totals of `||x||^2` and `||x - x_hat||^2`, one per lead for (leads, samples) chunks.
+
+    Example
+    -------
+    >>> quality = QualityAccumulator(n_block)
+    >>> for i, x_block in enumerate(non_kron_recovery_stream(Y.T, sigma_min, Phi)):
+    ...     quality.update(signal[i * n_block:(i + 1) * n_block], x_block)
+    >>> quality.snr_db, quality.block_metrics()['snr_db'].min()
+    """
+
+    def __init__(self, n_block=None, kron_factor=None):
+        if kron_factor is not None and n_block is None:
+            raise ValueError("kron_factor requires n_block.")
+        self.block_size = None if n_block is None else n_block * (kron_factor or 1)
+        self.samples = 0
+        self.signal_energy = 0.0
+        self.error_energy = 0.0
+        self._blocks = []  # (signal energies, error energies) of the whole blocks of every chunk
+        self._partial = None  # (signal, error) samples of the last block, still incomplete
+
+    def update(self, signal_chunk, recovered_chunk):
+        """Adds the next samples of the original signal and of the recovered signal (same shape, 1-D or 2-D)."""
+        x = np.asarray(signal_chunk, dtype=np.float64)
+        error = np.asarray(recovered_chunk, dtype=np.float64) - x
+        self.samples += x.shape[-1]
+        self.signal_energy = self.signal_energy + np.einsum('...i,...i->...', x, x)
+        self.error_energy = self.error_energy + np.einsum('...i,...i->...', error, error)
+
+        if self.block_size is None:
+            return
+        if self._partial is not None:
+            x = np.concatenate([self._partial[0], x], axis=-1)
+            error = np.concatenate([self._partial[1], error], axis=-1)
+        whole = x.shape[-1] // self.block_size * self.block_size
+        if whole:
+            self._blocks.append(_block_energies(x[..., :whole], error[..., :whole], self.block_size))
+        self._partial = (x[..., whole:], error[..., whole:]) if whole < x.shape[-1] else None
+
+    @property
+    def snr_db(self):
+        """SNR of all the samples accumulated so far, see `calculate_snr`."""
+        return metrics_from_energies(self.signal_energy, self.error_energy)['snr_db']
+
+    @property
+    def prd(self):
+        """PRD (in percent) of all the samples accumulated so far."""
+        return metrics_from_energies(self.signal_energy, self.error_energy)['prd']
+
+    @property
+    def nmse(self):
+        """NMSE of all the samples accumulated so far."""
+        return metrics_from_energies(self.signal_energy, self.error_energy)['nmse']
+
+    def block_metrics(self):
+        """Returns the metrics of every whole block accumulated so far, as `block_metrics` would."""
+        if self.block_size is None:
+            raise ValueError("Per-block metrics require n_block.")
+        if not self._blocks:
+            return metrics_from_energies(np.zeros(0), np.zeros(0))
+        if len(self._blocks) > 1:
+            # merge the chunks, so that the energies are concatenated only once per chunk
+            self._blocks = [tuple(np.concatenate(energies, axis=-1) for energies in zip(*self._blocks))]
+        return metrics_from_energies(*self._blocks[0])
@@ -0,0 +1,199 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+
+# version of the cache layout, caches written with another version are rebuilt
+CACHE_VERSION = 1
+
+
+class Record:
+    """
+    A signal record opened from its memory-mapped cache, see `load_record`.
+
+    Attributes
+    ----------
+    signal : numpy.memmap
+        The samples, of shape (leads, length), as stored in the .mat file (e.g. `int16` ADC units for MIT-BIH).
+        Slicing it reads only the requested samples from disk, slices can be passed as they are to
+        `compressSignal` (one lead, or several leads at once).
+
+    key : str
+        The name of the variable of the .mat file holding the samples.
+
+    leads : int
+        Number of leads (rows of `signal`).
+
+    length : int
+        Number of samples of each lead.
+
+    lead_names : list of str or None
+        The names of the leads, if they were given when the cache was built.
+
+    source : str
+        Path of the .mat file.
+
+    cache_path : str
+        Path of the .npy cache.
+    """
+
+    def __init__(self, signal, metadata, cache_path):
+        self.signal = signal
+        self.key = metadata['key']
+        self.leads = metadata['leads']
+        self.length = metadata['length']
+        self.lead_names = metadata.get('lead_names')
+        self.source = metadata['source']
+        self.cache_path = cache_path
+
+    def lead(self, lead):
+        """Returns one lead (by index or name) as a 1-D memory-mapped view."""
+        if isinstance(lead, str):
+            if self.lead_names is None or lead not in self.lead_names:
+                raise ValueError(f"Unknown lead {lead!r}, the leads are {self.lead_names}.")
+            lead = self.lead_names.index(lead)
+        return self.signal[lead]
+
+    def __getitem__(self, index):
+        return self.signal[index]
+
+    def __repr__(self):
+        return (f"Record({os.path.basename(self.source)!r}, key={self.key!r}, leads={self.leads}, "
+                f"length={self.length}, dtype={self.signal.dtype})")
+
+
+def load_record(path, key=None, cache_dir=None, lead_names=None, refresh=False):
+    """
+    Opens a MATLAB .mat record (e.g. `100m.mat` of the MIT-BIH Arrhythmia Database) through a memory-mapped cache.
+
+    The first call parses the .mat file with `scipy.io.loadmat` and writes its samples to `<stem>.npy`, with the
+    metadata (key, number of leads, length, dtype, size and modification time of the source) in `<stem>.json`.
+    Later calls only read the metadata and open the .npy with `np.load(mmap_mode='r')`: nothing is parsed or
+    copied, and samples are read from disk only when they are accessed. The cache is rebuilt if the source file
+    changed.
+
+    Parameters
+    ----------
+    path : str
+        Path of the .mat file.
+
+    key : str, optional
+        The variable holding the samples. If None (default), the first variable of the file (e.g. 'val').
+
+    cache_dir : str, optional
+        Directory of the cache files. If None (default), a `.record_cache` directory next to the .mat file.
+
+    lead_names : list of str, optional
+        Names of the leads stored in the metadata, e.g. `['MLII', 'V5']` for record 100.
+
+    refresh : bool, optional (default=False)
+        If True, the cache is rebuilt even if it is up to date.
+
+    Returns
+    -------
+    record : Record
+        The record, whose `signal` attribute is the (leads, length) memory-mapped array.
+
+    Raises
+    ------
+    ValueError
+        If `key` is not a variable of the file, or if it is not a 1-D or 2-D array.
+
+    Example
+    -------
+    >>> record = load_record('100m.mat', lead_names=['MLII', 'V5'])
+    >>> Y = compressSignal(record.signal[:, start:end], Phi)  # both leads, only this segment is read
+    """
+    path = os.path.abspath(path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(path), '.record_cache')
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, stem + '.npy')
+    metadata_path = os.path.join(cache_dir, stem + '.json')
+
+    metadata = None if refresh else _read_metadata(metadata_path, path, key)
+    if metadata is None or not os.path.exists(cache_path):
+        metadata = _build_cache(path, key, cache_path, metadata_path, lead_names)
+    elif lead_names is not None and metadata.get('lead_names') != list(lead_names):
+        metadata['lead_names'] = list(lead_names)
+        _write_json(metadata_path, metadata)
+
+    signal = np.load(cache_path, mmap_mode='r')
+    return Record(signal, metadata, cache_path)
+
+
+def _read_metadata(metadata_path, path, key):
+    """
+    Returns the cached metadata if it was built from `path` (and `key`) and describes its current version, None
+    otherwise.
+    """
+    try:
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    stat = os.stat(path)
+    if (metadata.get('version') != CACHE_VERSION or metadata.get('source') != path
+            or metadata.get('source_size') != stat.st_size
+            or metadata.get('source_mtime_ns') != stat.st_mtime_ns or (key is not None and metadata.get('key') != key)):
+        return None
+    return metadata
+
+
+def _build_cache(path, key, cache_path, metadata_path, lead_names):
+    """Parses the .mat file once and writes the .npy cache and its metadata."""
+    import scipy.io  # only needed to build the cache, opening a cached record does not import it
+
+    data = scipy.io.loadmat(path)
+    if key is None:
+        key = [name for name in data if not name.startswith('__')][0]
+    elif key not in data:
+        raise ValueError(f"Variable {key!r} not found in {path}.")
+
+    signal = np.asarray(data[key])
+    if signal.ndim == 1:
+        signal = signal[np.newaxis]
+    if signal.ndim != 2:
+        raise ValueError(f"Variable {key!r} must be a 1-D or 2-D array, got shape {signal.shape}.")
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # write to temporary files first, so that an interrupted conversion never leaves a corrupt cache
+    _write_atomic(cache_path, 'wb', lambda f: np.save(f, np.ascontiguousarray(signal)))
+
+    stat = os.stat(path)
+    metadata = {
+        'version': CACHE_VERSION,
+        'source': path,
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'key': key,
+        'leads': int(signal.shape[0]),
+        'length': int(signal.shape[1]),
+        'dtype': signal.dtype.str,
+        'lead_names': None if lead_names is None else list(lead_names),
+    }
+    _write_json(metadata_path, metadata)
+    return metadata
+
+
+def _write_json(metadata_path, metadata):
+    _write_atomic(metadata_path, 'w', lambda f: json.dump(metadata, f, indent=2))
+
+
+def _write_atomic(path, mode, write):
+    """
+    Calls `write(f)` on a new temporary file next to `path`, then renames it to `path`. The temporary file has a
+    unique name, so processes building the same cache concurrently never write to the same file.
+    """
+    with tempfile.NamedTemporaryFile(mode, dir=os.path.dirname(path), prefix=os.path.basename(path) + '.',
+                                     suffix='.tmp', delete=False) as f:
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    os.replace(f.name, path)
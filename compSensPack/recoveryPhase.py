@@ -1,10 +1,13 @@
 import numpy as np
 
-from .sparseDictionaries import generate_DCT_dictionary  # Importing from sparseDictionaries.py
-from .SL0 import SL0  # Importing from reconstructionMethods.py
+from .recoveryPlan import get_recovery_plan  # Importing from recoveryPlan.py
+from .parallelRecovery import parallel_recovery  # Importing from parallelRecovery.py
+from .instrumentation import phase  # Importing from instrumentation.py
 
 
-def non_kron_recovery(Y, sigma_min, Phi, sigma_decrease_factor=0.5, mu_0=2, L=3, showProgress=False):
+def non_kron_recovery(Y, sigma_min, Phi, sigma_decrease_factor=0.5, mu_0=2, L=3, showProgress=False,
+                      pinv_method='pinv', workers=None, dtype=np.float64, tol=None, warm_start=False, metrics=None,
+                      dictionary='dct'):
     """
     Performs the non-Kronecker recovery phase of compressed sensing using the SL0 (Smoothed L0 norm) algorithm.
 
@@ -16,6 +19,8 @@ def non_kron_recovery(Y, sigma_min, Phi, sigma_decrease_factor=0.5, mu_0=2, L=3,
     ----------
     Y : numpy.ndarray
         A 2D array of shape (M, BLOCK_NUM), where each column represents a compressed block of the original signal.
+        A 3D array of shape (leads, M, BLOCK_NUM), as returned by `compressSignal` for a (leads, samples) signal, is
+        also accepted: the blocks of all the leads share the plan and are recovered in one batched SL0 pass.
     
     sigma_min : float
         The minimum value for the smoothing parameter sigma in the SL0 algorithm. Controls the final precision
@@ -38,11 +43,43 @@ def non_kron_recovery(Y, sigma_min, Phi, sigma_decrease_factor=0.5, mu_0=2, L=3,
     showProgress : bool, optional (default=False)
         If True, displays progress information during the SL0 algorithm iterations.
 
+    pinv_method : str, optional (default='pinv')
+        How the projection operator for SL0 is built: 'pinv' (dense `np.linalg.pinv(Theta)`), 'cholesky' or 'qr'
+        (a `FactorizedPinv` of `Theta`, cheaper to build, with a fallback to 'pinv' for rank-deficient `Theta`).
+
+    workers : int, optional
+        If greater than 1, the blocks are recovered in parallel by that many worker processes sharing `Y`, the
+        projection operator and the output through shared memory (see `parallel_recovery`). `showProgress` is
+        ignored in this mode.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of the dictionary, Theta, its pseudoinverse, the SL0 iterations and `x_hat`.
+        `np.float32` halves memory and bandwidth at a small cost in SNR (see the README).
+
+    tol : float, optional
+        If provided, SL0 stops iterating on a block once its relative change and residual fall below `tol`, and
+        converged blocks drop out of the batch (see `SL0`). If None (default), the full sigma schedule is run.
+
+    warm_start : bool, optional (default=False)
+        If True, each block is seeded with the sparse coefficients of the previous block and starts its sigma
+        schedule from a smaller sigma derived from the seed. Blocks are solved along chains of consecutive blocks
+        advancing side by side (see `RecoveryPlan.solve`), so the SL0 calls stay batched.
+
+    metrics : RecoveryMetrics, optional
+        Receives the time spent in each phase (plan build, pseudoinverse, SL0 iterations, synthesis), the sigma and
+        residual traces and the iteration count of every block (see `RecoveryMetrics`). If None (default), nothing
+        is measured.
+
+    dictionary : str, optional (default='dct')
+        The sparsifying dictionary: 'dct' (`generate_DCT_dictionary`) or the name of an orthogonal wavelet, e.g.
+        'db4', for a full-depth wavelet dictionary (`generate_DWT_dictionary`).
+
     Returns
     -------
     x_hat : numpy.ndarray
         A 1D array containing the recovered signal of length equal to the original signal. The reconstructed
-        signal is obtained by applying the inverse transformation using the DCT dictionary.
+        signal is obtained by applying the inverse transformation using the DCT dictionary. For a 3D `Y`, a 2D
+        array of shape (leads, samples) with one recovered lead per row.
 
     Notes
     -----
@@ -52,33 +89,34 @@ def non_kron_recovery(Y, sigma_min, Phi, sigma_decrease_factor=0.5, mu_0=2, L=3,
       in many practical compressed sensing applications.
     - This function assumes that the input matrix `Y` has been properly compressed using the provided measurement
       matrix `Phi` and that the DCT basis is suitable for the signal's sparse representation.
+    - The DCT dictionary, `Theta` and its pseudoinverse are held by a `RecoveryPlan` taken from an in-process
+      LRU cache (see `get_recovery_plan`), so repeated calls with the same `Phi` do not recompute them.
+    - All the blocks are recovered together by a single batched `SL0` call (one column of `Y` per problem),
+      so the sigma schedule runs as matrix-matrix products instead of one small SL0 run per block.
 
     Author
     ------
     RosNaviGator (https://github.com/RosNaviGator), 2024
     """
 
-    n_block = Phi.shape[1]  # length of ORIGINAL signal block
-    Dict = generate_DCT_dictionary(n_block)  # Dictionary
-    Theta = Phi @ Dict  # Theta
-    Theta_pinv = np.linalg.pinv(Theta)  # More-Penrose pseudoinverse of Theta, needed for SL0
-    BLOCK_NUM = Y.shape[1]  # number of blocks
-
-    n_block = Theta.shape[1]  # length of ORIGINAL signal block
+    if workers is not None and workers > 1:
+        return parallel_recovery(Y, sigma_min, Phi, workers=workers, sigma_decrease_factor=sigma_decrease_factor,
+                                 mu_0=mu_0, L=L, tol=tol, warm_start=warm_start, pinv_method=pinv_method, dtype=dtype,
+                                 metrics=metrics, dictionary=dictionary)
 
-    # Initialize the recovered signal
-    x_hat = np.zeros(BLOCK_NUM * n_block)  # Recovered signal will be as long as the original signal
+    # Dictionary, Theta and its pseudoinverse are built once per Phi and then reused from the plan cache
+    plan = get_recovery_plan(Phi, pinv_method=pinv_method, dtype=dtype, metrics=metrics, dictionary=dictionary,
+                             sigma_min=sigma_min, sigma_decrease_factor=sigma_decrease_factor, mu_0=mu_0, L=L,
+                             tol=tol, warm_start=warm_start)
 
-    # Process each block
-    for i in range(BLOCK_NUM):
-        y = Y[:, i]
-        s_block = SL0(y, Theta, sigma_min, sigma_decrease_factor, mu_0, L, Theta_pinv, showProgress)
-        x_hat[i*n_block:(i+1)*n_block] = Dict @ s_block
+    # Recover all the blocks with one batched SL0 call
+    x_hat = plan.recover(Y, showProgress, metrics)  # Recovered signal will be as long as the original signal
 
     return x_hat
 
 
-def kron_recovery(Y, sigma_min, Phi, kron_factor, sigma_decrease_factor=0.5, mu_0=2, L=3, showProgress=False):
+def kron_recovery(Y, sigma_min, Phi, kron_factor, sigma_decrease_factor=0.5, mu_0=2, L=3, showProgress=False,
+                  workers=None, dtype=np.float64, tol=None, warm_start=False, metrics=None, dictionary='dct'):
     """
     Performs the Kronecker product-based recovery phase of compressed sensing using the SL0 (Smoothed L0 norm) algorithm.
 
@@ -92,6 +130,8 @@ def kron_recovery(Y, sigma_min, Phi, kron_factor, sigma_decrease_factor=0.5, mu_
     Y : numpy.ndarray
         A 2D array where each block represents a compressed section of the original signal. The matrix `Y` should
         be structured in such a way that its columns align with the blocks defined by the Kronecker structure.
+        A 3D array of shape (leads, M, BLOCK_NUM) is also accepted: the Kronecker blocks of all the leads (never
+        spanning two leads) share the plan and are recovered in one batched SL0 pass.
     
     sigma_min : float
         The minimum value for the smoothing parameter sigma in the SL0 algorithm. Controls the final precision
@@ -118,11 +158,40 @@ def kron_recovery(Y, sigma_min, Phi, kron_factor, sigma_decrease_factor=0.5, mu_
     showProgress : bool, optional (default=False)
         If True, displays progress information during the SL0 algorithm iterations.
 
+    workers : int, optional
+        If greater than 1, the Kronecker blocks are recovered in parallel by that many worker processes sharing `Y`,
+        `pinv(Phi)` and the output through shared memory (see `parallel_recovery`). `showProgress` is ignored in
+        this mode.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of the Kronecker operators, the SL0 iterations and `x_hat_kron`. `np.float32`
+        halves memory and bandwidth at a small cost in SNR (see the README).
+
+    tol : float, optional
+        If provided, SL0 stops iterating on a Kronecker block once its relative change and residual fall below
+        `tol`, and converged blocks drop out of the batch (see `SL0`). If None (default), the full sigma schedule
+        is run.
+
+    warm_start : bool, optional (default=False)
+        If True, each Kronecker block is seeded with the sparse coefficients of the previous Kronecker block and
+        starts its sigma schedule from a smaller sigma derived from the seed (see `RecoveryPlan.solve`).
+
+    metrics : RecoveryMetrics, optional
+        Receives the time spent in each phase (pseudoinverse, SL0 iterations, synthesis), the sigma and residual
+        traces and the iteration count of every Kronecker block (see `RecoveryMetrics`). If None (default), nothing
+        is measured.
+
+    dictionary : str, optional (default='dct')
+        The sparsifying dictionary of the Kronecker blocks: 'dct', or the name of an orthogonal wavelet, e.g. 'db4',
+        applied matrix-free with `pywt.waverec`/`pywt.wavedec` on `n_block * kron_factor` samples (see
+        `WaveletDictionary`).
+
     Returns
     -------
     x_hat_kron : numpy.ndarray
         A 1D array containing the recovered signal of length equal to the original signal. The reconstructed
-        signal is obtained by applying the inverse transformation using the Kronecker-structured dictionary.
+        signal is obtained by applying the inverse transformation using the Kronecker-structured dictionary. For a
+        3D `Y`, a 2D array of shape (leads, samples) with one recovered lead per row.
 
     Notes
     -----
@@ -134,6 +203,14 @@ def kron_recovery(Y, sigma_min, Phi, kron_factor, sigma_decrease_factor=0.5, mu_
       in compressed sensing, where the goal is to recover the sparsest solution possible.
     - Ensure that the input `Y` and `Phi` are correctly aligned and compatible with the Kronecker product structure
       and the sparse recovery assumptions.
+    - `Theta_kron` is never built: `np.kron(np.eye(kron_factor), Phi)` is block-diagonal and the DCT dictionary
+      is orthonormal, so `Theta_kron`, its transpose and its pseudoinverse are applied matrix-free through `Phi`,
+      `np.linalg.pinv(Phi)` and fast DCT/IDCT calls (see `KroneckerDCTOperator`). Memory and setup cost no longer
+      grow with `(n_block * kron_factor)**2`.
+    - The Kronecker operators are held by a `RecoveryPlan` taken from an in-process LRU cache keyed by `Phi`
+      and `kron_factor` (see `get_recovery_plan`).
+    - Every group of `kron_factor` consecutive columns of `Y` is stacked into one Kronecker measurement vector and
+      all the Kronecker blocks are recovered together by a single batched `SL0` call.
 
     Author
     ------
@@ -141,29 +218,125 @@ def kron_recovery(Y, sigma_min, Phi, kron_factor, sigma_decrease_factor=0.5, mu_
     """
     
 
-    Phi_kron = np.kron(np.eye(kron_factor), Phi)  # KRONECKER product of Phi (kroncker measurement matrix)
+    if workers is not None and workers > 1:
+        return parallel_recovery(Y, sigma_min, Phi, kron_factor, workers=workers,
+                                 sigma_decrease_factor=sigma_decrease_factor, mu_0=mu_0, L=L,
+                                 tol=tol, warm_start=warm_start, dtype=dtype, metrics=metrics, dictionary=dictionary)
+
+    # Theta (kron) and its pseudoinverse are applied matrix-free, built once per (Phi, kron_factor) and then
+    # reused from the plan cache
+    plan = get_recovery_plan(Phi, kron_factor, dtype=dtype, metrics=metrics, dictionary=dictionary,
+                             sigma_min=sigma_min, sigma_decrease_factor=sigma_decrease_factor, mu_0=mu_0, L=L,
+                             tol=tol, warm_start=warm_start)
+
+    # Recover all the KRONECKER blocks with one batched SL0 call
+    x_hat_kron = plan.recover(Y, showProgress, metrics)
+
+    return x_hat_kron
+
+
+def non_kron_recovery_stream(Y_columns, sigma_min, Phi, sigma_decrease_factor=0.5, mu_0=2, L=3, showProgress=False,
+                             pinv_method='pinv', dtype=np.float64, tol=None, warm_start=False, metrics=None,
+                             dictionary='dct'):
+    """
+    Streaming version of `non_kron_recovery`: recovers the signal block by block while the compressed measurements
+    arrive, yielding each recovered block as soon as it is solved.
+
+    Parameters
+    ----------
+    Y_columns : iterable of numpy.ndarray
+        The compressed blocks, one measurement column of length M at a time (e.g. the columns of `Y`, or a live
+        source of measurements).
+
+    sigma_min, Phi, sigma_decrease_factor, mu_0, L, showProgress, pinv_method, dtype, tol, warm_start, metrics,
+    dictionary
+        Same as in `non_kron_recovery`.
+
+    Yields
+    ------
+    x_block : numpy.ndarray
+        The recovered block of `n_block` samples for each incoming measurement column. Concatenating all the
+        yielded blocks gives the output of `non_kron_recovery` on the same measurements.
+
+    Notes
+    -----
+    - With `warm_start`, every block is seeded with the previous one, and the chain restarts cold every
+      `RecoveryPlan.warm_start_chain` blocks, as in the batch recovery (so errors cannot build up along a
+      live stream).
+    - Memory use does not depend on the length of the record, only one block is held at a time.
+    - The plan (dictionary, Theta and its pseudoinverse) is taken from the same cache used by `non_kron_recovery`.
+    """
+
+    plan = get_recovery_plan(Phi, pinv_method=pinv_method, dtype=dtype, metrics=metrics, dictionary=dictionary,
+                             sigma_min=sigma_min, sigma_decrease_factor=sigma_decrease_factor, mu_0=mu_0, L=L,
+                             tol=tol, warm_start=warm_start)
+
+    s_block = None
+    for index, y in enumerate(Y_columns):
+        # warm start along chains of warm_start_chain blocks, as RecoveryPlan.solve
+        s_init = s_block if warm_start and index % plan.warm_start_chain else None
+        s_block = plan.solve(np.asarray(y), showProgress, s_init=s_init, metrics=metrics)
+        with phase(metrics, 'synthesis'):
+            x_block = plan.synthesize(s_block)
+        yield x_block
+
 
-    n_block = Phi.shape[1]  # length of ORIGINAL signal block
-    #m_block = Phi.shape[0]  # length of compressed signal block
-    n_block_kron = Phi_kron.shape[1]  # length of ORIGINAL signal KRONECKER-block
-    #m_block_kron = Phi_kron.shape[0]  # length of compressed signal KRONECKER-block
+def kron_recovery_stream(Y_columns, sigma_min, Phi, kron_factor, sigma_decrease_factor=0.5, mu_0=2, L=3,
+                         showProgress=False, dtype=np.float64, tol=None, warm_start=False, metrics=None,
+                         dictionary='dct'):
+    """
+    Streaming version of `kron_recovery`: buffers exactly `kron_factor` incoming measurement columns and yields the
+    recovered Kronecker block as soon as each group is solved.
+
+    Parameters
+    ----------
+    Y_columns : iterable of numpy.ndarray
+        The compressed blocks, one measurement column of length M at a time (e.g. the columns of `Y`, or a live
+        source of measurements).
+
+    sigma_min, Phi, kron_factor, sigma_decrease_factor, mu_0, L, showProgress, dtype, tol, warm_start, metrics,
+    dictionary
+        Same as in `kron_recovery`.
+
+    Yields
+    ------
+    x_kron_block : numpy.ndarray
+        The recovered Kronecker block of `n_block * kron_factor` samples for each complete group of `kron_factor`
+        columns. If the stream ends with an incomplete group, a final chunk of zeros covering those blocks is
+        yielded, so that concatenating all the chunks gives the output of `kron_recovery` on the same measurements.
+
+    Notes
+    -----
+    - Memory use does not depend on the length of the record: only one (M, kron_factor) buffer, reused for every
+      group, and the matrix-free Kronecker operators are held.
+    - With `warm_start`, every Kronecker block is seeded with the previous one, and the chain restarts cold every
+      `RecoveryPlan.warm_start_chain` Kronecker blocks, as in the batch recovery.
+    """
 
-    BLOCK_NUM = Y.shape[1]  # number of blocks
-    N = n_block * BLOCK_NUM  # length of ORIGINAL signal
-    KRON_BLOCK_NUM = N // n_block_kron  # number of KRONECKER blocks
+    plan = get_recovery_plan(Phi, kron_factor, dtype=dtype, metrics=metrics, dictionary=dictionary,
+                             sigma_min=sigma_min, sigma_decrease_factor=sigma_decrease_factor, mu_0=mu_0, L=L,
+                             tol=tol, warm_start=warm_start)
 
-    Dict_kron = generate_DCT_dictionary(n_block_kron)  # Dictionary (kron)
-    Theta_kron = Phi_kron @ Dict_kron  # Theta (kron)
-    Theta_kron_pinv = np.linalg.pinv(Theta_kron)  # More-Penrose pseudoinverse of Theta (kron)
+    # buffer of one KRONECKER group, column j is the j-th compressed block of the group
+    buffer = np.zeros((plan.m_block, kron_factor), dtype=plan.dtype)
+    filled = 0
+    solved = 0  # Kronecker blocks solved so far
+    s_kron_block = None
 
-    # Initialize the recovered signal
-    x_hat_kron = np.zeros(N)
+    for y in Y_columns:
+        buffer[:, filled] = y
+        filled += 1
 
-    # Process each block
-    # DO NOT FORGET MATLAB IS COL-MAJOR, PY IS ROW-MAJOR, that darn 'F'... took my a day to figure out
-    for i in range(KRON_BLOCK_NUM):
-        y_kron = Y[:, i*kron_factor:(i+1)*kron_factor].reshape(-1, order='F')
-        s_kron_block = SL0(y_kron, Theta_kron, sigma_min, sigma_decrease_factor, mu_0, L, Theta_kron_pinv, showProgress)
-        x_hat_kron[n_block_kron*i:(i+1)*n_block_kron] = Dict_kron @ s_kron_block
+        if filled == kron_factor:
+            # DO NOT FORGET MATLAB IS COL-MAJOR, PY IS ROW-MAJOR
+            s_init = s_kron_block if warm_start and solved % plan.warm_start_chain else None
+            s_kron_block = plan.solve(buffer.reshape(-1, order='F'), showProgress, s_init=s_init, metrics=metrics)
+            solved += 1
+            with phase(metrics, 'synthesis'):
+                x_kron_block = plan.synthesize(s_kron_block)
+            yield x_kron_block
+            filled = 0
 
-    return x_hat_kron
\ No newline at end of file
+    # blocks of an incomplete KRONECKER group are not recovered, as in kron_recovery
+    if filled > 0:
+        yield np.zeros(filled * plan.n_block, dtype=plan.dtype)
@@ -0,0 +1,501 @@
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .sparseDictionaries import sparsifying_dictionary, WaveletDictionary  # Importing from sparseDictionaries.py
+from .SL0 import SL0, FactorizedPinv, SL0Workspace  # Importing from SL0.py
+from .kroneckerOperator import KroneckerDCTOperator  # Importing from kroneckerOperator.py
+from .measurementMatrix import DBDDOperator, MatrixSpec  # Importing from measurementMatrix.py
+from .instrumentation import phase  # Importing from instrumentation.py
+
+
+# maximum number of plans kept by `get_recovery_plan` (least recently used plans are dropped first)
+PLAN_CACHE_SIZE = 16
+
+_plan_cache = OrderedDict()
+_plan_cache_lock = threading.Lock()
+
+
+class RecoveryPlan:
+    """
+    Precomputed state for the recovery phase of compressed sensing with a given measurement matrix `Phi`.
+
+    A plan is built once and can then recover any number of measurement matrices `Y` compressed with the same
+    `Phi`. It holds the sparsifying dictionary (DCT by default), `Theta = Phi @ Dict`, the projection operator
+    used by SL0 (the pseudoinverse of `Theta`) and the SL0 sigma schedule parameters.
+
+    - Non-Kronecker plans (`kron_factor=None`) store the dense `Dict`, `Theta` and `Theta_pinv`.
+    - Kronecker plans store `Theta` and `Theta_pinv` as matrix-free `KroneckerDCTOperator` objects, so only
+      `np.linalg.pinv(Phi)` is computed and `Dict` is applied with a fast inverse DCT (or inverse DWT).
+
+    Parameters
+    ----------
+    Phi : numpy.ndarray, DBDDOperator or MatrixSpec
+        The measurement matrix of shape (M, N) used for compressing the original signal blocks. With an
+        implicit `DBDDOperator` the projection operator has a closed form (`Theta.T / m`, see `DBDDOperator`)
+        and no pseudoinverse or factorization is computed, whatever `pinv_method`. A `MatrixSpec` is generated
+        in `dtype` and kept as the `spec` attribute, which is then the cache key of the plan.
+
+    kron_factor : int, optional
+        The number of blocks joined into one Kronecker block. If None (default), the plan performs the
+        non-Kronecker recovery.
+
+    sigma_min : float, optional
+        The minimum value for the smoothing parameter sigma in the SL0 algorithm. It must be set (here or
+        with `with_schedule`) before calling `solve` or `recover`.
+
+    sigma_decrease_factor : float, optional (default=0.5)
+        The factor by which sigma is multiplied in each iteration of the SL0 algorithm.
+
+    mu_0 : float, optional (default=2)
+        The step size parameter for the SL0 algorithm.
+
+    L : int, optional (default=3)
+        The number of iterations for each fixed sigma value in the SL0 algorithm.
+
+    tol : float, optional
+        Early termination tolerance of SL0 (see `SL0`). If None (default), the full sigma schedule is run.
+
+    warm_start : bool, optional (default=False)
+        If True, every block is seeded with the sparse coefficients of the previous block, and its sigma
+        schedule starts from a smaller sigma derived from the seed (see `SL0` and `solve`).
+
+    pinv_method : str, optional (default='pinv')
+        How the projection operator of non-Kronecker plans is built: 'pinv' stores the dense
+        `np.linalg.pinv(Theta)`, 'cholesky' and 'qr' store a `FactorizedPinv` of `Theta` (cheaper to build,
+        no NxM pseudoinverse, with a fallback to 'pinv' for rank-deficient `Theta`). Kronecker plans only
+        pseudo-invert the small `Phi` and ignore it.
+
+    projection : numpy.ndarray or FactorizedPinv, optional
+        A precomputed projection: `Theta_pinv` (dense or factorized) for non-Kronecker plans,
+        `np.linalg.pinv(Phi)` for Kronecker plans. Used by `RecoveryPlan.load` to skip the factorization.
+
+    dictionary : str, optional (default='dct')
+        The sparsifying dictionary: 'dct', or the name of an orthogonal PyWavelets wavelet (e.g. 'db4', 'sym8')
+        for a full-depth periodized wavelet dictionary (see `WaveletDictionary`). Kronecker plans apply it
+        matrix-free with `pywt.waverec`/`pywt.wavedec` on blocks of `n_block * kron_factor` samples.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of every array of the plan and of the SL0 iterations. With `np.float32`
+        memory and bandwidth are halved and BLAS throughput roughly doubles, at a small cost in SNR (see
+        the README). Measurements are cast to it by `solve` and `recover`.
+
+    metrics : RecoveryMetrics, optional
+        Receives the time spent building the dictionary and Theta ('plan') and the projection operator
+        ('pinv'). `solve` and `recover` take their own `metrics` argument.
+
+    Notes
+    -----
+    - Plans are usually obtained through `get_recovery_plan`, which keeps an in-process LRU cache keyed by a
+      hash of `Phi`, `kron_factor`, `pinv_method`, `dtype` and `dictionary`. Changing only the sigma schedule
+      does not rebuild the plan.
+    - `save` and `load` store the plan on disk (numpy `.npz`), so worker processes can start warm.
+    - Each plan keeps one `SL0Workspace` per thread (see `workspace`), so repeated recoveries with the same
+      plan reuse the SL0 buffers instead of allocating them on every call.
+    """
+
+    # warm start: number of blocks per chain and maximum number of chains solved side by side, see `solve`
+    warm_start_chain = 16
+    warm_start_lanes = 256
+
+    def __init__(self, Phi, kron_factor=None, sigma_min=None, sigma_decrease_factor=0.5, mu_0=2, L=3, tol=None,
+                 warm_start=False, pinv_method='pinv', projection=None, dtype=np.float64, metrics=None,
+                 dictionary='dct'):
+        self.dtype = np.dtype(dtype)
+        self.spec = Phi if isinstance(Phi, MatrixSpec) else None
+        if self.spec is not None:
+            Phi = self.spec.generate(self.dtype, implicit=True)
+        if isinstance(Phi, DBDDOperator):
+            self.Phi = Phi.astype(self.dtype)
+        else:
+            self.Phi = np.asarray(Phi, dtype=self.dtype)
+        self.kron_factor = None if kron_factor is None else int(kron_factor)
+        self.pinv_method = pinv_method
+        self.dictionary = dictionary
+
+        # SL0 sigma schedule
+        self.sigma_min = sigma_min
+        self.sigma_decrease_factor = sigma_decrease_factor
+        self.mu_0 = mu_0
+        self.L = L
+        self.tol = tol
+        self.warm_start = warm_start
+
+        self.n_block = self.Phi.shape[1]  # length of ORIGINAL signal block
+        self.m_block = self.Phi.shape[0]  # length of compressed signal block
+
+        if self.kron_factor is None:
+            with phase(metrics, 'plan'):
+                self.Dict = sparsifying_dictionary(dictionary, self.n_block, self.dtype)  # Dictionary
+                self.Theta = self.Phi @ self.Dict  # Theta
+            # More-Penrose pseudoinverse of Theta (dense or factorized), needed for SL0
+            with phase(metrics, 'pinv'):
+                if projection is not None:
+                    self.Theta_pinv = projection
+                elif isinstance(self.Phi, DBDDOperator):
+                    # Phi @ Phi.T = m * I and Dict is orthonormal: pinv(Theta) = Theta.T / m
+                    self.Theta_pinv = np.ascontiguousarray(self.Theta.T / self.Phi.m)
+                elif pinv_method == 'pinv':
+                    self.Theta_pinv = np.linalg.pinv(self.Theta)
+                else:
+                    self.Theta_pinv = FactorizedPinv(self.Theta, pinv_method)
+        else:
+            self.Dict = None  # applied matrix-free with a fast inverse DCT (or DWT)
+            Dict_kron = None if dictionary == 'dct' else WaveletDictionary(self.n_block * self.kron_factor, dictionary)
+            self.Theta = KroneckerDCTOperator(self.Phi, self.kron_factor, Dict_kron)  # Theta (kron)
+            with phase(metrics, 'pinv'):
+                self.Theta_pinv = self.Theta.pinv(projection)  # More-Penrose pseudoinverse of Theta (kron)
+
+        # SL0 buffers, one per thread, shared by the copies made by `with_schedule`
+        self._workspace = threading.local()
+
+    @property
+    def key(self):
+        """The cache key of this plan, see `plan_key`."""
+        return plan_key(self.Phi if self.spec is None else self.spec, self.kron_factor, self.pinv_method, self.dtype,
+                        self.dictionary)
+
+    @property
+    def block_size(self):
+        """Length of the signal recovered from one column of the (grouped) measurements."""
+        return self.Theta.shape[1]
+
+    def workspace(self, B):
+        """
+        Returns the `SL0Workspace` of this plan for the calling thread, reallocated only when a batch of
+        more than the current number of columns `B` is requested.
+        """
+        M, N = self.Theta.shape
+        workspace = getattr(self._workspace, 'buffers', None)
+        if workspace is None or not workspace.fits(N, M, B, self.dtype):
+            workspace = SL0Workspace(N, M, B, self.dtype)
+            self._workspace.buffers = workspace
+        return workspace
+
+    def with_schedule(self, **schedule):
+        """
+        Returns a copy of the plan with a different SL0 sigma schedule.
+
+        The copy shares the dictionary, Theta and projection operator with the original plan, nothing is
+        recomputed. Accepted keywords are `sigma_min`, `sigma_decrease_factor`, `mu_0`, `L`, `tol` and
+        `warm_start`.
+        """
+        unknown = set(schedule) - {'sigma_min', 'sigma_decrease_factor', 'mu_0', 'L', 'tol', 'warm_start'}
+        if unknown:
+            raise ValueError(f"Unknown schedule parameters: {sorted(unknown)}")
+
+        plan = copy.copy(self)
+        for name, value in schedule.items():
+            setattr(plan, name, value)
+        return plan
+
+    def group(self, Y):
+        """
+        Arranges the measurements `Y` (M x BLOCK_NUM) in the columns solved by this plan.
+
+        For Kronecker plans every group of `kron_factor` consecutive columns is stacked into one Kronecker
+        measurement column, trailing columns that do not fill a whole group are dropped.
+        """
+        if self.kron_factor is None:
+            return Y
+
+        KRON_BLOCK_NUM = Y.shape[1] // self.kron_factor  # number of KRONECKER blocks
+        # DO NOT FORGET MATLAB IS COL-MAJOR, PY IS ROW-MAJOR, that darn 'F'... took my a day to figure out
+        return Y[:, :KRON_BLOCK_NUM*self.kron_factor].reshape(self.Theta.shape[0], KRON_BLOCK_NUM, order='F')
+
+    def solve(self, Y, showProgress=False, return_iterations=False, s_init=None, metrics=None, chains=None):
+        """
+        Runs the batched SL0 algorithm on grouped measurements and returns the sparse coefficients, one
+        column per (Kronecker) block. With `return_iterations`, the number of sigma steps run for each
+        column is returned as well. `s_init` is an explicit warm-start seed and `metrics` a
+        `RecoveryMetrics`, both passed to `SL0`.
+
+        If the plan has `warm_start` set and no `s_init` is given, the blocks of a 2-D `Y` are split in
+        contiguous chains, given by their boundaries `chains` (by default `warm_start_chains([BLOCK_NUM])`).
+        The first block of each chain starts cold, then the chains advance side by side, `warm_start_lanes`
+        chains at a time: step `t` solves block `t` of every chain in one batched SL0 call, seeded with the
+        solution of block `t - 1` of the same chain.
+        """
+        if self.sigma_min is None:
+            raise ValueError("sigma_min is not set for this plan.")
+
+        Y = np.asarray(Y, dtype=self.dtype)
+
+        if self.warm_start and s_init is None and Y.ndim == 2:
+            if chains is None:
+                chains = self.warm_start_chains([Y.shape[1]])
+            S, iterations = self._solve_warm(Y, chains, showProgress, metrics)
+            return (S, iterations) if return_iterations else S
+
+        return SL0(Y, self.Theta, self.sigma_min, self.sigma_decrease_factor, self.mu_0, self.L,
+                   self.Theta_pinv, showProgress, tol=self.tol, return_iterations=return_iterations,
+                   s_init=s_init, workspace=self.workspace(1 if Y.ndim == 1 else Y.shape[1]), metrics=metrics)
+
+    def warm_start_chains(self, segments):
+        """
+        Returns the boundaries of the warm-start chains (see `solve`) of the columns of consecutive `segments`
+        (e.g. the leads of a signal), given by their numbers of columns. Chains never span two segments: each
+        segment is split in contiguous chains of `warm_start_chain` columns (the last one may be shorter). The
+        chains only depend on the position of the columns in their segment, so a stream restarting cold every
+        `warm_start_chain` blocks (see `non_kron_recovery_stream`) follows the same chains.
+        """
+        bounds = [np.zeros(1, dtype=int)]
+        offset = 0
+        for n in segments:
+            n = int(n)
+            if n > 0:
+                bounds.append(offset + np.append(np.arange(self.warm_start_chain, n, self.warm_start_chain), n))
+                offset += n
+        return np.concatenate(bounds)
+
+    def _solve_warm(self, Y, chains, showProgress=False, metrics=None):
+        """Warm-started solve of every column of `Y`, along the chains of boundaries `chains` (see `solve`)."""
+        BLOCK_NUM = Y.shape[1]
+        chains = np.asarray(chains)
+        lanes = max(min(self.warm_start_lanes, len(chains) - 1), 1)
+        workspace = self.workspace(lanes)
+
+        S = np.empty((self.Theta.shape[1], BLOCK_NUM), dtype=self.dtype)
+        iterations = np.zeros(BLOCK_NUM, dtype=int)
+
+        # `lanes` chains at a time
+        for first in range(0, len(chains) - 1, lanes):
+            chain_starts = chains[first:first + lanes]
+            chain_stops = chains[first + 1:first + lanes + 1]
+            chain_starts = chain_starts[:len(chain_stops)]
+            for t in range(int(np.max(chain_stops - chain_starts))):
+                cols = chain_starts + t
+                cols = cols[cols < chain_stops]
+                s_init = None if t == 0 else S[:, cols - 1]
+                S[:, cols], iterations[cols] = SL0(Y[:, cols], self.Theta, self.sigma_min,
+                                                   self.sigma_decrease_factor, self.mu_0, self.L, self.Theta_pinv,
+                                                   showProgress, tol=self.tol, return_iterations=True,
+                                                   s_init=s_init, workspace=workspace, metrics=metrics)
+
+        return S, iterations
+
+    def synthesize(self, S):
+        """Returns `Dict @ S`, the signal blocks described by the sparse coefficients `S`."""
+        if self.kron_factor is None:
+            return self.Dict @ S
+        return self.Theta.synthesize(S)
+
+    def recover(self, Y, showProgress=False, metrics=None, chains=None):
+        """
+        Recovers the signal compressed in `Y` (M x BLOCK_NUM) and returns it as a 1-D array of length
+        `BLOCK_NUM * n_block`. For Kronecker plans, samples of trailing blocks that do not fill a whole
+        Kronecker block are left at zero. `metrics` receives the SL0 measurements and the 'synthesis' time,
+        `chains` the warm-start chains of the (Kronecker) blocks, see `solve`.
+
+        `Y` can also hold several leads, with shape (leads, M, BLOCK_NUM) as returned by `compressSignal` for a
+        2-D signal. The (Kronecker) blocks of all the leads are then solved together in a single batched pass
+        and the result has shape (leads, BLOCK_NUM * n_block). Kronecker groups and warm-start chains never
+        span two leads.
+        """
+        Y = np.asarray(Y)
+        if Y.ndim not in (2, 3):
+            raise ValueError(f"Y must have shape (M, BLOCK_NUM) or (leads, M, BLOCK_NUM), got {Y.shape}.")
+
+        Y_leads = Y if Y.ndim == 3 else Y[np.newaxis]
+        LEADS = Y_leads.shape[0]
+        N = self.n_block * Y_leads.shape[2]  # length of ORIGINAL signal (of each lead)
+
+        # the columns of every lead one after the other
+        if LEADS == 1:
+            Y_grouped = self.group(Y_leads[0])
+        else:
+            Y_grouped = np.concatenate([self.group(Y_lead) for Y_lead in Y_leads], axis=1)
+
+        if chains is None and self.warm_start:
+            chains = self.warm_start_chains([Y_grouped.shape[1] // LEADS] * LEADS)
+        S = self.solve(Y_grouped, showProgress, metrics=metrics, chains=chains)
+        with phase(metrics, 'synthesis'):
+            # lay the blocks of each lead one after the other
+            x_blocks = self.synthesize(S).T.reshape(LEADS, -1)
+
+            if x_blocks.shape[1] == N:
+                x_hat = x_blocks
+            else:
+                x_hat = np.zeros((LEADS, N), dtype=self.dtype)
+                x_hat[:, :x_blocks.shape[1]] = x_blocks
+        return x_hat if Y.ndim == 3 else x_hat[0]
+
+    @property
+    def schedule(self):
+        """The SL0 sigma schedule of the plan, as a dict of keyword arguments for `with_schedule`."""
+        return {'sigma_min': self.sigma_min, 'sigma_decrease_factor': self.sigma_decrease_factor,
+                'mu_0': self.mu_0, 'L': self.L, 'tol': self.tol, 'warm_start': self.warm_start}
+
+    def projection_state(self):
+        """
+        Returns the precomputed projection as `(array, method)`, where `array` is the only expensive
+        artifact of the plan (`Theta_pinv`, a `FactorizedPinv` factor, or `pinv(Phi)` for Kronecker plans)
+        and `method` is 'pinv', 'cholesky' or 'qr'. `RecoveryPlan.from_projection` rebuilds the plan from it.
+        Plans of an implicit `DBDDOperator` have nothing to share: `array` is empty and `method` is
+        'closed_form'.
+        """
+        if isinstance(self.Phi, DBDDOperator):
+            return np.empty(0, dtype=self.dtype), 'closed_form'
+        if self.kron_factor is not None:
+            return self.Theta_pinv.F, 'pinv'
+        if isinstance(self.Theta_pinv, FactorizedPinv):
+            return self.Theta_pinv.factor, self.Theta_pinv.method
+        return self.Theta_pinv, 'pinv'
+
+    @classmethod
+    def from_projection(cls, Phi, kron_factor, projection, projection_method, pinv_method='pinv', dictionary='dct',
+                        **schedule):
+        """
+        Rebuilds a plan from the output of `projection_state` without redoing any factorization. The plan
+        takes the floating point type of `Phi`.
+        """
+        if not isinstance(Phi, DBDDOperator):
+            Phi = np.asarray(Phi)
+        if projection_method == 'closed_form':
+            projection = None  # rebuilt by the constructor, nothing to factorize
+        elif kron_factor is None and projection_method != 'pinv':
+            Theta = Phi @ sparsifying_dictionary(dictionary, Phi.shape[1], Phi.dtype)
+            projection = FactorizedPinv(Theta, projection_method, factor=projection)
+
+        return cls(Phi, kron_factor=kron_factor, pinv_method=pinv_method, projection=projection, dtype=Phi.dtype,
+                   dictionary=dictionary, **schedule)
+
+    def save(self, path):
+        """
+        Saves the plan to `path` (numpy `.npz` format), including the precomputed projection so that
+        `RecoveryPlan.load` does not have to redo the SVD. The `MatrixSpec` of the plan, if any, is saved too, so
+        that the loaded plan keeps its cache key.
+        """
+        projection, projection_method = self.projection_state()
+        schedule = {name: np.array(np.nan if value is None else value) for name, value in self.schedule.items()}
+        spec = {}
+        if self.spec is not None:
+            spec = {'spec_type': np.array(self.spec.matrix_type), 'spec_M': np.array(self.spec.M),
+                    'spec_N': np.array(self.spec.N),
+                    'spec_seed': np.array(-1 if self.spec.seed is None else self.spec.seed)}
+        np.savez(path, Phi=np.asarray(self.Phi), implicit=np.array(isinstance(self.Phi, DBDDOperator)),
+                 projection=projection, **spec,
+                 pinv_method=np.array(self.pinv_method), projection_method=np.array(projection_method),
+                 dictionary=np.array(self.dictionary),
+                 kron_factor=np.array(0 if self.kron_factor is None else self.kron_factor), **schedule)
+
+    @classmethod
+    def load(cls, path, cache=True):
+        """
+        Loads a plan written by `save`. If `cache` is True (default) the plan is also inserted in the
+        in-process cache, so later calls to `get_recovery_plan` (and the recovery functions) reuse it.
+        """
+        with np.load(path) as data:
+            kron_factor = int(data['kron_factor'])
+            Phi = data['Phi']
+            if 'implicit' in data and bool(data['implicit']):
+                Phi = DBDDOperator(*Phi.shape, dtype=Phi.dtype)
+            sigma_min = float(data['sigma_min'])
+            tol = float(data['tol']) if 'tol' in data else np.nan
+            plan = cls.from_projection(Phi, kron_factor if kron_factor > 0 else None, data['projection'],
+                                       str(data['projection_method']), pinv_method=str(data['pinv_method']),
+                                       dictionary=str(data['dictionary']) if 'dictionary' in data else 'dct',
+                                       sigma_min=None if np.isnan(sigma_min) else sigma_min,
+                                       sigma_decrease_factor=float(data['sigma_decrease_factor']),
+                                       mu_0=float(data['mu_0']), L=int(data['L']),
+                                       tol=None if np.isnan(tol) else tol,
+                                       warm_start=bool(data['warm_start']) if 'warm_start' in data else False)
+            if 'spec_type' in data:
+                seed = int(data['spec_seed'])
+                plan.spec = MatrixSpec(str(data['spec_type']), int(data['spec_M']), int(data['spec_N']),
+                                       None if seed < 0 else seed)
+
+        if cache:
+            _cache_plan(plan)
+        return plan
+
+
+def plan_key(Phi, kron_factor=None, pinv_method='pinv', dtype=np.float64, dictionary='dct'):
+    """
+    Returns the cache key of a recovery plan: a hash of the contents and shape of `Phi` (cast to `dtype`)
+    together with `kron_factor`, `pinv_method`, `dtype` and `dictionary`. Implicit `DBDDOperator` matrices get keys of
+    their own, distinct from the keys of the equivalent dense matrices, and so do `MatrixSpec` specs, which are
+    not generated to compute their key.
+    """
+    if isinstance(Phi, MatrixSpec):
+        return (f'MatrixSpec{tuple(Phi)}', kron_factor, pinv_method, np.dtype(dtype).str, dictionary)
+    if isinstance(Phi, DBDDOperator):
+        return (f'DBDDOperator{Phi.shape}', kron_factor, pinv_method, np.dtype(dtype).str, dictionary)
+    Phi = np.ascontiguousarray(Phi, dtype=dtype)
+    digest = hashlib.sha1(Phi.tobytes())
+    digest.update(repr(Phi.shape).encode())
+    return (digest.hexdigest(), kron_factor, pinv_method, Phi.dtype.str, dictionary)
+
+
+def get_recovery_plan(Phi, kron_factor=None, pinv_method='pinv', dtype=np.float64, metrics=None, dictionary='dct',
+                      **schedule):
+    """
+    Returns a `RecoveryPlan` for `Phi`, `kron_factor`, `pinv_method`, `dtype` and `dictionary`, building it
+    only if it is not already cached.
+
+    Plans are kept in an in-process LRU cache of at most `PLAN_CACHE_SIZE` entries, keyed by `plan_key`.
+    The SL0 sigma schedule (`sigma_min`, `sigma_decrease_factor`, `mu_0`, `L`, `tol`, `warm_start`) is not part
+    of the key: if given, the cached plan is returned through `RecoveryPlan.with_schedule`.
+
+    Parameters
+    ----------
+    Phi : numpy.ndarray
+        The measurement matrix of shape (M, N).
+
+    kron_factor : int, optional
+        The Kronecker factor, None (default) for the non-Kronecker recovery.
+
+    pinv_method : str, optional (default='pinv')
+        How the projection operator is built, see `RecoveryPlan`.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of the plan, see `RecoveryPlan`.
+
+    metrics : RecoveryMetrics, optional
+        Receives a 'plan_cache_hit' or 'plan_cache_miss' event and, on a miss, the build phases of the plan.
+
+    dictionary : str, optional (default='dct')
+        The sparsifying dictionary, 'dct' or a wavelet name, see `RecoveryPlan`.
+
+    **schedule
+        SL0 parameters stored in the returned plan.
+
+    Returns
+    -------
+    plan : RecoveryPlan
+        The (possibly cached) recovery plan.
+    """
+    key = plan_key(Phi, kron_factor, pinv_method, dtype, dictionary)
+
+    with _plan_cache_lock:
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            _plan_cache.move_to_end(key)
+
+    if metrics is not None:
+        metrics.on_event('plan_cache_miss' if plan is None else 'plan_cache_hit')
+
+    if plan is None:
+        plan = _cache_plan(RecoveryPlan(Phi, kron_factor, pinv_method=pinv_method, dtype=dtype, metrics=metrics,
+                                        dictionary=dictionary))
+
+    return plan.with_schedule(**schedule) if schedule else plan
+
+
+def clear_plan_cache():
+    """Removes every plan from the in-process cache used by `get_recovery_plan`."""
+    with _plan_cache_lock:
+        _plan_cache.clear()
+
+
+def _cache_plan(plan):
+    """Inserts `plan` in the LRU cache, dropping the least recently used plans if it is full."""
+    with _plan_cache_lock:
+        _plan_cache[plan.key] = plan
+        _plan_cache.move_to_end(plan.key)
+        while len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    return plan
@@ -1,6 +1,8 @@
 import numpy as np
 
-def compressSignal(signal, Phi):
+from .measurementMatrix import DBDDOperator, MatrixSpec  # Importing from measurementMatrix.py
+
+def compressSignal(signal, Phi, chunk_size=None, out=None, dtype=np.float64):
     """
     Performs the sampling phase of Compressed Sensing (CS) by compressing a signal using a provided measurement matrix.
 
@@ -12,18 +14,39 @@ def compressSignal(signal, Phi):
     Parameters
     ----------
     signal : numpy.ndarray
-        The original signal to be compressed, represented as a 1-dimensional array.
+        The original signal to be compressed, represented as a 1-dimensional array. A 2-D array of shape 
+        (leads, samples), e.g. both leads of a MIT-BIH record, is also accepted: every lead is compressed with 
+        the same `Phi`.
     
-    Phi : numpy.ndarray
+    Phi : numpy.ndarray, DBDDOperator or MatrixSpec
         The measurement matrix used for compressed sensing, of shape (M, N), where:
         - M is the number of measurements (rows of the compressed signal).
         - N is the length of each block of the original signal to be sampled.
+        With an implicit `DBDDOperator` every block is compressed by summing runs of `N // M` samples, in O(N)
+        operations per block instead of O(M * N). A `MatrixSpec` is generated first (as a `DBDDOperator` for the 
+        'DBDD' type).
+
+    chunk_size : int, optional
+        If provided, the signal is compressed `chunk_size` blocks at a time, so only that many samples are read 
+        from `signal` at once. Useful when `signal` is a `np.memmap` (or any other sliceable array-like source) 
+        too large to be loaded in memory. If None (default), all the blocks are compressed in one pass. It must 
+        be at least 1, a `ValueError` is raised otherwise.
+
+    out : numpy.ndarray, optional
+        A preallocated array of shape (M, BLOCK_NUM), or (leads, M, BLOCK_NUM), where the result is written, e.g. a view on shared or 
+        memory-mapped memory. If None (default), a new array is allocated.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of `Y` (e.g. `np.float32` for the single precision mode). `Phi` is cast to it 
+        before sampling. Ignored if `out` is provided, the type of `out` is used instead.
 
     Returns
     -------
     Y : numpy.ndarray
         The compressed signal matrix of shape (M, BLOCK_NUM), where BLOCK_NUM is the 
         number of non-overlapping blocks created by dividing the length of the input signal by `N`.
+        If `signal` is 2-D, `Y` has shape (leads, M, BLOCK_NUM) and `Y[i]` is the compressed lead `i`.
+        If `out` is provided, `Y` is `out`.
 
     Notes
     -----
@@ -34,20 +57,61 @@ def compressSignal(signal, Phi):
       If `Phi` has more columns than the length of the signal block, a `ValueError` will be raised due to a shape mismatch.
     - This function is a key step in the sampling phase of Compressed Sensing, where a sparse signal is projected 
       into a lower-dimensional space using random or structured measurements.
+    - The blocks are not processed one by one: the signal is reshaped into a (BLOCK_NUM, N) view and compressed 
+      with a single matrix-matrix product (one per chunk in chunked mode), with no intermediate copies.
     """
     
+    if chunk_size is not None and int(chunk_size) < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}.")
+
+    if isinstance(Phi, MatrixSpec):
+        Phi = Phi.generate(dtype if out is None else out.dtype, implicit=True)
+
     # length of signal block
     N = Phi.shape[1]
 
     # length of compressed block
     M = Phi.shape[0]
 
+    if np.ndim(signal) == 2:
+        # multi-lead signal: compress every lead in its own slice of Y
+        LEADS, BLOCK_NUM = signal.shape[0], signal.shape[1] // N
+        if out is None:
+            Y = np.empty((LEADS, M, BLOCK_NUM), dtype=dtype)
+        elif out.shape != (LEADS, M, BLOCK_NUM):
+            raise ValueError(f"out must have shape {(LEADS, M, BLOCK_NUM)}, got {out.shape}.")
+        else:
+            Y = out
+        for lead in range(LEADS):
+            compressSignal(signal[lead], Phi, chunk_size, out=Y[lead])
+        return Y
+
     # number of blocks
     BLOCK_NUM = len(signal) // N
 
     # each column of Y is the compressed version of a block of signal
-    Y = np.zeros((M, BLOCK_NUM))    
-    for i in range(BLOCK_NUM):
-        Y[:,i] = Phi @ signal[i*N:(i+1)*N]
-    
+    if out is None:
+        Y = np.empty((M, BLOCK_NUM), dtype=dtype)
+    else:
+        if out.shape != (M, BLOCK_NUM):
+            raise ValueError(f"out must have shape {(M, BLOCK_NUM)}, got {out.shape}.")
+        Y = out
+
+    structured = isinstance(Phi, DBDDOperator)
+    if not structured:
+        Phi = np.asarray(Phi, dtype=Y.dtype)
+
+    chunk_size = BLOCK_NUM if chunk_size is None else int(chunk_size)
+
+    for start in range(0, BLOCK_NUM, max(chunk_size, 1)):
+        stop = min(start + chunk_size, BLOCK_NUM)
+        # row i of blocks is the i-th block of this chunk, so Phi @ blocks.T has one compressed block per column
+        blocks = np.asarray(signal[start*N:stop*N]).reshape(stop - start, N)
+        if structured:
+            # DBDD: sum every run of N // M samples of each block, additions only (O(N)), as `DBDDOperator`
+            sums = blocks.reshape(-1, Phi.m).sum(axis=-1, dtype=Y.dtype)
+            Y[:, start:stop] = sums.reshape(stop - start, M).T
+        else:
+            np.matmul(Phi, blocks.T, out=Y[:, start:stop])
+
     return Y
@@ -1,8 +1,10 @@
+import warnings
+
 import numpy as np
-import scipy.fftpack as fftpack
-import pywt
 
-def generate_DCT_dictionary(N):
+# scipy.fftpack and PyWavelets are imported by the functions using them, so that importing this module is cheap
+
+def generate_DCT_dictionary(N, dtype=np.float64):
     """
     Generates a Discrete Cosine Transform (DCT) orthonormal basis matrix.
 
@@ -18,6 +20,9 @@ def generate_DCT_dictionary(N):
     N : int
         The size of the dictionary (i.e., the length of the signal).
 
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of the dictionary, e.g. `np.float32` for the single precision mode.
+
     Returns
     -------
     dict_matrix : numpy.ndarray
@@ -33,8 +38,10 @@ def generate_DCT_dictionary(N):
            [ 0.27059805, -0.65328148,  0.65328148, -0.27059805]])
     """
     
+    import scipy.fftpack as fftpack
+
     # Generate a DCT basis dictionary
-    dict_matrix = fftpack.dct(np.eye(N), norm='ortho')    
+    dict_matrix = fftpack.dct(np.eye(N, dtype=dtype), norm='ortho')
     return dict_matrix
 
 
@@ -45,6 +52,9 @@ def generate_DWT_basis(dim, wavelet='db5', mode='per', level=None):
     BEWARE: This function is not working properly!
     - Result matrix is orthonormal, but doesn't work for compressed sensing! So it's not computing
        the correct dictionary ...
+    - Column i holds the wavelet coefficients of the i-th identity vector, so this is the analysis
+       matrix, i.e. the transpose of the dictionary. Use `generate_DWT_dictionary` or the matrix-free
+       `WaveletDictionary` to recover with a wavelet dictionary.
 
 
 
@@ -118,6 +128,8 @@ def generate_DWT_basis(dim, wavelet='db5', mode='per', level=None):
         print("Level provided is greater than max_level=log2(dim); setting level to log2(dim).")
         level = int(np.log2(dim))
 
+    import pywt
+
     # Initialize the basis matrix
     basis_matrix = np.zeros((dim, dim))
     
@@ -132,6 +144,152 @@ def generate_DWT_basis(dim, wavelet='db5', mode='per', level=None):
 
 
 
+class WaveletDictionary:
+    """
+    Matrix-free orthonormal wavelet dictionary `Dict` of size N x N, applied with PyWavelets.
+
+    `Dict @ s` (synthesis) is `pywt.waverec` of the coefficient vector `s` and `Dict.T @ x` (analysis) is
+    `pywt.wavedec` of `x`, both with the 'periodization' extension mode, which makes the transform exactly
+    orthonormal (`Dict.T = inv(Dict)`) when N is a multiple of `2**level`. They cost O(N) per vector and act
+    on whole batches at once (one vector per column), so no N x N matrix is built and DWT recovery scales to
+    Kronecker block sizes.
+
+    The coefficients are laid out as `np.concatenate(pywt.wavedec(x, ...))`: approximation first, then the
+    details from the coarsest to the finest level.
+
+    Parameters
+    ----------
+    N : int
+        The size of the dictionary (i.e., the length of the signal).
+
+    wavelet : str, optional (default='db5')
+        The name of an orthogonal wavelet of PyWavelets, e.g. 'haar', 'db1' to 'db20', 'sym2' to 'sym20'.
+
+    level : int, optional
+        The level of decomposition. Defaults to the largest level such that N is a multiple of `2**level`
+        (`log2(N)` for powers of 2), which may exceed `pywt.dwt_max_level`: with periodization the transform
+        stays orthonormal.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of `toarray`, the transforms keep the type of their input.
+
+    Raises
+    ------
+    ValueError
+        If `wavelet` is not orthogonal, or if `level` is not between 1 and the default level.
+
+    Example
+    -------
+    >>> Dict = WaveletDictionary(16, 'db4')
+    >>> x = Dict @ s            # synthesis, s of shape (16,) or (16, B)
+    >>> s = Dict.T @ x          # analysis
+    >>> np.allclose(Dict.toarray() @ Dict.toarray().T, np.eye(16))
+    True
+    """
+
+    def __init__(self, N, wavelet='db5', level=None, dtype=np.float64):
+        import pywt
+
+        self.wavelet = pywt.Wavelet(wavelet)
+        if not self.wavelet.orthogonal:
+            raise ValueError(f"Wavelet '{wavelet}' is not orthogonal.")
+
+        N = int(N)
+        max_level = (N & -N).bit_length() - 1  # largest level such that N is a multiple of 2**level
+        if level is None:
+            level = max_level
+        if not 1 <= level <= max_level:
+            raise ValueError(f"Level must be between 1 and {max_level} for N={N}.")
+
+        self.N = N
+        self.level = int(level)
+        self.shape = (N, N)
+        self.dtype = np.dtype(dtype)
+
+        # lengths of the approximation and detail coefficients, from the coarsest level to the finest
+        lengths = [N >> self.level] + [N >> l for l in range(self.level, 0, -1)]
+        self._splits = np.cumsum(lengths)[:-1]
+
+    def __matmul__(self, s):
+        return self.synthesize(s)
+
+    @property
+    def T(self):
+        """Transpose (and inverse) of the dictionary, i.e. the wavelet analysis."""
+        return _WaveletAnalysisOperator(self)
+
+    def synthesize(self, s):
+        """Returns `Dict @ s`: the inverse DWT along the first axis of the coefficients `s`."""
+        import pywt
+
+        coeffs = np.split(np.asarray(s), self._splits, axis=0)
+        return pywt.waverec(coeffs, self.wavelet, mode='periodization', axis=0)
+
+    def analyze(self, x):
+        """Returns `Dict.T @ x`: the DWT along the first axis of `x`."""
+        import pywt
+
+        with warnings.catch_warnings():
+            # levels above pywt.dwt_max_level are fine with periodization
+            warnings.simplefilter('ignore', UserWarning)
+            coeffs = pywt.wavedec(np.asarray(x), self.wavelet, mode='periodization', level=self.level, axis=0)
+        return np.concatenate(coeffs, axis=0)
+
+    def toarray(self):
+        """Returns the dense N x N dictionary, each column is a wavelet atom."""
+        return self.synthesize(np.eye(self.N, dtype=self.dtype))
+
+
+class _WaveletAnalysisOperator:
+    """Applies `Dict.T` of a `WaveletDictionary`, i.e. the wavelet analysis."""
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+        self.shape = dictionary.shape
+
+    def __matmul__(self, x):
+        return self.dictionary.analyze(x)
+
+
+def generate_DWT_dictionary(N, wavelet='db5', level=None, dtype=np.float64):
+    """
+    Generates an orthonormal wavelet dictionary matrix, the dense form of `WaveletDictionary`.
+
+    Unlike `generate_DWT_basis`, each column is a wavelet atom (the synthesis of one coefficient), so the
+    matrix can be used as a sparsifying dictionary in place of `generate_DCT_dictionary`: a signal `x` is
+    represented as `x = Dict @ s` with sparse `s`. It is built with one batched inverse DWT, not one
+    transform per column.
+
+    Parameters
+    ----------
+    N : int
+        The size of the dictionary (i.e., the length of the signal).
+
+    wavelet, level : optional
+        See `WaveletDictionary`.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of the dictionary.
+
+    Returns
+    -------
+    dict_matrix : numpy.ndarray
+        The wavelet dictionary matrix of shape (N, N).
+    """
+    return WaveletDictionary(N, wavelet, level, dtype).toarray()
+
+
+def sparsifying_dictionary(dictionary, N, dtype=np.float64):
+    """
+    Returns the dense N x N sparsifying dictionary named `dictionary`: 'dct' for `generate_DCT_dictionary`,
+    or the name of an orthogonal wavelet (e.g. 'db4') for `generate_DWT_dictionary` at full depth.
+    """
+    if dictionary == 'dct':
+        return generate_DCT_dictionary(N, dtype)
+    return generate_DWT_dictionary(N, dictionary, dtype=dtype)
+
+
+
 
 
 ## ------------------------------------------------------------------------------------------------
@@ -164,6 +322,7 @@ def compute_independent_columns(A, tol=1e-10):
     -----
     - The QR decomposition is used to determine the rank of the matrix `A`.
     - Columns corresponding to non-zero diagonal elements of the `R` matrix are considered independent.
+    - For the rank alone of a large matrix or of a matrix-free operator, see `compute_rank`.
 
     Example
     -------
@@ -173,8 +332,8 @@ def compute_independent_columns(A, tol=1e-10):
            [4, 5],
            [7, 8]])
     """
-    # Perform the QR decomposition
-    Q, R = np.linalg.qr(A)
+    # Perform the QR decomposition (only R is needed, Q is never formed)
+    R = np.linalg.qr(A, mode='r')
 
     # Find the independent columns based on the rank of R
     rank = np.sum(np.abs(np.diagonal(R)) > tol)
@@ -210,7 +369,7 @@ def check_normalization(A):
     return is_normalized
 
 
-def compute_coherence(matrix):
+def compute_coherence(matrix, max_bytes=2**28, return_pair=False, samples=None, seed=None):
     """
     Computes the coherence of the given matrix.
 
@@ -218,10 +377,29 @@ def compute_coherence(matrix):
     It is useful in various applications, such as signal processing and compressed sensing, 
     to assess the degree of similarity between different columns of the matrix.
 
+    The Gram matrix is never formed: the normalized columns are taken in tiles and only the Gram tile of two
+    column tiles (and the tiles themselves) is held at a time, within `max_bytes`. Each pair of tiles is visited
+    once (the Gram matrix is symmetric).
+
     Parameters
     ----------
-    matrix : numpy.ndarray
-        An N x M matrix where coherence is to be calculated.
+    matrix : numpy.ndarray or operator
+        An N x M matrix where coherence is to be calculated. Any operator with a `shape` and a `@` applying it to
+        a 2-D array (e.g. a `KroneckerDCTOperator`) is also accepted: its columns are computed a tile at a time.
+
+    max_bytes : int, optional (default=2**28)
+        Memory budget in bytes for the column tiles and their Gram tile.
+
+    return_pair : bool, optional (default=False)
+        If True, the indices `(i, j)`, `i < j`, of the two most coherent columns are returned as well.
+
+    samples : int, optional
+        If provided, a fast randomized estimate: only the pairs involving one of `samples` columns drawn at random
+        are checked (`samples / M` of the work), which gives a lower bound of the coherence. If None (default),
+        the exact coherence is computed.
+
+    seed : int or numpy.random.Generator, optional
+        Seed of the columns drawn with `samples`.
 
     Returns
     -------
@@ -229,22 +407,145 @@ def compute_coherence(matrix):
         The coherence of the matrix, defined as the maximum absolute value of the off-diagonal 
         elements in the Gram matrix of the column-normalized input matrix.
 
+    pair : tuple of int
+        With `return_pair`, the columns `(i, j)` whose normalized inner product is `coherence`.
+
     Example
     -------
     >>> matrix = np.array([[1, 0], [0, 1]])
     >>> compute_coherence(matrix)
     0.0
+    >>> compute_coherence(Theta_kron, return_pair=True)  # Theta of a kron_recovery plan, matrix-free
+    (0.6532814824381883, (0, 17))
     """
-    # Normalize the columns of the matrix
-    normalized_matrix = matrix / np.linalg.norm(matrix, axis=0, keepdims=True)
-    
-    # Compute the Gram matrix (inner products between all pairs of columns)
-    gram_matrix = np.dot(normalized_matrix.T, normalized_matrix)
-    
-    # Remove the diagonal elements (which are all 1's) to only consider distinct columns
-    np.fill_diagonal(gram_matrix, 0)
-    
-    # Compute the coherence as the maximum absolute value of the off-diagonal elements
-    coherence = np.max(np.abs(gram_matrix))
-    
-    return coherence
+    N, M = matrix.shape
+    # memory of one column of a tile, plus the identity column it is computed from for operators
+    length = N if isinstance(matrix, np.ndarray) else N + M
+
+    # Column norms, computed a tile at a time
+    tile = _tile_columns(max_bytes, length)
+    norms = np.concatenate([np.linalg.norm(_column_tile(matrix, np.arange(start, min(start + tile, M))), axis=0)
+                            for start in range(0, M, tile)])
+
+    if samples is None:
+        rows = np.arange(M)
+    else:
+        rows = np.sort(np.random.default_rng(seed).choice(M, size=min(int(samples), M), replace=False))
+
+    # tiles of the (sampled) columns against tiles of the columns: two column tiles and their Gram tile at a time
+    tile = _tile_columns(max_bytes, length, copies=2, gram=True)
+    coherence, pair = -np.inf, (0, 0)
+    for row_start in range(0, rows.size, tile):
+        row_columns = rows[row_start:row_start + tile]
+        A = _column_tile(matrix, row_columns) / norms[row_columns]
+
+        # exact: only the tiles on and above the diagonal, the Gram matrix is symmetric
+        for start in range(row_columns[0] if samples is None else 0, M, tile):
+            columns = np.arange(start, min(start + tile, M))
+            gram = np.abs(A.T @ (_column_tile(matrix, columns) / norms[columns]))
+
+            # Remove the inner products of a column with itself (and the pairs seen twice in diagonal tiles)
+            if samples is None:
+                gram[row_columns[:, np.newaxis] >= columns] = -np.inf
+            else:
+                gram[row_columns[:, np.newaxis] == columns] = -np.inf
+
+            i, j = np.unravel_index(np.argmax(gram), gram.shape)
+            if gram[i, j] > coherence:
+                coherence, pair = gram[i, j], tuple(sorted((int(row_columns[i]), int(columns[j]))))
+
+    coherence = float(max(coherence, 0.0))
+    return (coherence, pair) if return_pair else coherence
+
+
+def compute_rank(A, tol=None, max_bytes=2**28):
+    """
+    Computes the rank of a matrix without forming its full QR or SVD factorization.
+
+    The short side of `A` is kept: for a wide M x N matrix (M < N), `A.T` is reduced a tile of columns of `A` at a
+    time by a running QR (`R = qr([R; A_tile.T])`, only the M x M `R` is kept), and the rank is read from the
+    singular values of the final `R`, which are those of `A`. Tall matrices are handled the same way by tiles of
+    rows. Unlike the Gram matrix `A @ A.T`, this does not square the condition number.
+
+    Parameters
+    ----------
+    A : numpy.ndarray or operator
+        The matrix. A wide operator with a `shape` and a `@` applying it to a 2-D array (e.g. a
+        `KroneckerDCTOperator`) is also accepted: its columns are computed a tile at a time.
+
+    tol : float, optional
+        Singular values above `tol` count towards the rank. If None (default), `S.max() * max(M, N) * eps`, as in
+        `np.linalg.matrix_rank`.
+
+    max_bytes : int, optional (default=2**28)
+        Memory budget in bytes for `R` and the tiles. It must at least hold the `min(M, N)` square `R` and two
+        copies of a single column (or row) of the tile.
+
+    Returns
+    -------
+    rank : int
+        The rank of `A`.
+
+    Raises
+    ------
+    ValueError
+        If `max_bytes` is below that minimum.
+
+    Example
+    -------
+    >>> compute_rank(np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]]))
+    2
+    """
+    M, N = A.shape
+    dtype = np.result_type(getattr(A, 'dtype', np.float64), np.float64)
+    small = min(M, N)
+
+    # entries of a tile column: rows of A.T are columns of A (plus the identity for operators), or rows of A
+    length = (M if isinstance(A, np.ndarray) else M + N) if M <= N else N
+    min_bytes = 8 * (small * small + 2 * length)
+    if max_bytes < min_bytes:
+        raise ValueError(f"max_bytes={max_bytes} cannot hold R and one tile column, at least {min_bytes} bytes "
+                         "are needed.")
+
+    R = np.zeros((0, small), dtype=dtype)
+    if M <= N:
+        # tiles of the stacked [R; A_tile.T]
+        tile = _tile_columns(max_bytes - 8 * small * small, length, copies=2)
+        for start in range(0, N, tile):
+            R = np.linalg.qr(np.vstack([R, _column_tile(A, np.arange(start, min(start + tile, N))).T]), mode='r')
+    else:
+        A = np.asarray(A)
+        tile = _tile_columns(max_bytes - 8 * small * small, length, copies=2)
+        for start in range(0, M, tile):
+            R = np.linalg.qr(np.vstack([R, A[start:start + tile]]), mode='r')
+
+    S = np.linalg.svd(R, compute_uv=False)
+    if S.size == 0:
+        return 0
+    if tol is None:
+        tol = S.max() * max(M, N) * np.finfo(dtype).eps
+    return int(np.sum(S > tol))
+
+
+def _tile_columns(max_bytes, length, copies=1, gram=False):
+    """
+    Number of float64 columns of `length` entries per tile such that `copies` tiles, and their square Gram tile
+    if `gram`, fit in `max_bytes` (at least 1).
+    """
+    budget = max_bytes / 8
+    if gram:
+        # tile**2 + copies * length * tile <= budget
+        b = copies * length
+        tile = (np.sqrt(b * b + 4 * budget) - b) / 2
+    else:
+        tile = budget / (copies * length)
+    return max(int(tile), 1)
+
+
+def _column_tile(matrix, columns):
+    """Returns the given columns of a matrix, or of an operator applied to the same columns of the identity."""
+    if isinstance(matrix, np.ndarray):
+        return matrix[:, columns]
+    identity = np.zeros((matrix.shape[1], len(columns)))
+    identity[columns, np.arange(len(columns))] = 1.0
+    return np.asarray(matrix @ identity)
@@ -39,6 +39,8 @@ def sparseSignal(N, K=None, sigma_inactive=0.01, sigma_active=0.5, fixedActiveVa
       with standard deviation `sigma_active`.
     - Gaussian noise with standard deviation `sigma_inactive` is then added to the inactive components, 
       ensuring they have small random values near zero.
+    - This function draws from the global `np.random` state, one signal per call. Use `sparse_signal_batch` or
+      `sparse_signal_stream` to draw many signals at once from a seeded `np.random.Generator`.
 
     Example:
     --------
@@ -76,3 +78,123 @@ def sparseSignal(N, K=None, sigma_inactive=0.01, sigma_active=0.5, fixedActiveVa
     signal[active_indexes == 0] += np.random.randn(N - K) * sigma_inactive
 
     return signal, np.where(active_indexes == 1)[0]
+
+
+def sparse_signal_batch(batch, N, K=None, sigma_inactive=0.01, sigma_active=0.5, fixedActiveValue=None, seed=None,
+                        dtype=np.float64):
+    """
+    Generates `batch` K-sparse signals at once, as `sparseSignal` does for one signal.
+
+    All the random numbers come from one `np.random.Generator` and each step is a single vectorized call on the
+    whole batch: the supports are the `K` smallest of `batch * N` uniform keys (`np.argpartition`, a uniform
+    random K-subset per row), the inactive components are Gaussian noise and the active ones are written over it
+    with `np.put_along_axis`.
+
+    Parameters
+    ----------
+    batch : int
+        Number of signals.
+
+    N : int
+        The total number of components of each signal.
+
+    K : int, optional
+        The number of active components of each signal. If not provided, defaults to 10% of `N`.
+
+    sigma_inactive, sigma_active, fixedActiveValue
+        Same as in `sparseSignal`.
+
+    seed : int, numpy.random.Generator or None, optional
+        Seed of `np.random.default_rng`, or a Generator to draw from (advancing its state). If None (default),
+        fresh entropy is used.
+
+    dtype : data-type, optional (default=np.float64)
+        The floating point type of the signals.
+
+    Returns
+    -------
+    signals : numpy.ndarray
+        Array of shape (batch, N), one signal per row.
+
+    supports : numpy.ndarray
+        Array of shape (batch, K) with the sorted indices of the active components of each signal.
+
+    Raises
+    ------
+    ValueError
+        If `K` is not between 0 and `N`.
+
+    Example
+    -------
+    >>> signals, supports = sparse_signal_batch(100000, 64, K=6, seed=0)
+    >>> signals.shape, supports.shape
+    ((100000, 64), (100000, 6))
+    """
+    batch, N = int(batch), int(N)
+    K = int(0.1 * N) if K is None else int(K)
+    if not 0 <= K <= N:
+        raise ValueError(f"K must be between 0 and N={N}, got {K}.")
+    rng = np.random.default_rng(seed)
+
+    # K distinct indices per row, uniformly distributed over the K-subsets
+    if K == N:
+        supports = np.broadcast_to(np.arange(N), (batch, N)).copy()
+    elif K == 0:
+        supports = np.empty((batch, 0), dtype=np.intp)
+    else:
+        supports = np.argpartition(rng.random((batch, N)), K - 1, axis=1)[:, :K]
+        supports.sort(axis=1)
+
+    # Gaussian noise everywhere, then the active components written over it
+    signals = rng.standard_normal((batch, N), dtype=dtype)
+    signals *= sigma_inactive
+    if fixedActiveValue is None:
+        active = rng.standard_normal((batch, K), dtype=dtype)
+        active *= sigma_active
+    else:
+        active = np.full((batch, K), fixedActiveValue, dtype=dtype)
+    np.put_along_axis(signals, supports, active, axis=1)
+
+    return signals, supports
+
+
+def sparse_signal_stream(N, K=None, total=None, chunk_size=4096, sigma_inactive=0.01, sigma_active=0.5,
+                         fixedActiveValue=None, seed=None, dtype=np.float64):
+    """
+    Yields K-sparse signals in chunks of `chunk_size`, for experiments too large to hold in memory at once.
+
+    Each chunk is a `sparse_signal_batch` call drawing from the same `np.random.Generator`, so the whole stream is
+    reproducible from `seed` (for a given `chunk_size`) and memory stays at one chunk.
+
+    Parameters
+    ----------
+    N, K, sigma_inactive, sigma_active, fixedActiveValue, dtype
+        Same as in `sparse_signal_batch`.
+
+    total : int, optional
+        Total number of signals, the last chunk holds the remainder. If None (default), the stream is endless.
+
+    chunk_size : int, optional (default=4096)
+        Number of signals per chunk.
+
+    seed : int, numpy.random.Generator or None, optional
+        Same as in `sparse_signal_batch`.
+
+    Yields
+    ------
+    signals, supports : numpy.ndarray
+        One chunk, with shapes (chunk, N) and (chunk, K).
+
+    Example
+    -------
+    >>> for signals, supports in sparse_signal_stream(64, K=6, total=10**7, seed=0):
+    ...     Y = Phi @ signals.T  # one batch of measurements per chunk
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive.")
+    rng = np.random.default_rng(seed)
+    produced = 0
+    while total is None or produced < total:
+        size = chunk_size if total is None else min(chunk_size, total - produced)
+        yield sparse_signal_batch(size, N, K, sigma_inactive, sigma_active, fixedActiveValue, seed=rng, dtype=dtype)
+        produced += size
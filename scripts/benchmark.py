@@ -0,0 +1,215 @@
+"""
+Headless benchmark suite for compSensPack on the bundled MIT-BIH record 100m.mat.
+
+Times `compressSignal`, `non_kron_recovery`, `kron_recovery` and `SL0` over grids of block size, Kronecker
+factor, compression ratio and measurement matrix type, and the import time of the package in fresh interpreters.
+Reports samples/second, peak traced memory and SNR, and writes the results to a JSON file so that runs of
+different versions can be compared:
+
+    python scripts/benchmark.py --output results_new.json --baseline results_old.json
+
+Run from the root directory of the project.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import scipy
+
+import compSensPack as csp
+
+
+MATRIX_TYPES = ('DBDD', 'DBDD_implicit', 'gaussian', 'scaled_binary', 'unscaled_binary')
+
+# imports timed in a fresh interpreter, e.g. what a worker process of `parallel_recovery` pays at start-up
+IMPORT_STATEMENTS = (
+    'import compSensPack',
+    'from compSensPack import SL0',
+    'from compSensPack import compressSignal',
+    'from compSensPack import kron_recovery',
+    'from compSensPack import plot_signals',
+)
+
+GRIDS = {
+    'quick': {'n_block': [16], 'kron_factor': [8], 'CR': [1/4], 'matrix_type': ['DBDD', 'unscaled_binary']},
+    'default': {'n_block': [16, 32], 'kron_factor': [4, 8, 32], 'CR': [1/4, 1/2], 'matrix_type': list(MATRIX_TYPES)},
+}
+
+
+def load_signal(path, lead, samples):
+    """Loads `samples` samples (all if None) of lead `lead` of a MIT-BIH .mat record as float64."""
+    signal = csp.load_record(path).lead(lead)
+    return np.array(signal if samples is None else signal[:samples], dtype=np.float64)
+
+
+def measurement_matrix(matrix_type, m_block, n_block, seed):
+    """Generates the measurement matrix of the given type, reproducibly."""
+    if matrix_type == 'DBDD':
+        return csp.generate_DBDD_matrix(m_block, n_block)
+    if matrix_type == 'DBDD_implicit':
+        return csp.generate_DBDD_matrix(m_block, n_block, implicit=True)
+    return csp.generate_random_matrix(m_block, n_block, matrix_type=matrix_type, seed=seed)
+
+
+def measure(func, repeat):
+    """
+    Runs `func` once with the plan cache cleared (cold), `repeat` times warm, and once more under tracemalloc.
+    Returns the output of the last warm run, the cold time, the best warm time and the peak traced memory.
+    """
+    csp.clear_plan_cache()
+    start = time.perf_counter()
+    func()
+    cold = time.perf_counter() - start
+
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return out, cold, best, peak
+
+
+def measure_imports(repeat):
+    """Times every statement of `IMPORT_STATEMENTS` in `repeat` fresh interpreters and returns the result records."""
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(csp.__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+
+    results = []
+    for statement in IMPORT_STATEMENTS:
+        code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+        times = [float(subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True,
+                                      text=True).stdout) for _ in range(max(repeat, 1))]
+        results.append({'benchmark': 'import', 'statement': statement, 'cold_time_s': times[0],
+                        'time_s': min(times)})
+        print(f"{'import':18s} {statement:80s} {min(times) * 1e3:10.1f} ms")
+    return results
+
+
+def run_benchmarks(signal, grid, sigma_min, repeat, seed):
+    """Runs every benchmark of the grid and returns the list of result records."""
+    results = []
+
+    def record(benchmark, config, samples, cold, best, peak, snr=None):
+        results.append(dict(config, benchmark=benchmark, samples=samples, cold_time_s=cold, time_s=best,
+                            samples_per_s=samples / best if best > 0 else None, peak_mem_bytes=peak, snr_db=snr))
+        print(f"{benchmark:18s} {json.dumps(config):80s} {samples / best:14.0f} samples/s "
+              f"{peak / 2**20:9.2f} MiB" + ("" if snr is None else f"  SNR {snr:6.2f} dB"))
+
+    for n_block, CR, matrix_type in itertools.product(grid['n_block'], grid['CR'], grid['matrix_type']):
+        m_block = int(n_block * CR)
+        Phi = measurement_matrix(matrix_type, m_block, n_block, seed)
+        config = {'n_block': n_block, 'CR': CR, 'matrix_type': matrix_type}
+
+        # SAMPLING
+        Y, cold, best, peak = measure(lambda: csp.compressSignal(signal, Phi), repeat)
+        N = Y.shape[1] * n_block
+        x = signal[:N]
+        record('compressSignal', config, N, cold, best, peak)
+
+        # SL0 alone, on the non-Kronecker Theta
+        plan = csp.get_recovery_plan(Phi, sigma_min=sigma_min)
+        _, cold, best, peak = measure(lambda: csp.SL0(Y, plan.Theta, sigma_min, A_pinv=plan.Theta_pinv), repeat)
+        record('SL0', config, N, cold, best, peak)
+
+        # RECOVERY non-KRONECKER
+        x_hat, cold, best, peak = measure(lambda: csp.non_kron_recovery(Y, sigma_min, Phi), repeat)
+        record('non_kron_recovery', config, N, cold, best, peak, csp.calculate_snr(x, x_hat))
+
+        # RECOVERY KRONECKER
+        for kron_factor in grid['kron_factor']:
+            N_kron = (Y.shape[1] // kron_factor) * kron_factor * n_block
+            if N_kron == 0:
+                continue
+            x_hat, cold, best, peak = measure(lambda: csp.kron_recovery(Y, sigma_min, Phi, kron_factor), repeat)
+            record('kron_recovery', dict(config, kron_factor=kron_factor), N_kron, cold, best, peak,
+                   csp.calculate_snr(x[:N_kron], x_hat[:N_kron]))
+
+    return results
+
+
+def compare(results, baseline_path):
+    """Prints the speed ratio and SNR change of every benchmark also present in the baseline file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+
+    def key(r):
+        return (r['benchmark'], r.get('statement'), r.get('n_block'), r.get('CR'), r.get('matrix_type'),
+                r.get('kron_factor'))
+
+    old = {key(r): r for r in baseline}
+    print(f"\nComparison with {baseline_path} (speedup > 1 is faster):")
+    for r in results:
+        b = old.get(key(r))
+        if b is None:
+            continue
+        line = f"{r['benchmark']:18s} {str(r.get('statement') or key(r)[2:]):45s} speedup {b['time_s'] / r['time_s']:6.2f}x"
+        if r.get('snr_db') is not None and b.get('snr_db') is not None:
+            line += f"  SNR {r['snr_db'] - b['snr_db']:+7.3f} dB"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--record', default='100m.mat', help="MIT-BIH .mat record (default: 100m.mat)")
+    parser.add_argument('--lead', type=int, default=0, help="lead to use, 0 is MLII and 1 is V5 (default: 0)")
+    parser.add_argument('--samples', type=int, default=131072,
+                        help="number of samples of the record to use, 0 for the whole record (default: 131072)")
+    parser.add_argument('--grid', choices=sorted(GRIDS), default='default', help="parameter grid (default: default)")
+    parser.add_argument('--sigma-min', type=float, default=0.004, help="SL0 sigma_min (default: 0.004)")
+    parser.add_argument('--repeat', type=int, default=3, help="warm runs per benchmark, best is kept (default: 3)")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the random measurement matrices (default: 0)")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON file for the results")
+    parser.add_argument('--baseline', help="JSON file of a previous run to compare against")
+    args = parser.parse_args()
+
+    signal = load_signal(args.record, args.lead, args.samples or None)
+    print(f"Record {args.record}, lead {args.lead}, {signal.size} samples, grid '{args.grid}'\n")
+
+    results = measure_imports(args.repeat)
+    results += run_benchmarks(signal, GRIDS[args.grid], args.sigma_min, args.repeat, args.seed)
+
+    output = {
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'compSensPack': csp.__version__,
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'record': args.record,
+            'lead': args.lead,
+            'samples': int(signal.size),
+            'grid': args.grid,
+            'sigma_min': args.sigma_min,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
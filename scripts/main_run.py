@@ -1,13 +1,11 @@
-import scipy.io
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import os
 import compSensPack as csp
 
 def main():
 
-    # non blocking plots, uncomment if you want the program to AVOID blocking the plots
-    # then you can simply look for the plots in the 'plots' directory
-    #plt.ion()
+    # plots are rendered off-screen (Agg backend) and never block the program,
+    # look for them in the 'plots' directory
 
     # I put this here because you have to decide kron fact based on
     # the signal length, but for testing reasons I prefer to do the 
@@ -21,24 +19,26 @@ def main():
 
     ## DATA
     # ----------------------------------------------------------------
-    #  upload data
-    data = scipy.io.loadmat('100m.mat')
-    # retrieve the key to a string
-    key = list(data.keys())[0]
+    #  open the record: the .mat is parsed only on the first run, then it is memory-mapped from its .npy cache
+    leads = ['MLII', 'V5']
+    record = csp.load_record('100m.mat', lead_names=leads)
     # retrieve the values
-    signal = data[key][0,:]  # [0 or 1, 0:650000] s.t. first dim: (0 is MLII, 1 is V5)
+    signal = record.signal  # [0:2, 0:650000] s.t. first dim: (0 is MLII, 1 is V5), both leads are processed together
     num = 32  # how many kronecker blocks will be long the original signals
     temp = n_block * kron_factor  # this is equal to the length of a kronecker block
     start = int(temp * 600)  # choose where to start our signal in the record (signal is a piece of the record)
     end = int(start + temp * num)
-    signal = signal[start:end]  # comment out to use the whole signal
-    # plot the signal
-    plt.figure(figsize=(10, 6))
-    plt.plot(signal)
-    plt.title('ECG Signal')
-    plt.xlabel('Index')
-    plt.ylabel('Amplitude')
-    plt.grid(True)
+    signal = signal[:, start:end]  # comment out to use the whole signal
+    # plot the signal (min/max envelope at the width of the plot in pixels, cheap at any signal length)
+    fig = Figure(figsize=(10, 6), dpi=100)
+    ax = fig.add_subplot()
+    for lead, name in enumerate(leads):
+        ax.plot(*csp.min_max_envelope(signal[lead], int(fig.get_figwidth() * fig.dpi)), label=name)
+    ax.legend()
+    ax.set_title('ECG Signal')
+    ax.set_xlabel('Index')
+    ax.set_ylabel('Amplitude')
+    ax.grid(True)
 
 
      # Determine the path to the root directory (the parent of the 'scripts' directory)
@@ -49,12 +49,10 @@ def main():
     os.makedirs(plots_path, exist_ok=True)
      # Save the plot to the 'plots' directory
     plot_filename = os.path.join(plots_path, 'plt1-ecg_original_signal.png')
-    plt.savefig(plot_filename)
+    fig.savefig(plot_filename)
     print(f"Plot saved to {plot_filename}")
 
 
-    plt.show()    
-
     ## PARAMETERS
     # ----------------------------------------------------------------
     CR = 1/4  # compression ratio
@@ -76,7 +74,7 @@ def main():
     #Phi = csp.generate_random_matrix(m_block, n_block, matrix_type='scaled_binary')
     Phi = csp.generate_random_matrix(m_block, n_block, matrix_type='unscaled_binary')
 
-    # COMPRESS THE SIGNAL
+    # COMPRESS THE SIGNAL (all the leads, Y has shape (leads, m_block, BLOCK_NUM))
     Y = csp.compressSignal(signal, Phi)
 
 
@@ -92,7 +90,7 @@ def main():
         sigma_min = sigma_off * 4  # minimum value of sigma
     else:
         sigma_min = 0.00001  # minimum value of sigmZ
-    # RECOVERY non-KRONECKER
+    # RECOVERY non-KRONECKER (all the leads in one batched pass, same shape as signal)
     recovered_signal = csp.non_kron_recovery(Y=Y, sigma_min=sigma_min, Phi=Phi, sigma_decrease_factor=sigma_decrease_factor,
                                             mu_0=mu_0, L=L, showProgress=False)
     # RECOVERY KRONECKER
@@ -102,11 +100,17 @@ def main():
 
     ## EVALUATION
     # ----------------------------------------------------------------
-    # Plot and SNR
-    csp.plot_signals(signal, recovered_signal, original_name="Original Signal",
-                     reconstructed_name="Recovered Signal", save_path=plots_path, filename='plt2-non-kronecker.png')
-    csp.plot_signals(signal, recovered_signal_kron, original_name="Original Signal",
-                     reconstructed_name="Recovered Signal (Kronecker)", save_path=plots_path, filename='plt3-kronecker.png') 
+    # Plot and SNR, one plot per lead, all saved in one batch
+    comparisons = []
+    for lead, name in enumerate(leads):
+        comparisons.append(dict(original_signal=signal[lead], reconstructed_signal=recovered_signal[lead],
+                                original_name=f"Original Signal ({name})", reconstructed_name="Recovered Signal",
+                                filename=f'plt2-non-kronecker-{name}.png'))
+        comparisons.append(dict(original_signal=signal[lead], reconstructed_signal=recovered_signal_kron[lead],
+                                original_name=f"Original Signal ({name})",
+                                reconstructed_name="Recovered Signal (Kronecker)",
+                                filename=f'plt3-kronecker-{name}.png'))
+    csp.plot_batch(comparisons, save_path=plots_path)
 
 
 
@@ -12,6 +12,7 @@ setup(
         'scipy',
         'matplotlib',
         'PyWavelets',
+        'pandas',
     ],
     entry_points={
         'console_scripts': [
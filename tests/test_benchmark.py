@@ -0,0 +1,30 @@
+import importlib.util
+import json
+import os
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load_benchmark():
+    spec = importlib.util.spec_from_file_location('benchmark', os.path.join(ROOT, 'scripts', 'benchmark.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_quick_grid_runs_and_compares(tmp_path, capsys):
+    benchmark = _load_benchmark()
+    signal = np.sin(2 * np.pi * np.arange(4096) / 300)
+    results = benchmark.run_benchmarks(signal, benchmark.GRIDS['quick'], 0.004, repeat=1, seed=0)
+
+    names = {r['benchmark'] for r in results}
+    assert names == {'compressSignal', 'SL0', 'non_kron_recovery', 'kron_recovery'}
+    assert all(r['time_s'] > 0 and r['peak_mem_bytes'] >= 0 for r in results)
+    assert all(r['snr_db'] > 10 for r in results if r['snr_db'] is not None)
+
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({'results': results}))
+    benchmark.compare(results, baseline)
+    assert 'speedup   1.00x' in capsys.readouterr().out
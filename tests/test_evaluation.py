@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+import pytest
+
+import compSensPack as csp
+
+
+def test_min_max_envelope_keeps_every_bucket_extreme():
+    signal = np.random.default_rng(0).standard_normal(10007)
+    indices, values = csp.min_max_envelope(signal, 100)
+    assert len(indices) <= 200 and np.all(np.diff(indices) >= 0)
+    np.testing.assert_array_equal(values, signal[indices])
+    assert values.min() == signal.min() and values.max() == signal.max()
+
+    bucket = -(-signal.size // 100)
+    for start in range(0, signal.size, bucket):
+        chunk = signal[start:start + bucket]
+        kept = values[(indices >= start) & (indices < start + bucket)]
+        assert kept.min() == chunk.min() and kept.max() == chunk.max()
+
+    short = np.arange(50.0)
+    np.testing.assert_array_equal(csp.min_max_envelope(short, 100)[1], short)
+
+
+def test_plot_batch_saves_headless_plots(tmp_path):
+    signal = np.sin(np.arange(20000) / 50)
+    comparisons = [{'original_signal': signal, 'reconstructed_signal': signal + 0.01, 'filename': 'a.png'},
+                   {'original_signal': signal, 'reconstructed_signal': -signal, 'original_name': 'x',
+                    'reconstructed_name': 'y', 'snr': 1.0}]
+    paths = csp.plot_batch(comparisons, str(tmp_path))
+    assert [os.path.basename(path) for path in paths] == ['a.png', 'x_vs_y.png']
+    assert all(os.path.getsize(path) > 0 for path in paths)
+
+    with pytest.raises(ValueError):
+        csp.plot_batch([{'original_signal': signal, 'reconstructed_signal': signal[:-1]}], str(tmp_path))
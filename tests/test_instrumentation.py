@@ -0,0 +1,32 @@
+import numpy as np
+
+import compSensPack as csp
+
+
+def test_recovery_reports_phases_iterations_and_events():
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    Y = csp.compressSignal(np.sin(np.arange(32 * 16) / 20), Phi)
+    csp.clear_plan_cache()
+
+    metrics = csp.RecoveryMetrics()
+    csp.non_kron_recovery(Y, 0.004, Phi, metrics=metrics)
+    csp.non_kron_recovery(Y, 0.004, Phi, metrics=metrics)
+
+    assert {'plan', 'pinv', 'solve', 'synthesis'} <= set(metrics.phase_times)
+    assert metrics.phase_calls['solve'] == 2 and metrics.phase_calls['pinv'] == 1
+    assert metrics.events == {'plan_cache_miss': 1, 'plan_cache_hit': 1}
+    assert metrics.iterations.shape == (2 * 32,)
+
+    trace = metrics.trace
+    assert trace['active'].max() == 32 and np.all(np.diff(trace['sigma'][trace['solve'] == 0]) < 0)
+    assert 'plan_cache_hit: 1' in metrics.summary()
+
+    metrics.reset()
+    assert metrics.iterations.size == 0 and metrics.phase_times == {}
+
+
+def test_metrics_do_not_change_the_recovery():
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    Y = csp.compressSignal(np.sin(np.arange(32 * 16) / 20), Phi)
+    np.testing.assert_array_equal(csp.non_kron_recovery(Y, 0.004, Phi, metrics=csp.RecoveryMetrics()),
+                                  csp.non_kron_recovery(Y, 0.004, Phi))
@@ -0,0 +1,32 @@
+import numpy as np
+
+import compSensPack as csp
+
+
+def test_matrix_free_kronecker_matches_dense():
+    kron_factor = 4
+    Phi = csp.MatrixSpec('gaussian', 4, 16, seed=0).generate()
+    operator = csp.KroneckerDCTOperator(Phi, kron_factor)
+    Theta = np.kron(np.eye(kron_factor), Phi) @ csp.generate_DCT_dictionary(16 * kron_factor)
+
+    rng = np.random.default_rng(0)
+    s = rng.standard_normal((64, 3))
+    y = rng.standard_normal((16, 3))
+    np.testing.assert_allclose(operator @ s, Theta @ s, atol=1e-12)
+    np.testing.assert_allclose(operator @ s[:, 0], Theta @ s[:, 0], atol=1e-12)
+    np.testing.assert_allclose(operator.T @ y, Theta.T @ y, atol=1e-12)
+    np.testing.assert_allclose(operator.pinv() @ y, np.linalg.pinv(Theta) @ y, atol=1e-10)
+
+
+def test_kron_recovery_matches_dense_sl0():
+    kron_factor = 4
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    signal = np.sin(2 * np.pi * np.arange(16 * 16) / 90)
+    Y = csp.compressSignal(signal, Phi)
+
+    Theta = np.kron(np.eye(kron_factor), Phi) @ csp.generate_DCT_dictionary(16 * kron_factor)
+    Y_kron = Y.reshape(-1, Y.shape[1] // kron_factor, order='F')
+    S = csp.SL0(Y_kron, Theta, 0.001, A_pinv=np.linalg.pinv(Theta))
+    expected = (csp.generate_DCT_dictionary(16 * kron_factor) @ S).T.reshape(-1)
+
+    np.testing.assert_allclose(csp.kron_recovery(Y, 0.001, Phi, kron_factor), expected, atol=1e-8)
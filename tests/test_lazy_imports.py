@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+
+import compSensPack as csp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_modules(code):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    code += "; import sys, json; print(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True, text=True)
+    return set(json.loads(output.stdout.splitlines()[-1]))
+
+
+def test_recovery_does_not_import_heavy_dependencies():
+    modules = _loaded_modules("from compSensPack import SL0, compressSignal, MatrixSpec, get_recovery_plan")
+    assert not {'matplotlib', 'pywt', 'pandas', 'scipy.io'} & modules
+    assert 'compSensPack.evaluation' not in modules
+
+
+def test_every_exported_name_resolves():
+    for name in csp.__all__:
+        assert getattr(csp, name) is not None
+    assert set(csp.__all__) <= set(dir(csp))
+    assert callable(csp.SL0)
+    from compSensPack import SL0  # the submodule must not shadow the function
+    assert SL0 is csp.SL0 and callable(SL0)
@@ -0,0 +1,61 @@
+import numpy as np
+
+import compSensPack as csp
+from compSensPack.measurementMatrix import DBDDOperator
+
+
+def test_dbdd_spec_plans_use_the_implicit_operator():
+    spec = csp.MatrixSpec('DBDD', 4, 16)
+    assert isinstance(spec.generate(implicit=True), DBDDOperator)
+    assert isinstance(spec.generate(), np.ndarray)
+
+    plan = csp.RecoveryPlan(spec, sigma_min=0.004)
+    assert isinstance(plan.Phi, DBDDOperator)
+
+    signal = np.random.default_rng(0).standard_normal(64 * 16)
+    dense = csp.RecoveryPlan(spec.generate(), sigma_min=0.004)
+    Y = csp.compressSignal(signal, spec)
+    np.testing.assert_allclose(Y, csp.compressSignal(signal, spec.generate()), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(plan.recover(Y), dense.recover(Y), rtol=0, atol=1e-9)
+
+
+def test_dbdd_operator_matches_the_dense_matrix():
+    Phi = DBDDOperator(4, 16)
+    dense = csp.generate_DBDD_matrix(4, 16)
+    np.testing.assert_array_equal(np.asarray(Phi), dense)
+
+    rng = np.random.default_rng(0)
+    x, y = rng.standard_normal((16, 5)), rng.standard_normal((4, 5))
+    np.testing.assert_allclose(Phi @ x, dense @ x, atol=1e-12)
+    np.testing.assert_allclose(Phi @ x[:, 0], dense @ x[:, 0], atol=1e-12)
+    np.testing.assert_allclose(Phi.T @ y, dense.T @ y, atol=1e-12)
+    np.testing.assert_allclose(Phi.pinv() @ y, np.linalg.pinv(dense) @ y, atol=1e-12)
+
+
+def test_dbdd_closed_form_projection_matches_dense_pinv():
+    signal = np.sin(2 * np.pi * np.arange(64 * 16) / 300)
+    Y = csp.compressSignal(signal, DBDDOperator(4, 16))
+    dense = csp.generate_DBDD_matrix(4, 16)
+
+    plan = csp.RecoveryPlan(DBDDOperator(4, 16), sigma_min=0.004)
+    np.testing.assert_allclose(np.asarray(plan.Theta_pinv @ np.eye(4)), np.linalg.pinv(plan.Theta), atol=1e-12)
+    for kron_factor in (None, 4):
+        implicit = csp.RecoveryPlan(DBDDOperator(4, 16), kron_factor, sigma_min=0.004).recover(Y)
+        explicit = csp.RecoveryPlan(dense, kron_factor, sigma_min=0.004).recover(Y)
+        np.testing.assert_allclose(implicit, explicit, rtol=0, atol=1e-9)
+
+
+def test_seeded_matrices_are_reproducible_and_packable():
+    for matrix_type in ('gaussian', 'scaled_binary', 'unscaled_binary'):
+        spec = csp.MatrixSpec(matrix_type, 8, 20, seed=7)
+        np.testing.assert_array_equal(spec.generate(), spec.generate())
+        assert not np.array_equal(spec.generate(), csp.MatrixSpec(matrix_type, 8, 20, seed=8).generate())
+
+    spec = csp.MatrixSpec('unscaled_binary', 8, 20, seed=7)
+    packed = spec.packed()
+    dense = spec.generate()
+    assert set(np.unique(dense)) <= {-1.0, 1.0}
+    assert packed.nbytes == 8 * 3
+    np.testing.assert_array_equal(np.asarray(packed), dense)
+    x = np.random.default_rng(0).standard_normal((20, 3))
+    np.testing.assert_allclose(packed @ x, dense @ x, atol=1e-12)
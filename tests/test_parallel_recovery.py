@@ -0,0 +1,26 @@
+import numpy as np
+
+import compSensPack as csp
+
+
+def test_parallel_warm_start_matches_serial():
+    t = np.arange(2 * 300 * 16)
+    signal = np.array([np.sin(2 * np.pi * t / 400), np.sin(2 * np.pi * t / 170)])
+    spec = csp.MatrixSpec('gaussian', 8, 16, seed=0)
+    Y = csp.compressSignal(signal, spec)
+
+    serial = csp.get_recovery_plan(spec, sigma_min=0.001, tol=1e-4, warm_start=True).recover(Y)
+    parallel = csp.parallel_recovery(Y, 0.001, spec, workers=2, tasks_per_worker=3, tol=1e-4, warm_start=True)
+    np.testing.assert_allclose(parallel, serial, rtol=0, atol=1e-9)
+
+
+def test_parallel_kron_recovery_matches_serial():
+    t = np.arange(130 * 16)
+    signal = np.sin(2 * np.pi * t / 400)
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    Y = csp.compressSignal(signal, Phi)  # 32 Kronecker blocks and 2 trailing blocks
+
+    serial = csp.kron_recovery(Y, 0.001, Phi, 4)
+    parallel = csp.parallel_recovery(Y, 0.001, Phi, kron_factor=4, workers=2)
+    np.testing.assert_allclose(parallel, serial, rtol=0, atol=1e-9)
+    assert np.all(parallel[128 * 16:] == 0)
@@ -0,0 +1,14 @@
+import numpy as np
+
+import compSensPack as csp
+
+
+def test_parallel_sweep_matches_serial():
+    t = np.arange(2 * 1024)
+    signal = np.array([np.sin(2 * np.pi * t / 400), np.sin(2 * np.pi * t / 170)])
+    grid = {'matrix_type': ['DBDD', 'gaussian'], 'kron_factor': [None, 4], 'sigma_min': [0.001, 0.004]}
+
+    serial = csp.parameter_sweep(signal, grid)
+    parallel = csp.parameter_sweep(signal, grid, workers=2)
+    assert len(serial) == 8 and serial['group'].nunique() == 4
+    np.testing.assert_allclose(parallel['snr_db'], serial['snr_db'], rtol=0, atol=1e-9)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from compSensPack import phaseTransition
+
+PARAMETERS = dict(delta=[0.25, 0.5], rho=[0.1, 0.3], noise=[0.0, 0.01], kron_factor=[None, 4], trials=6,
+                  n_block=16, batch_size=4, seed=1)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_checkpoint_resume_matches_uninterrupted_run(tmp_path, monkeypatch):
+    expected = phaseTransition.phase_transition(**PARAMETERS)
+    checkpoint = tmp_path / 'pt.npz'  # a pathlib.Path, not a str
+
+    run_task = phaseTransition._run_task
+    calls = []
+    interrupt = True
+
+    def interrupted(*args):
+        calls.append(args)
+        if interrupt and len(calls) == 3:
+            raise Interrupted
+        return run_task(*args)
+
+    monkeypatch.setattr(phaseTransition, '_run_task', interrupted)
+    with pytest.raises(Interrupted):
+        phaseTransition.phase_transition(**PARAMETERS, checkpoint=checkpoint, checkpoint_interval=0)
+    with np.load(checkpoint) as saved:
+        assert saved['done'].sum() == 2
+
+    calls.clear()
+    interrupt = False
+    result = phaseTransition.phase_transition(**PARAMETERS, checkpoint=checkpoint, checkpoint_interval=0)
+    assert len(calls) == 8 - 2
+    for name in ('success', 'snr_db', 'trials'):
+        np.testing.assert_allclose(result[name], expected[name], rtol=0, atol=1e-9)
+
+
+def test_checkpoint_of_other_parameters_is_rejected(tmp_path):
+    checkpoint = tmp_path / 'pt.npz'
+    phaseTransition.phase_transition(**PARAMETERS, checkpoint=checkpoint)
+    with pytest.raises(ValueError):
+        phaseTransition.phase_transition(**dict(PARAMETERS, trials=7), checkpoint=checkpoint)
+
+
+def test_parallel_run_matches_serial_run():
+    serial = phaseTransition.phase_transition(**PARAMETERS)
+    parallel = phaseTransition.phase_transition(**PARAMETERS, workers=2)
+    assert serial['success'].shape == (2, 2, 2, 2) and np.all(serial['trials'] == 6)
+    assert np.array_equal(serial['kron_factor'], [0, 4])
+    for name in ('success', 'snr_db', 'trials'):
+        np.testing.assert_allclose(parallel[name], serial[name], rtol=0, atol=1e-9)
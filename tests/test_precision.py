@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+import compSensPack as csp
+
+
+@pytest.mark.parametrize('kron_factor', [None, 4])
+def test_float32_recovery_stays_float32(kron_factor):
+    signal = np.sin(2 * np.pi * np.arange(64 * 16) / 300)
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+
+    results = {}
+    for dtype in (np.float32, np.float64):
+        Y = csp.compressSignal(signal, Phi, dtype=dtype)
+        assert Y.dtype == dtype
+        if kron_factor is None:
+            results[dtype] = csp.non_kron_recovery(Y, 0.004, Phi, dtype=dtype)
+        else:
+            results[dtype] = csp.kron_recovery(Y, 0.004, Phi, kron_factor, dtype=dtype)
+        assert results[dtype].dtype == dtype
+
+    assert csp.calculate_snr(signal, results[np.float32]) > csp.calculate_snr(signal, results[np.float64]) - 1
+
+
+def test_sl0_runs_in_the_dtype_of_its_inputs():
+    rng = np.random.default_rng(0)
+    A = rng.standard_normal((8, 16)).astype(np.float32)
+    s = csp.SL0(rng.standard_normal((8, 4)).astype(np.float32), A, 0.01)
+    assert s.dtype == np.float32
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+import compSensPack as csp
+
+
+def _signals(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(shape)
+    return x, x + 0.1 * rng.standard_normal(shape)
+
+
+@pytest.mark.parametrize('shape', [(1000,), (2, 1000)])
+def test_block_metrics_match_calculate_snr_per_block(shape):
+    x, x_hat = _signals(shape)
+    metrics = csp.block_metrics(x, x_hat, 16, kron_factor=4)
+    assert metrics['snr_db'].shape == shape[:-1] + (1000 // 64,)
+
+    blocks = x[..., :960].reshape(shape[:-1] + (15, 64))
+    blocks_hat = x_hat[..., :960].reshape(shape[:-1] + (15, 64))
+    expected = [csp.calculate_snr(a, b) for a, b in zip(blocks.reshape(-1, 64), blocks_hat.reshape(-1, 64))]
+    np.testing.assert_allclose(metrics['snr_db'].reshape(-1), expected)
+    np.testing.assert_allclose(metrics['prd'], 100 * np.sqrt(metrics['nmse']))
+
+
+@pytest.mark.parametrize('shape', [(1000,), (2, 1000)])
+def test_accumulator_with_unaligned_chunks_matches_whole_signal(shape):
+    x, x_hat = _signals(shape)
+    quality = csp.QualityAccumulator(16)
+    for start, stop in zip([0, 7, 40, 41, 500], [7, 40, 41, 500, 1000]):
+        quality.update(x[..., start:stop], x_hat[..., start:stop])
+
+    assert quality.samples == 1000
+    expected = [csp.calculate_snr(a, b) for a, b in zip(x.reshape(-1, 1000), x_hat.reshape(-1, 1000))]
+    np.testing.assert_allclose(np.reshape(quality.snr_db, -1), expected)
+    for name, values in csp.block_metrics(x, x_hat, 16).items():
+        np.testing.assert_allclose(quality.block_metrics()[name], values)
+
+
+def test_accumulator_needs_n_block_for_block_metrics():
+    with pytest.raises(ValueError):
+        csp.QualityAccumulator().block_metrics()
+    with pytest.raises(ValueError):
+        csp.QualityAccumulator(kron_factor=4)
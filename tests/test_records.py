@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pytest
+
+import compSensPack as csp
+from compSensPack import records
+
+
+def _write_mat(path, signal):
+    import scipy.io
+    scipy.io.savemat(path, {'val': signal})
+
+
+def test_record_is_cached_and_memory_mapped(tmp_path, monkeypatch):
+    signal = np.arange(2 * 50, dtype=np.int16).reshape(2, 50)
+    path = tmp_path / '100m.mat'
+    _write_mat(path, signal)
+
+    record = csp.load_record(path, lead_names=['MLII', 'V5'])
+    assert isinstance(record.signal, np.memmap) and record.signal.dtype == np.int16
+    np.testing.assert_array_equal(record.signal, signal)
+    np.testing.assert_array_equal(record.lead('V5'), signal[1])
+    assert (record.leads, record.length, record.key) == (2, 50, 'val')
+
+    def fail(*args):
+        raise AssertionError("the cache should not be rebuilt")
+    monkeypatch.setattr(records, '_build_cache', fail)
+    cached = csp.load_record(path)
+    assert cached.lead_names == ['MLII', 'V5']
+    assert sorted(os.listdir(tmp_path / '.record_cache')) == ['100m.json', '100m.npy']
+    with pytest.raises(ValueError):
+        cached.lead('V1')
+
+
+def test_cache_is_rebuilt_for_a_changed_or_different_source(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    for name, scale in (('a', 1), ('b', 2)):
+        os.makedirs(tmp_path / name)
+        _write_mat(tmp_path / name / '100m.mat', scale * np.arange(20, dtype=np.int16).reshape(2, 10))
+
+    a, b = tmp_path / 'a' / '100m.mat', tmp_path / 'b' / '100m.mat'
+    stat = os.stat(a)
+    os.utime(b, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # same stem, size and mtime
+
+    assert csp.load_record(a, cache_dir=cache_dir).signal[1, 1] == 11
+    assert csp.load_record(b, cache_dir=cache_dir).signal[1, 1] == 22
+
+    _write_mat(b, 3 * np.arange(20, dtype=np.int16).reshape(2, 10))
+    os.utime(b, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert csp.load_record(b, cache_dir=cache_dir).signal[1, 1] == 33
+    assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')]
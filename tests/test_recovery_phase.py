@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import compSensPack as csp
+
+
+def _signal(length):
+    t = np.arange(length)
+    return np.sin(2 * np.pi * t / 400) + 0.5 * np.sin(2 * np.pi * t / 170)
+
+
+@pytest.mark.parametrize('warm_start', [False, True])
+def test_non_kron_stream_matches_batch(warm_start):
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    Y = csp.compressSignal(_signal(40 * 16), Phi)
+
+    batch = csp.non_kron_recovery(Y, 0.001, Phi, tol=1e-4, warm_start=warm_start)
+    stream = np.concatenate(list(csp.non_kron_recovery_stream(Y.T, 0.001, Phi, tol=1e-4, warm_start=warm_start)))
+    np.testing.assert_allclose(stream, batch, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('warm_start', [False, True])
+def test_kron_stream_matches_batch(warm_start):
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    Y = csp.compressSignal(_signal(75 * 16), Phi)  # 18 Kronecker blocks and 3 trailing blocks
+
+    batch = csp.kron_recovery(Y, 0.001, Phi, 4, tol=1e-4, warm_start=warm_start)
+    stream = np.concatenate(list(csp.kron_recovery_stream(Y.T, 0.001, Phi, 4, tol=1e-4, warm_start=warm_start)))
+    np.testing.assert_allclose(stream, batch, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('pinv_method', ['cholesky', 'qr'])
+def test_factorized_projection_matches_pinv(pinv_method):
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    Y = csp.compressSignal(_signal(40 * 16), Phi)
+
+    expected = csp.non_kron_recovery(Y, 0.001, Phi)
+    np.testing.assert_allclose(csp.non_kron_recovery(Y, 0.001, Phi, pinv_method=pinv_method), expected,
+                               rtol=0, atol=1e-8)
+
+
+@pytest.mark.parametrize('kron_factor', [None, 4])
+def test_multi_lead_recovery_matches_each_lead(kron_factor):
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    signal = np.array([_signal(42 * 16), _signal(42 * 16)[::-1]])
+    Y = csp.compressSignal(signal, Phi)
+
+    if kron_factor is None:
+        x_hat = csp.non_kron_recovery(Y, 0.001, Phi)
+        leads = [csp.non_kron_recovery(Y[lead], 0.001, Phi) for lead in range(2)]
+    else:
+        x_hat = csp.kron_recovery(Y, 0.001, Phi, kron_factor)
+        leads = [csp.kron_recovery(Y[lead], 0.001, Phi, kron_factor) for lead in range(2)]
+    assert x_hat.shape == signal.shape
+    np.testing.assert_allclose(x_hat, np.array(leads), rtol=0, atol=1e-9)
@@ -0,0 +1,78 @@
+import numpy as np
+
+import compSensPack as csp
+from compSensPack import recoveryPlan
+from compSensPack.recoveryPlan import plan_key
+
+
+def test_plan_cache_hits_shares_and_evicts(monkeypatch):
+    monkeypatch.setattr(recoveryPlan, 'PLAN_CACHE_SIZE', 2)
+    csp.clear_plan_cache()
+    Phi = csp.MatrixSpec('gaussian', 4, 16, seed=0).generate()
+
+    plan = csp.get_recovery_plan(Phi, sigma_min=0.004)
+    other = csp.get_recovery_plan(Phi, sigma_min=0.001, L=5)
+    assert other.Theta_pinv is plan.Theta_pinv and (other.sigma_min, other.L) == (0.001, 5)
+
+    csp.get_recovery_plan(Phi + 1)
+    csp.get_recovery_plan(Phi + 2)
+    metrics = csp.RecoveryMetrics()
+    csp.get_recovery_plan(Phi, metrics=metrics)
+    assert metrics.events == {'plan_cache_miss': 1}
+    csp.clear_plan_cache()
+
+
+def test_loaded_plan_recovers_like_the_original(tmp_path):
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    Y = csp.compressSignal(np.sin(np.arange(32 * 16) / 20), Phi)
+    for kron_factor in (None, 4):
+        plan = csp.RecoveryPlan(Phi, kron_factor, sigma_min=0.001, tol=1e-4)
+        plan.save(tmp_path / 'plan.npz')
+        loaded = csp.RecoveryPlan.load(tmp_path / 'plan.npz', cache=False)
+        assert loaded.schedule == plan.schedule
+        np.testing.assert_allclose(loaded.recover(Y), plan.recover(Y), rtol=0, atol=1e-12)
+
+
+def test_saved_spec_plan_is_a_cache_hit(tmp_path):
+    spec = csp.MatrixSpec('gaussian', 4, 16, seed=3)
+    plan = csp.RecoveryPlan(spec, sigma_min=0.004)
+    path = tmp_path / 'plan.npz'
+    plan.save(path)
+
+    csp.clear_plan_cache()
+    loaded = csp.RecoveryPlan.load(path)
+    assert loaded.spec == spec
+    assert loaded.key == plan_key(spec)
+
+    metrics = csp.RecoveryMetrics()
+    cached = csp.get_recovery_plan(spec, metrics=metrics)
+    assert metrics.events == {'plan_cache_hit': 1}
+    assert np.array_equal(cached.Theta_pinv, plan.Theta_pinv)
+
+
+def _smooth_signal(length, leads=1):
+    t = np.arange(length)
+    return np.squeeze([np.sin(2 * np.pi * t / (400 + 30 * lead)) + 0.5 * np.sin(2 * np.pi * t / 170)
+                       for lead in range(leads)])
+
+
+def test_warm_start_reduces_iterations_on_small_input():
+    spec = csp.MatrixSpec('gaussian', 8, 16, seed=0)
+    plan = csp.RecoveryPlan(spec, sigma_min=0.001, tol=1e-4)
+    Y = plan.group(csp.compressSignal(_smooth_signal(64 * 16), spec))
+
+    _, cold = plan.solve(Y, return_iterations=True)
+    _, warm = plan.with_schedule(warm_start=True).solve(Y, return_iterations=True)
+    assert warm.sum() < cold.sum()
+
+
+def test_warm_start_chains_break_at_leads():
+    plan = csp.RecoveryPlan(csp.MatrixSpec('gaussian', 8, 16, seed=0), sigma_min=0.001, warm_start=True)
+    chains = plan.warm_start_chains([40, 40])
+    assert np.array_equal(chains, [0, 16, 32, 40, 56, 72, 80])
+
+    signal = _smooth_signal(40 * 16, leads=2)
+    Y = csp.compressSignal(signal, plan.spec)
+    x_hat = plan.recover(Y)
+    for lead in range(2):
+        assert np.allclose(x_hat[lead], plan.recover(Y[lead]), rtol=0, atol=1e-10)
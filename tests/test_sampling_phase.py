@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import compSensPack as csp
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1000])
+def test_chunked_compression_matches_unchunked(chunk_size):
+    signal = np.random.default_rng(0).standard_normal(64 * 16 + 5)
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+
+    Y = csp.compressSignal(signal, Phi)
+    assert np.allclose(Y, Phi @ signal[:64 * 16].reshape(64, 16).T)
+    assert np.allclose(csp.compressSignal(signal, Phi, chunk_size=chunk_size), Y)
+
+
+@pytest.mark.parametrize('chunk_size', [0, -3])
+def test_chunk_size_below_one_is_rejected(chunk_size):
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    with pytest.raises(ValueError):
+        csp.compressSignal(np.zeros(64), Phi, chunk_size=chunk_size)
+
+
+def test_out_buffer_is_filled_in_place():
+    signal = np.random.default_rng(0).standard_normal(32 * 16)
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    out = np.zeros((8, 32), dtype=np.float32)
+
+    Y = csp.compressSignal(signal, Phi, chunk_size=5, out=out)
+    assert Y is out
+    np.testing.assert_allclose(out, csp.compressSignal(signal, Phi), rtol=1e-5, atol=1e-5)
+    with pytest.raises(ValueError):
+        csp.compressSignal(signal, Phi, out=np.zeros((8, 31)))
+
+
+def test_multi_lead_compression_matches_each_lead():
+    signal = np.random.default_rng(0).standard_normal((2, 40 * 16 + 3))
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+
+    Y = csp.compressSignal(signal, Phi, chunk_size=7)
+    assert Y.shape == (2, 8, 40)
+    for lead in range(2):
+        np.testing.assert_allclose(Y[lead], csp.compressSignal(signal[lead], Phi), atol=1e-12)
@@ -0,0 +1,77 @@
+import numpy as np
+
+from compSensPack.SL0 import SL0, FactorizedPinv, SL0Workspace
+
+
+def _sparse_problem(B=8, M=30, N=60, K=3, seed=0):
+    rng = np.random.default_rng(seed)
+    A = rng.standard_normal((M, N))
+    S = np.zeros((N, B))
+    for j in range(B):
+        S[rng.choice(N, K, replace=False), j] = rng.standard_normal(K)
+    return A, S, A @ S
+
+
+def test_batched_sl0_matches_column_by_column():
+    A, S, Y = _sparse_problem()
+    batched = SL0(Y, A, 1e-5, L=5)
+    columns = np.column_stack([SL0(Y[:, j], A, 1e-5, L=5) for j in range(Y.shape[1])])
+    np.testing.assert_allclose(batched, columns, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(batched, S, rtol=0, atol=1e-4)
+
+
+def test_rank_deficient_cholesky_falls_back_to_pinv():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        A = rng.standard_normal((8, 6)) @ rng.standard_normal((6, 32))  # rank 6
+        pinv = FactorizedPinv(A, method='cholesky')
+        assert pinv.method == 'pinv'
+        r = rng.standard_normal(8)
+        assert np.allclose(pinv @ r, np.linalg.pinv(A) @ r)
+
+
+def test_full_rank_keeps_factorization():
+    rng = np.random.default_rng(1)
+    A = rng.standard_normal((8, 32))
+    for method in ('cholesky', 'qr'):
+        pinv = FactorizedPinv(A, method=method)
+        assert pinv.method == method
+        r = rng.standard_normal(8)
+        assert np.allclose(pinv @ r, np.linalg.pinv(A) @ r)
+
+
+def test_tol_stops_converged_columns_independently():
+    A, S, Y = _sparse_problem()
+    _, full = SL0(Y, A, 1e-5, L=5, return_iterations=True)
+    batched, iterations = SL0(Y, A, 1e-5, L=5, tol=1e-3, return_iterations=True)
+    assert np.all(iterations <= full) and iterations.sum() < full.sum()
+    np.testing.assert_allclose(batched, S, rtol=0, atol=1e-3)
+
+    # masked columns do not depend on the other columns of the batch
+    for j in range(Y.shape[1]):
+        column, iteration = SL0(Y[:, j], A, 1e-5, L=5, tol=1e-3, return_iterations=True)
+        assert iteration == iterations[j]
+        np.testing.assert_allclose(column, batched[:, j], rtol=0, atol=1e-12)
+
+
+def test_warm_start_from_a_close_seed_needs_fewer_iterations():
+    A, S, Y = _sparse_problem()
+    cold, cold_iterations = SL0(Y, A, 1e-5, L=5, return_iterations=True)
+    seed = S + 1e-3 * np.random.default_rng(1).standard_normal(S.shape)
+    warm, warm_iterations = SL0(Y, A, 1e-5, L=5, return_iterations=True, s_init=seed)
+    assert np.all(warm_iterations < cold_iterations)
+    np.testing.assert_allclose(warm, cold, rtol=0, atol=1e-4)
+
+
+def test_reused_workspace_gives_the_same_result():
+    A, S, Y = _sparse_problem()
+    expected = SL0(Y, A, 1e-5, L=5)
+    A_pinv = np.linalg.pinv(A)
+
+    workspace = SL0Workspace(A.shape[1], A.shape[0], B=Y.shape[1] + 2)
+    for _ in range(2):
+        np.testing.assert_allclose(SL0(Y, A, 1e-5, L=5, A_pinv=A_pinv, workspace=workspace), expected,
+                                   rtol=0, atol=1e-12)
+    np.testing.assert_allclose(SL0(Y[:, :3], A, 1e-5, L=5, A_pinv=A_pinv, workspace=workspace), expected[:, :3],
+                               rtol=0, atol=1e-12)
+    assert not workspace.fits(A.shape[1], A.shape[0], Y.shape[1] + 3, np.float64)
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+import compSensPack as csp
+from compSensPack.sparseDictionaries import WaveletDictionary, compute_coherence, compute_rank
+
+
+@pytest.mark.parametrize('N, wavelet, level', [(16, 'db5', None), (64, 'db4', 3), (48, 'sym4', None),
+                                               (32, 'haar', 5)])
+def test_wavelet_dictionary_is_orthonormal(N, wavelet, level):
+    Dict = WaveletDictionary(N, wavelet, level)
+    dense = Dict.toarray()
+    np.testing.assert_allclose(dense.T @ dense, np.eye(N), atol=1e-10)
+
+    s = np.random.default_rng(0).standard_normal((N, 3))
+    np.testing.assert_allclose(Dict @ s, dense @ s, atol=1e-10)
+    np.testing.assert_allclose(Dict.T @ (Dict @ s), s, atol=1e-10)
+    np.testing.assert_allclose(Dict.T @ s[:, 0], dense.T @ s[:, 0], atol=1e-10)
+
+
+def test_wavelet_dictionary_uses_periodization():
+    import pywt
+
+    x = np.random.default_rng(0).standard_normal(32)
+    Dict = WaveletDictionary(32, 'db2', level=2)
+    expected = np.concatenate(pywt.wavedec(x, 'db2', mode='periodization', level=2))
+    np.testing.assert_allclose(Dict.T @ x, expected, atol=1e-12)
+
+    # a circular shift by 2**level samples shifts the coefficients of every level circularly
+    shifted = Dict.T @ np.roll(x, 4)
+    np.testing.assert_allclose(shifted[:8], np.roll(expected[:8], 1), atol=1e-12)
+    np.testing.assert_allclose(shifted[16:], np.roll(expected[16:], 2), atol=1e-12)
+
+
+def test_invalid_wavelet_dictionaries_are_rejected():
+    with pytest.raises(ValueError):
+        WaveletDictionary(16, 'bior2.2')
+    with pytest.raises(ValueError):
+        WaveletDictionary(48, 'db2', level=5)
+
+
+@pytest.mark.parametrize('kron_factor', [None, 4])
+def test_wavelet_recovery_matches_dense_dictionary(kron_factor):
+    Phi = csp.MatrixSpec('gaussian', 8, 16, seed=0).generate()
+    Y = csp.compressSignal(np.sin(2 * np.pi * np.arange(32 * 16) / 200), Phi)
+    plan = csp.RecoveryPlan(Phi, kron_factor, sigma_min=0.004, dictionary='db4')
+
+    group = kron_factor or 1
+    Dict = csp.generate_DWT_dictionary(16 * group, 'db4')
+    Theta = np.kron(np.eye(group), Phi) @ Dict
+    S = csp.SL0(plan.group(Y), Theta, 0.004, A_pinv=np.linalg.pinv(Theta))
+    np.testing.assert_allclose(plan.recover(Y), (Dict @ S).T.reshape(-1), atol=1e-8)
+
+
+def test_compute_rank_rejects_budget_below_r():
+    A = np.random.default_rng(0).standard_normal((8, 64))
+    assert compute_rank(A, max_bytes=8 * (8 * 8 + 2 * 8)) == 8
+    with pytest.raises(ValueError):
+        compute_rank(A, max_bytes=8 * 8 * 8)
+
+
+def _gram_coherence(matrix):
+    normalized = matrix / np.linalg.norm(matrix, axis=0)
+    gram = np.abs(normalized.T @ normalized)
+    np.fill_diagonal(gram, 0)
+    i, j = np.unravel_index(np.argmax(gram), gram.shape)
+    return gram[i, j], tuple(sorted((int(i), int(j))))
+
+
+@pytest.mark.parametrize('max_bytes', [2**28, 8 * 64 * 10, 8 * 64 * 3])
+def test_tiled_coherence_matches_gram(max_bytes):
+    matrix = np.random.default_rng(0).standard_normal((64, 150))
+    coherence, pair = compute_coherence(matrix, max_bytes=max_bytes, return_pair=True)
+    expected, expected_pair = _gram_coherence(matrix)
+    assert coherence == pytest.approx(expected, abs=1e-12) and pair == expected_pair
+
+    estimate = compute_coherence(matrix, max_bytes=max_bytes, samples=20, seed=0)
+    assert estimate <= coherence + 1e-12
+
+
+def test_coherence_of_a_matrix_free_operator():
+    Phi = csp.MatrixSpec('gaussian', 4, 16, seed=0).generate()
+    operator = csp.KroneckerDCTOperator(Phi, 4)
+    dense = np.kron(np.eye(4), Phi) @ csp.generate_DCT_dictionary(64)
+    assert compute_coherence(operator, max_bytes=8 * 80 * 8) == pytest.approx(_gram_coherence(dense)[0], abs=1e-12)
+    assert compute_rank(operator, max_bytes=8 * (16 * 16 + 2 * 80)) == np.linalg.matrix_rank(dense)
+
+
+@pytest.mark.parametrize('shape', [(8, 64), (64, 8)])
+def test_tiled_rank_matches_matrix_rank(shape):
+    rng = np.random.default_rng(0)
+    A = rng.standard_normal((shape[0], 5)) @ rng.standard_normal((5, shape[1]))
+    assert compute_rank(A, max_bytes=8 * (8 * 8 + 2 * 64)) == np.linalg.matrix_rank(A) == 5
@@ -0,0 +1,43 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import compSensPack as csp
+
+
+def test_batch_signals_are_k_sparse_and_reproducible():
+    signals, supports = csp.sparse_signal_batch(500, 32, K=5, sigma_inactive=0.0, seed=0)
+    assert signals.shape == (500, 32) and supports.shape == (500, 5)
+    assert np.all(np.diff(supports, axis=1) > 0)
+    assert np.all(np.count_nonzero(signals, axis=1) == 5)
+    assert np.all(np.take_along_axis(signals, supports, axis=1) != 0)
+
+    again, _ = csp.sparse_signal_batch(500, 32, K=5, sigma_inactive=0.0, seed=0)
+    np.testing.assert_array_equal(signals, again)
+
+    # every component is active with probability K / N
+    counts = np.bincount(csp.sparse_signal_batch(20000, 32, K=5, seed=1)[1].ravel(), minlength=32)
+    assert np.all(np.abs(counts / 20000 - 5 / 32) < 0.02)
+
+
+def test_batch_options_and_limits():
+    signals, supports = csp.sparse_signal_batch(10, 16, K=16, fixedActiveValue=2.0, seed=0, dtype=np.float32)
+    assert signals.dtype == np.float32 and np.all(signals == 2.0)
+    assert csp.sparse_signal_batch(10, 16, K=0, seed=0)[1].shape == (10, 0)
+    assert csp.sparse_signal_batch(10, 20, seed=0)[1].shape == (10, 2)
+    with pytest.raises(ValueError):
+        csp.sparse_signal_batch(10, 16, K=17)
+
+
+def test_stream_chunks_are_reproducible():
+    chunks = list(csp.sparse_signal_stream(16, K=3, total=10, chunk_size=4, seed=0))
+    assert [len(signals) for signals, _ in chunks] == [4, 4, 2]
+    again = list(csp.sparse_signal_stream(16, K=3, total=10, chunk_size=4, seed=0))
+    for (a, _), (b, _) in zip(chunks, again):
+        np.testing.assert_array_equal(a, b)
+
+    endless = csp.sparse_signal_stream(16, K=3, chunk_size=2, seed=0)
+    assert len(list(itertools.islice(endless, 5))) == 5
+    with pytest.raises(ValueError):
+        next(csp.sparse_signal_stream(16, chunk_size=0))